@@ -1,17 +1,16 @@
 import pandas as pd
-import streamlit as st
-from app.analysis.google_sheets import read_sheet_as_dataframe
+from app.analysis.google_sheets import read_sheet_fields
 
 
 # ======================================================
 # Carrega planilhas Google
 # ======================================================
-@st.cache_data(ttl=600)
 def carregar_planilhas():
-    sheet_51 = read_sheet_as_dataframe("51")
-    sheet_60 = read_sheet_as_dataframe("60")
-    sheet_51_stm = read_sheet_as_dataframe("51_STM")
-    return sheet_51, sheet_60, sheet_51_stm
+    # Só os campos usados nas regras abaixo, numa única leitura em lote
+    # (colunas resolvidas pelo cabeçalho, ver sheets_campos)
+    campos = ("codigo_cliente", "numero_ordem_servico", "status")
+    planilhas = read_sheet_fields((("51", campos), ("60", campos), ("51_STM", campos)))
+    return planilhas["51"], planilhas["60"], planilhas["51_STM"]
 
 
 # ======================================================
@@ -30,51 +29,30 @@ def aplicar_regras_financeiras(df: pd.DataFrame) -> pd.DataFrame:
 
     # ======================================================
     # 2️⃣ Normaliza Planilha 51
-    # H (7) Cliente | I (8) OS | AH (33) Status
+    # Cliente | OS | Status (hoje H, I, AH)
     # ======================================================
-    sheet_51 = sheet_51.iloc[:, [7, 8, 33]].copy()
-    sheet_51.columns = ["codigo_cliente", "numero_ordem_servico", "status_51"]
+    sheet_51 = sheet_51.rename(columns={"status": "status_51"})
 
     for c in sheet_51.columns:
         sheet_51[c] = sheet_51[c].astype(str).str.strip().str.upper()
 
     # ======================================================
     # 3️⃣ Normaliza Planilha 51_STM
-    # C (2) Cliente | D (3) OS | AH (33) Status
+    # Cliente | OS | Status (hoje C, D, AH)
     # ======================================================
-    sheet_51_stm = sheet_51_stm.iloc[:, [2, 3, 33]].copy()
-    sheet_51_stm.columns = ["codigo_cliente", "numero_ordem_servico", "status_51_stm"]
+    sheet_51_stm = sheet_51_stm.rename(columns={"status": "status_51_stm"})
 
     for c in sheet_51_stm.columns:
         sheet_51_stm[c] = sheet_51_stm[c].astype(str).str.strip().str.upper()
 
     # ======================================================
     # 4️⃣ Normaliza Planilha 60
-    # D (3) Cliente | E (4) OS | AF (31) Status
-    # ======================================================
-
-    # Verifica se a coluna AF existe
-    if sheet_60.shape[1] <= 31:
-        sheet_60["status_60"] = pd.NA
-    else:
-        status_60 = sheet_60.iloc[:, 31]
-
-        sheet_60 = sheet_60.iloc[:, [3, 4]].copy()
-        sheet_60["status_60"] = status_60
-
-        sheet_60.columns = [
-            "codigo_cliente",
-            "numero_ordem_servico",
-            "status_60",
-        ]
-
-        for c in sheet_60.columns:
-            sheet_60[c] = (
-                sheet_60[c]
-                .astype(str)
-                .str.strip()
-                .str.upper()
-            )
+    # Cliente | OS | Status (hoje D, E, AF; status vazio vem como "")
+    # ======================================================
+    sheet_60 = sheet_60.rename(columns={"status": "status_60"})
+
+    for c in sheet_60.columns:
+        sheet_60[c] = sheet_60[c].astype(str).str.strip().str.upper()
 
     # ======================================================
     # 5️⃣ Merge
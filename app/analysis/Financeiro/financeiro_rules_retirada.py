@@ -1,16 +1,14 @@
 import pandas as pd
-import streamlit as st
 from datetime import timedelta
-from app.analysis.google_sheets import read_sheet_as_dataframe
+from app.analysis.google_sheets import read_sheet_typed
 
 
 # ======================================================
-# 📄 Cache – Planilha 39
+# 📄 Planilha 39
 # ======================================================
-@st.cache_data(ttl=600)
 def carregar_planilha_39():
-    # Agora usamos a chave "39" do seu sheet_map
-    return read_sheet_as_dataframe("39")
+    # Leitura tipada: data já convertida, cliente/OS em maiúsculas (ver ESQUEMAS_PLANILHAS)
+    return read_sheet_typed("39")
 
 
 # ======================================================
@@ -1,34 +1,27 @@
 # app/analysis/Financeiro/financeiro_sources.py
 import pandas as pd
-from app.analysis.google_sheets import read_sheet_as_dataframe
+from app.analysis.google_sheets import read_sheet_fields
 
 def carregar_planilhas_financeiro():
     """
     Carrega as planilhas 60 e 51_STM e retorna DataFrames padronizados
     """
-    sheet_60 = read_sheet_as_dataframe("60")
-    sheet_51_stm = read_sheet_as_dataframe("51_STM")
-
-    # ================= PLANILHA 60 =================
-    s60 = sheet_60.iloc[:, [1, 3, 4, 7, 21]].copy()
-    s60.columns = [
+    # Só os campos usados (colunas resolvidas pelo cabeçalho, ver sheets_campos)
+    campos = (
         "nome_vendedor",
         "codigo_cliente",
         "numero_ordem_servico",
         "tipo_vendedor",
-        "status_planilha"
-    ]
+        "status_planilha",
+    )
+    planilhas = read_sheet_fields((("60", campos), ("51_STM", campos)))
+
+    # ================= PLANILHA 60 =================
+    s60 = planilhas["60"].copy()
     s60["origem"] = "60"
 
     # ================= PLANILHA STM =================
-    stm = sheet_51_stm.iloc[276:, [2, 3, 5, 10, 23]].copy()
-    stm.columns = [
-        "codigo_cliente",
-        "numero_ordem_servico",
-        "nome_vendedor",
-        "tipo_vendedor",
-        "status_planilha"
-    ]
+    stm = planilhas["51_STM"].iloc[276:].copy()
     stm["origem"] = "51_STM"
 
     # ================= PADRONIZAÇÃO =================
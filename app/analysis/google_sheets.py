@@ -1,14 +1,39 @@
+import json
+import logging
+import re
+import threading
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Callable, List, Optional
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.analysis.sheets_campos import (
+    CAMPOS_PLANILHAS,
+    conferir_cabecalhos,
+    indice_coluna,
+    letras_campos,
+    resolver_campos,
+)
+from app.analysis.sheets_incremental import CacheIncremental
+from app.analysis.sheets_snapshot import obter_snapshot, obter_snapshots
 from app.config import get_google_sheets_config
 
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+logger = logging.getLogger(__name__)
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    # modifiedTime dos arquivos, para não reler planilhas sem alteração
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+
+VERSOES_API = {"sheets": "v4", "drive": "v3"}
 
 
 # ============================================================
@@ -16,6 +41,15 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 # ============================================================
 @st.cache_resource
 def get_sheets_service():
+    return _criar_servico()
+
+
+@st.cache_resource
+def get_drive_service():
+    return _criar_servico("drive")
+
+
+def _criar_servico(api: str = "sheets"):
     cfg = get_google_sheets_config()
 
     credentials = Credentials.from_service_account_info(
@@ -31,22 +65,123 @@ def get_sheets_service():
         scopes=SCOPES,
     )
 
-    return build("sheets", "v4", credentials=credentials)
+    return build(api, VERSOES_API[api], credentials=credentials)
+
+
+# O cliente HTTP (httplib2) não é thread-safe: cada thread do pool de
+# leitura em lote usa o seu próprio service.
+_pool_leitura = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sheets")
+_local = threading.local()
+
+# Abas são logs que só crescem: relê só o fim (ver sheets_incremental)
+_incremental = CacheIncremental()
+
+
+def _servico_da_thread(api: str = "sheets"):
+    servicos = _local.__dict__.setdefault("servicos", {})
+    if api not in servicos:
+        servicos[api] = _criar_servico(api)
+    return servicos[api]
 
 
 # ============================================================
-# Leitor resiliente
+# Detecção de alteração (Drive modifiedTime)
 # ============================================================
-@st.cache_data(ttl=300)
-def read_sheet_as_dataframe(sheet_key="60", start_row: int = 1):
+# Desligada no processo se o Drive recusar de vez (API desativada / sem
+# escopo); outras recusas (ex.: 403 de cota) só pausam a sonda
+_sonda_drive = {"ativa": True, "pausada_ate": 0.0}
+
+# Motivos (errors[].reason / details[].reason) que não passam sozinhos
+MOTIVOS_SONDA_DESLIGADA = {
+    "insufficientPermissions",
+    "accessNotConfigured",
+    "ACCESS_TOKEN_SCOPE_INSUFFICIENT",
+    "SERVICE_DISABLED",
+}
+
+# Pausa (s) da sonda após uma recusa passageira
+PAUSA_SONDA_DRIVE = 60
+
+
+def _versao_planilha(drive, spreadsheet_id: str):
     """
-    Lê uma aba do Google Sheets e retorna como DataFrame.
-    
-    :param sheet_key: chave no sheet_map
-    :param start_row: linha inicial (1 = primeira linha da aba)
+    modifiedTime do spreadsheet (consulta de metadados, poucos bytes).
+    Enquanto não muda, as abas em cache continuam valendo.
+
+    Retorna None se não der para saber: a leitura segue normalmente.
+    """
+    if not _sonda_drive["ativa"] or time.monotonic() < _sonda_drive["pausada_ate"]:
+        return None
+
+    try:
+        arquivo = (
+            drive.files()
+            .get(fileId=spreadsheet_id, fields="modifiedTime", supportsAllDrives=True)
+            .execute()
+        )
+    except HttpError as e:
+        motivos = _motivos_erro(e)
+
+        if motivos & MOTIVOS_SONDA_DESLIGADA:
+            _sonda_drive["ativa"] = False
+            logger.warning(
+                "Drive recusou a consulta de modifiedTime; lendo planilhas sem verificação",
+                extra={"status": e.resp.status, "motivos": sorted(motivos)},
+            )
+        elif e.resp.status in [401, 403, 429]:
+            _sonda_drive["pausada_ate"] = time.monotonic() + PAUSA_SONDA_DRIVE
+            logger.warning(
+                "Drive recusou a consulta de modifiedTime; sonda pausada",
+                extra={"status": e.resp.status, "motivos": sorted(motivos), "pausa_s": PAUSA_SONDA_DRIVE},
+            )
+        return None
+    except Exception as e:
+        logger.warning("Falha ao consultar modifiedTime", extra={"erro": str(e)})
+        return None
+
+    return arquivo.get("modifiedTime")
+
+
+def _motivos_erro(e: HttpError) -> set:
+    """
+    Motivos de um erro da API Google (formato antigo errors[] e novo details[]).
+    """
+    try:
+        erro = json.loads(e.content.decode("utf-8")).get("error", {})
+    except (ValueError, AttributeError):
+        return set()
+
+    if not isinstance(erro, dict):
+        return set()
+
+    itens = (erro.get("errors") or []) + (erro.get("details") or [])
+    return {item["reason"] for item in itens if isinstance(item, dict) and item.get("reason")}
+
+
+def _sonda_versoes() -> Callable[..., Optional[str]]:
+    """
+    versao(spreadsheet_id, drive=None) com memória: numa leitura, o
+    snapshot e o cache incremental usam o mesmo modifiedTime, consultado
+    uma vez por spreadsheet.
+    """
+    versoes: dict[str, Optional[str]] = {}
+
+    def versao(spreadsheet_id: str, drive=None) -> Optional[str]:
+        if spreadsheet_id not in versoes:
+            versoes[spreadsheet_id] = _versao_planilha(drive or get_drive_service(), spreadsheet_id)
+        return versoes[spreadsheet_id]
+
+    return versao
+
+
+# ============================================================
+# Planilhas conhecidas
+# ============================================================
+def _resolver_planilha(sheet_key: str) -> tuple[str, str]:
+    """
+    sheet_key -> (spreadsheet_id, nome da aba)
     """
     cfg = get_google_sheets_config()
-    service = get_sheets_service()
 
     sheet_map = {
         "60": (cfg.spreadsheet_60, cfg.sheet_name_60),
@@ -60,23 +195,16 @@ def read_sheet_as_dataframe(sheet_key="60", start_row: int = 1):
         raise ValueError(f"Planilha inválida: {sheet_key}")
 
     spreadsheet_id, sheet_name = sheet_map[sheet_key]
-    sheet_name = sheet_name.strip()
+    return spreadsheet_id, sheet_name.strip()
 
-    tentativas = 3
-    range_str = f"'{sheet_name}'!A{start_row}:ZZ"  # lê a partir da linha start_row
 
+def _executar_com_retry(montar_requisicao, tentativas: int = 3) -> dict:
+    """
+    Executa a requisição da API, com nova tentativa em 429/500/503.
+    """
     for tentativa in range(tentativas):
         try:
-            result = (
-                service.spreadsheets()
-                .values()
-                .get(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_str
-                )
-                .execute()
-            )
-            break
+            return montar_requisicao().execute()
         except HttpError as e:
             if e.resp.status in [429, 500, 503]:
                 if tentativa < tentativas - 1:
@@ -85,22 +213,586 @@ def read_sheet_as_dataframe(sheet_key="60", start_row: int = 1):
                 raise RuntimeError("⚠️ Google Sheets temporariamente indisponível.")
             raise e
 
-    values = result.get("values", [])
 
+# ============================================================
+# Esquemas (leitura tipada)
+# ============================================================
+# Coluna (campo de sheets_campos, cabeçalho ou letra) -> tipo.
+# Colunas não declaradas são "texto".
+#   texto       str sem espaços nas pontas
+#   maiusculas  texto em maiúsculas
+#   numero      float (vazio/texto -> NaN)
+#   data        datetime64 no início do dia (vazio/texto -> NaT)
+#   data_hora   datetime64 com hora
+ESQUEMAS_PLANILHAS = {
+    "39": {"data": "data", "codigo_cliente": "maiusculas", "numero_ordem_servico": "maiusculas"},
+    "60_venda": {"data_fechamento": "data"},
+}
+
+OPCOES_VALORES_CRUS = {
+    "valueRenderOption": "UNFORMATTED_VALUE",
+    "dateTimeRenderOption": "SERIAL_NUMBER",
+}
+
+# Dia 0 dos números de série de data do Sheets
+EPOCA_SHEETS = pd.Timestamp("1899-12-30")
+
+
+# ============================================================
+# Leitor resiliente
+# ============================================================
+def read_sheet_as_dataframe(sheet_key="60", start_row: int = 1):
+    """
+    Lê uma aba do Google Sheets e retorna como DataFrame.
+    
+    :param sheet_key: chave no sheet_map
+    :param start_row: linha inicial (1 = primeira linha da aba)
+
+    Passa pelo snapshot em disco (ver sheets_snapshot), compartilhado
+    com outros processos. Não há cache em memória na frente: o snapshot
+    é a única camada de validade.
+    """
+    versao = _sonda_versoes()
+
+    return obter_snapshot(
+        _nome_snapshot(sheet_key, start_row, "linhas"),
+        lambda: linhas_para_dataframe(_ler_aba(sheet_key, start_row, versao)),
+        lambda: versao(_resolver_planilha(sheet_key)[0]),
+    )
+
+
+def read_sheet_typed(sheet_key: str, start_row: int = 1) -> pd.DataFrame:
+    """
+    Lê uma aba com os valores crus (UNFORMATTED_VALUE / SERIAL_NUMBER) e
+    já converte as colunas pelo esquema declarado em ESQUEMAS_PLANILHAS.
+
+    Datas chegam como datetime64, números como float; o texto vem sem
+    espaços nas pontas. As páginas não precisam reconverter nada.
+
+    :param sheet_key: chave no sheet_map (precisa ter esquema)
+    :param start_row: linha do cabeçalho (1 = primeira linha da aba)
+    """
+    if sheet_key not in ESQUEMAS_PLANILHAS:
+        raise ValueError(f"Planilha sem esquema declarado: {sheet_key}")
+
+    versao = _sonda_versoes()
+
+    return obter_snapshot(
+        _nome_snapshot(sheet_key, start_row, "tipado"),
+        lambda: _ler_tipado(sheet_key, start_row, versao),
+        lambda: versao(_resolver_planilha(sheet_key)[0]),
+    )
+
+
+def _ler_tipado(sheet_key: str, start_row: int, versao: Callable[..., Optional[str]]) -> pd.DataFrame:
+    values = _ler_aba(sheet_key, start_row, versao, tipado=True)
+
+    campos = {}
+    if values and sheet_key in CAMPOS_PLANILHAS:
+        campos = resolver_campos(sheet_key, values[0])
+
+    df = linhas_para_dataframe_tipado(values, ESQUEMAS_PLANILHAS[sheet_key], campos)
+    df.attrs["campos"] = campos
+    return df
+
+
+def selecionar_campos(df: pd.DataFrame, campos: List[str]) -> pd.DataFrame:
+    """
+    Colunas dos campos lógicos de uma leitura tipada, renomeadas para os
+    nomes dos campos (posições resolvidas pelo cabeçalho, ver sheets_campos).
+    """
+    posicoes = df.attrs.get("campos", {})
+
+    faltantes = [campo for campo in campos if posicoes.get(campo, len(df.columns)) >= len(df.columns)]
+    if faltantes:
+        raise ValueError(f"Campos fora da aba: {', '.join(faltantes)}")
+
+    selecionado = df.iloc[:, [posicoes[campo] for campo in campos]].copy()
+    selecionado.columns = list(campos)
+    return selecionado
+
+
+def _ler_aba(
+    sheet_key: str,
+    start_row: int,
+    versao: Callable[..., Optional[str]],
+    tipado: bool = False,
+) -> list:
+    """
+    Linhas da aba (A:ZZ) a partir de start_row, via cache incremental.
+    versao: ver _sonda_versoes.
+    """
+    service = get_sheets_service()
+    spreadsheet_id, sheet_name = _resolver_planilha(sheet_key)
+    opcoes = OPCOES_VALORES_CRUS if tipado else {}
+
+    def buscar(deslocamento: int) -> list:
+        # lê a partir da linha start_row (+ linhas já sincronizadas)
+        range_str = f"'{sheet_name}'!A{start_row + deslocamento}:ZZ"
+        result = _executar_com_retry(
+            lambda: service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range=range_str,
+                **opcoes,
+            )
+        )
+        return result.get("values", [])
+
+    return _incremental.sincronizar(
+        ("tipado" if tipado else "linhas", spreadsheet_id, sheet_name, start_row),
+        buscar,
+        versao=versao(spreadsheet_id),
+    )
+
+
+def _nome_snapshot(sheet_key: str, start_row: int, tipo: str) -> str:
+    return f"{sheet_key}.{start_row}.{tipo}"
+
+
+def _ler_cabecalho(sheet_key: str, start_row: int) -> list:
+    """
+    Só a linha de cabeçalho (A:ZZ), para resolver os campos.
+    """
+    service = get_sheets_service()
+    spreadsheet_id, sheet_name = _resolver_planilha(sheet_key)
+
+    result = _executar_com_retry(
+        lambda: service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{sheet_name}'!A{start_row}:ZZ{start_row}",
+        )
+    )
+    return (result.get("values") or [[]])[0]
+
+
+# ============================================================
+# Leitor projetado (só as colunas usadas)
+# ============================================================
+def read_sheet_columns(sheet_key: str, colunas: tuple, start_row: int = 1) -> pd.DataFrame:
+    """
+    Lê apenas as colunas pedidas de uma aba, numa única chamada
+    values.batchGet (um range por coluna, ex.: 'Aba'!H1:H).
+
+    :param sheet_key: chave no sheet_map
+    :param colunas: letras das colunas, ex.: ("H", "I", "AH")
+    :param start_row: linha do cabeçalho (1 = primeira linha da aba)
+
+    As colunas saem na ordem pedida e as linhas mantêm a posição da aba,
+    como em read_sheet_as_dataframe (células vazias viram "").
+    """
+    return read_sheet_bundle(((sheet_key, colunas),), start_row)[sheet_key]
+
+
+# ============================================================
+# Leitura em lote (várias abas numa ida)
+# ============================================================
+def read_sheet_bundle(pedidos: tuple, start_row: int = 1) -> dict[str, pd.DataFrame]:
+    """
+    Lê um conjunto de abas/colunas de uma vez:
+    um values.batchGet por spreadsheet, spreadsheets diferentes em paralelo.
+
+    :param pedidos: ((sheet_key, (colunas...)), ...),
+                    ex.: (("51", ("H", "I")), ("60", ("D", "E")))
+    :param start_row: linha do cabeçalho, igual para todas as abas
+
+    Retorna {sheet_key: DataFrame} (como read_sheet_columns), só quando
+    todas as leituras dão certo; qualquer falha é relançada.
+
+    Cada aba tem seu snapshot em disco; só as vencidas são lidas.
+    """
+    colunas_por_nome = {
+        _nome_snapshot(sheet_key, start_row, "colunas-" + "-".join(colunas)): (sheet_key, colunas)
+        for sheet_key, colunas in _validar_pedidos(pedidos)
+    }
+    versao = _sonda_versoes()
+
+    def carregar(nomes: list) -> dict:
+        dados = _ler_bundle(tuple(colunas_por_nome[nome] for nome in nomes), start_row, versao)
+        return {nome: dados[colunas_por_nome[nome][0]] for nome in nomes}
+
+    snapshots = obter_snapshots(
+        list(colunas_por_nome),
+        carregar,
+        lambda nome: versao(_resolver_planilha(colunas_por_nome[nome][0])[0]),
+    )
+    return {colunas_por_nome[nome][0]: df for nome, df in snapshots.items()}
+
+
+def _validar_pedidos(pedidos: tuple) -> tuple:
+    """
+    ((sheet_key, (letras...)), ...) com as letras validadas; cada aba uma vez.
+    """
+    validados = []
+    vistos = set()
+
+    for sheet_key, colunas in pedidos:
+        if sheet_key in vistos:
+            raise ValueError(f"Planilha repetida no lote: {sheet_key}")
+        vistos.add(sheet_key)
+        validados.append((sheet_key, tuple(_validar_coluna(coluna) for coluna in colunas)))
+
+    return tuple(validados)
+
+
+def _ler_bundle(pedidos: tuple, start_row: int, versao: Callable[..., Optional[str]]) -> dict[str, pd.DataFrame]:
+    """
+    Leitura do lote, sem snapshot (usada por read_sheet_bundle e
+    read_sheet_fields, que cuidam dele).
+    versao: ver _sonda_versoes.
+    """
+    por_planilha: dict[str, list] = {}
+
+    for sheet_key, colunas in _validar_pedidos(pedidos):
+        spreadsheet_id, sheet_name = _resolver_planilha(sheet_key)
+        por_planilha.setdefault(spreadsheet_id, []).append((sheet_key, sheet_name, list(colunas)))
+
+    futuros = [
+        _pool_leitura.submit(
+            lambda sid=spreadsheet_id, abas=abas: _buscar_colunas(
+                _servico_da_thread(),
+                sid,
+                abas,
+                start_row,
+                versao(sid, _servico_da_thread("drive")),
+            )
+        )
+        for spreadsheet_id, abas in por_planilha.items()
+    ]
+
+    resultado: dict[str, pd.DataFrame] = {}
+    for futuro in futuros:
+        resultado.update(futuro.result())
+
+    return resultado
+
+
+def read_sheet_fields(pedidos: tuple, start_row: int = 1) -> dict[str, pd.DataFrame]:
+    """
+    Leitura em lote por campos lógicos (ver sheets_campos.CAMPOS_PLANILHAS).
+
+    :param pedidos: ((sheet_key, (campos...)), ...),
+                    ex.: (("51", ("codigo_cliente", "status")),)
+
+    Retorna {sheet_key: DataFrame} com as colunas nomeadas pelos campos.
+
+    Só as colunas resolvidas são pedidas (como em read_sheet_bundle). O cabeçalho
+    de cada uma vem junto e é conferido: se não bater (coluna inserida ou
+    movida) ou o campo nunca foi resolvido, lê a linha de cabeçalho,
+    resolve de novo e relê as abas afetadas.
+
+    Cada aba tem seu snapshot em disco; só as vencidas são lidas.
+    """
+    campos_por_nome = {
+        _nome_snapshot(sheet_key, start_row, "campos-" + "-".join(campos)): (sheet_key, tuple(campos))
+        for sheet_key, campos in pedidos
+    }
+    versao = _sonda_versoes()
+
+    def carregar(nomes: list) -> dict:
+        dados = _ler_campos(tuple(campos_por_nome[nome] for nome in nomes), start_row, versao)
+        return {nome: dados[campos_por_nome[nome][0]] for nome in nomes}
+
+    snapshots = obter_snapshots(
+        list(campos_por_nome),
+        carregar,
+        lambda nome: versao(_resolver_planilha(campos_por_nome[nome][0])[0]),
+    )
+    return {campos_por_nome[nome][0]: df for nome, df in snapshots.items()}
+
+
+def _ler_campos(pedidos: tuple, start_row: int, versao: Callable[..., Optional[str]]) -> dict[str, pd.DataFrame]:
+    for tentativa in range(2):
+        projecao = tuple(
+            (sheet_key, tuple(letras_campos(sheet_key, campos)))
+            for sheet_key, campos in pedidos
+        )
+        dados = _ler_bundle(projecao, start_row, versao)
+
+        divergentes = [
+            sheet_key
+            for sheet_key, campos in pedidos
+            if not conferir_cabecalhos(sheet_key, campos, dados[sheet_key].columns)
+        ]
+        if not divergentes or tentativa:
+            break
+
+        for sheet_key in divergentes:
+            resolver_campos(sheet_key, _ler_cabecalho(sheet_key, start_row))
+
+    resultado = {}
+    for sheet_key, campos in pedidos:
+        df = dados[sheet_key]
+        if df.empty and len(df.columns) == 0:
+            df = pd.DataFrame(columns=list(campos))
+        else:
+            df.columns = list(campos)
+        resultado[sheet_key] = df
+
+    return resultado
+
+
+def _buscar_colunas(
+    service,
+    spreadsheet_id: str,
+    abas: list,
+    start_row: int,
+    versao: Optional[str],
+) -> dict[str, pd.DataFrame]:
+    """
+    Um values.batchGet com as colunas de todas as abas do spreadsheet.
+    abas: [(sheet_key, nome da aba, [letras])]
+
+    Cada coluna é uma entrada do cache incremental (células da coluna,
+    cabeçalho incluído), então a resposta em colunas é usada direto,
+    sem transpor para linhas. Se o spreadsheet não mudou (modifiedTime),
+    nem chama o batchGet; se a sobreposição de alguma coluna não bateu,
+    um segundo batchGet relê só essas colunas inteiras.
+    versao: modifiedTime já consultado pelo chamador.
+    """
+    chaves = [
+        [("coluna", spreadsheet_id, sheet_name, start_row, coluna) for coluna in colunas]
+        for _, sheet_name, colunas in abas
+    ]
+
+    em_cache = [[_incremental.atual(chave, versao) for chave in chaves_aba] for chaves_aba in chaves]
+    if all(celulas is not None for colunas in em_cache for celulas in colunas):
+        return {
+            sheet_key: colunas_para_dataframe(colunas)
+            for (sheet_key, _, _), colunas in zip(abas, em_cache)
+        }
+
+    pendentes = [
+        (chave, sheet_name, coluna, _incremental.deslocamento(chave))
+        for (_, sheet_name, colunas), chaves_aba in zip(abas, chaves)
+        for coluna, chave in zip(colunas, chaves_aba)
+    ]
+    celulas: dict = {}
+
+    # Segunda volta só para colunas cuja sobreposição não bateu
+    # (linha inserida/apagada no meio): relidas inteiras
+    while pendentes:
+        lidas = _ler_ranges_colunas(
+            service,
+            spreadsheet_id,
+            [f"'{sheet_name}'!{coluna}{start_row + deslocamento}:{coluna}"
+             for _, sheet_name, coluna, deslocamento in pendentes],
+        )
+
+        releitura = []
+        for (chave, sheet_name, coluna, deslocamento), valores in zip(pendentes, lidas):
+            celulas[chave] = _incremental.aplicar(chave, deslocamento, valores, versao=versao)
+            if celulas[chave] is None:
+                releitura.append((chave, sheet_name, coluna, 0))
+        pendentes = releitura
+
+    return {
+        sheet_key: colunas_para_dataframe([celulas[chave] for chave in chaves_aba])
+        for (sheet_key, _, _), chaves_aba in zip(abas, chaves)
+    }
+
+
+def _ler_ranges_colunas(service, spreadsheet_id: str, ranges: list) -> list:
+    """
+    Células de cada range (uma coluna cada), na ordem dos ranges.
+    """
+    result = _executar_com_retry(
+        lambda: service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges,
+            majorDimension="COLUMNS",
+        )
+    )
+
+    # valueRanges volta na mesma ordem de ranges
+    value_ranges = iter(result.get("valueRanges", []))
+    return [(next(value_ranges, {}).get("values") or [[]])[0] for _ in ranges]
+
+
+def colunas_para_dataframe(colunas: List[List[str]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame a partir de colunas (cabeçalho + valores), direto da
+    resposta em COLUMNS: cada coluna vira um array do Arrow, sem transpor.
+    A API omite as células vazias do fim de cada coluna: completa com "".
+    """
+    if not colunas:
+        return pd.DataFrame()
+
+    headers = normalize_headers([coluna[0] if coluna else "" for coluna in colunas])
+    num_linhas = max(len(coluna) for coluna in colunas) - 1
+
+    if num_linhas < 0:
+        return pd.DataFrame()
+
+    dados = {
+        header: pd.arrays.ArrowStringArray(
+            pa.array(coluna[1:] + [""] * (num_linhas - max(len(coluna) - 1, 0)), pa.string())
+        )
+        for header, coluna in zip(headers, colunas)
+    }
+
+    return pd.DataFrame(dados, columns=headers, copy=False)
+
+
+def _validar_coluna(coluna: str) -> str:
+    coluna = coluna.strip().upper()
+
+    if not re.fullmatch(r"[A-Z]{1,3}", coluna):
+        raise ValueError(f"Coluna inválida: {coluna}")
+
+    return coluna
+
+
+# ============================================================
+# Montagem do DataFrame
+# ============================================================
+# Texto das planilhas em strings do Arrow: bem menos memória que objetos
+# Python e .str.* vetorizado
+TIPO_TEXTO = pd.StringDtype("pyarrow")
+
+
+def linhas_para_dataframe(values: List[List[str]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame a partir das linhas da API (primeira = cabeçalho),
+    coluna a coluna, sem completar/copiar cada linha em Python.
+
+    Todas as células vão para um único array do Arrow; cada coluna é um
+    take() por posição (início da linha + índice da coluna). Células que a
+    API omite no fim das linhas viram ""; as além do cabeçalho são ignoradas.
+    Colunas saem como string[pyarrow].
+    """
     if not values:
         return pd.DataFrame()
 
     headers = normalize_headers(values[0])
-    rows = values[1:]
-    num_cols = len(headers)
+    linhas = values[1:]
 
-    normalized_rows = [
-        row[:num_cols] + [""] * (num_cols - len(row))
-        for row in rows
-    ]
+    tamanhos = np.fromiter(map(len, linhas), dtype=np.int64, count=len(linhas))
+    inicios = np.zeros(len(linhas), dtype=np.int64)
+    np.cumsum(tamanhos[:-1], out=inicios[1:])
+
+    # "" no fim do array: posição usada para as células faltantes
+    celulas = pa.array(list(chain(chain.from_iterable(linhas), [""])), pa.string())
+    vazia = len(celulas) - 1
+
+    dados = {
+        header: pd.arrays.ArrowStringArray(
+            celulas.take(np.where(tamanhos > i, inicios + i, vazia))
+        )
+        for i, header in enumerate(headers)
+    }
+
+    return pd.DataFrame(dados, columns=headers, copy=False)
+
+
+def linhas_para_dataframe_tipado(
+    values: list,
+    esquema: dict,
+    campos: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Como linhas_para_dataframe, para valores crus (str, int, float, bool)
+    e convertendo cada coluna pelo tipo do esquema.
 
-    return pd.DataFrame(normalized_rows, columns=headers)
+    campos: {campo: posição} já resolvidos, para esquemas por campo.
+    """
+    if not values:
+        return pd.DataFrame()
+
+    headers = normalize_headers([_texto_celula(celula) for celula in values[0]])
+    linhas = values[1:]
+
+    tipos = {}
+    for coluna, tipo in esquema.items():
+        posicao = _posicao_coluna(coluna, headers, campos or {})
+        if posicao is not None:
+            tipos[posicao] = tipo
+
+    tamanhos = np.fromiter(map(len, linhas), dtype=np.int64, count=len(linhas))
+    inicios = np.zeros(len(linhas), dtype=np.int64)
+    np.cumsum(tamanhos[:-1], out=inicios[1:])
+
+    total = int(tamanhos.sum())
+    celulas = np.fromiter(
+        chain(chain.from_iterable(linhas), [""]), dtype=object, count=total + 1
+    )
+    vazia = total
+
+    dados = {
+        header: _converter_coluna(
+            celulas[np.where(tamanhos > i, inicios + i, vazia)],
+            tipos.get(i, "texto"),
+        )
+        for i, header in enumerate(headers)
+    }
+
+    return pd.DataFrame(dados, columns=headers, copy=False)
+
+
+def _converter_coluna(valores: np.ndarray, tipo: str):
+    if tipo in ("texto", "maiusculas"):
+        try:
+            texto = pa.array(valores, pa.string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Números/booleanos no meio do texto
+            texto = pa.array([_texto_celula(valor) for valor in valores], pa.string())
+
+        serie = pd.Series(pd.arrays.ArrowStringArray(texto)).str.strip()
+        return serie.str.upper() if tipo == "maiusculas" else serie
+
+    serie = pd.Series(valores)
+    numeros = pd.to_numeric(serie, errors="coerce")
+
+    if tipo == "numero":
+        return numeros.astype("float64")
+
+    if tipo in ("data", "data_hora"):
+        # Série = dias desde 1899-12-30; arredonda no segundo (float)
+        datas = EPOCA_SHEETS + pd.to_timedelta((numeros * 86400).round(), unit="s")
+
+        # Datas digitadas como texto no Sheets ("12/02/2026") não viram série
+        textos = numeros.isna() & serie.notna() & (serie != "")
+        if textos.any():
+            datas[textos] = pd.to_datetime(
+                serie[textos].astype(str).str.strip(),
+                dayfirst=True,
+                format="mixed",
+                errors="coerce",
+            )
+
+        return datas.dt.floor("D") if tipo == "data" else datas
+
+    raise ValueError(f"Tipo de coluna inválido no esquema: {tipo}")
+
+
+def _texto_celula(valor) -> str:
+    """
+    Valor cru como o Sheets mostraria sem formatação.
+    """
+    if isinstance(valor, str):
+        return valor
+    if isinstance(valor, bool):
+        return "TRUE" if valor else "FALSE"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if valor is None:
+        return ""
+    return str(valor)
+
+
+def _posicao_coluna(coluna: str, headers: List[str], campos: dict):
+    """
+    Coluna do esquema (campo, cabeçalho ou letra) -> posição no DataFrame.
+    """
+    if coluna in campos:
+        posicao = campos[coluna]
+    elif coluna in headers:
+        posicao = headers.index(coluna)
+    elif re.fullmatch(r"[A-Z]{1,3}", coluna):
+        posicao = indice_coluna(coluna)
+    else:
+        return None
 
+    return posicao if posicao < len(headers) else None
 
 
 # ============================================================
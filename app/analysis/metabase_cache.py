@@ -0,0 +1,200 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from app.config import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+# Hoje e ontem ainda mudam no Metabase: expiram após este TTL (segundos)
+TTL_DIAS_RECENTES = 900
+
+# Consultas simultâneas de dias faltantes
+MAX_CONCORRENCIA = 4
+
+ConsultaCard = Callable[[str, str, date, date], pd.DataFrame]
+
+
+def cache_local_habilitado() -> bool:
+    """
+    Desligável com METABASE_CACHE_LOCAL=0.
+    """
+    valor = os.getenv("METABASE_CACHE_LOCAL", "1").strip().lower()
+    return valor not in {"0", "false", "nao", "não"}
+
+
+def _ttl_recente() -> float:
+    try:
+        return float(os.getenv("METABASE_CACHE_TTL_RECENTE", TTL_DIAS_RECENTES))
+    except ValueError:
+        return TTL_DIAS_RECENTES
+
+
+# ======================================================
+# CARGA POR DIA
+# ======================================================
+def carregar_card_por_dia(
+    conta: str,
+    tipo_relatorio: str,
+    data_inicio: date,
+    data_fim: date,
+    consultar: ConsultaCard,
+    hoje: Optional[date] = None,
+    max_concorrencia: int = MAX_CONCORRENCIA,
+    variante: str = "",
+) -> pd.DataFrame:
+    """
+    Resultado do card no período, montado a partir de fatias diárias em
+    Parquet (<data_dir>/metabase/<conta>/<tipo>/<AAAA-MM-DD>.parquet).
+
+    Fatias gravadas depois do fim do dia seguinte são definitivas; hoje,
+    ontem e datas futuras expiram após METABASE_CACHE_TTL_RECENTE, e fatias
+    antigas gravadas com o dia ainda aberto são buscadas de novo. Só os dias ausentes ou expirados são
+    consultados (`consultar(conta, tipo, dia, dia)`), em paralelo.
+
+    `variante` separa resultados da mesma consulta com filtros diferentes.
+
+    Se a consulta de um dia expirado falhar, a cópia antiga é usada e o dia
+    aparece em df.attrs["dias_desatualizados"]. Dias sem cópia relançam o erro.
+    """
+    hoje = hoje or date.today()
+    pasta = _pasta_card(conta, tipo_relatorio, variante)
+    dias = [data_inicio + timedelta(days=i) for i in range((data_fim - data_inicio).days + 1)]
+
+    faltantes = [dia for dia in dias if not _fatia_valida(pasta / f"{dia}.parquet", dia, hoje)]
+    desatualizados: list[date] = []
+
+    if faltantes:
+        logger.info(
+            "Consultando dias ausentes no cache do Metabase",
+            extra={
+                "conta": conta,
+                "tipo_relatorio": tipo_relatorio,
+                "dias": len(faltantes),
+                "total_dias": len(dias),
+            },
+        )
+        desatualizados = _buscar_dias(
+            conta, tipo_relatorio, faltantes, consultar, pasta, max_concorrencia
+        )
+
+    fatias = [pd.read_parquet(pasta / f"{dia}.parquet") for dia in dias]
+    fatias = [df for df in fatias if not df.empty]
+
+    df = pd.concat(fatias, ignore_index=True) if fatias else pd.DataFrame()
+    df.attrs["dias_desatualizados"] = desatualizados
+
+    return df
+
+
+def limpar_cache_card(conta: str, tipo_relatorio: str) -> None:
+    """
+    Remove todas as fatias do card, de todas as variantes
+    (ex.: depois de mudar a query no Metabase).
+    """
+    for arquivo in _pasta_card(conta, tipo_relatorio).rglob("*.parquet"):
+        arquivo.unlink(missing_ok=True)
+
+
+# ======================================================
+# UTIL
+# ======================================================
+def _pasta_card(conta: str, tipo_relatorio: str, variante: str = "") -> Path:
+    pasta = get_data_dir() / "metabase" / conta.lower() / tipo_relatorio.lower()
+    if variante:
+        pasta = pasta / variante
+    pasta.mkdir(parents=True, exist_ok=True)
+    return pasta
+
+
+def _fatia_valida(caminho: Path, dia: date, hoje: date) -> bool:
+    """
+    Fatia gravada depois do fim de `dia + 1` é definitiva. Gravada antes
+    (o dia ainda estava aberto), vale pelo TTL enquanto o dia é recente
+    e, passado isso, precisa ser buscada de novo.
+    """
+    if not caminho.exists():
+        return False
+
+    gravada_em = caminho.stat().st_mtime
+    fim_do_dia_seguinte = datetime.combine(dia + timedelta(days=2), dt_time.min).timestamp()
+
+    if gravada_em >= fim_do_dia_seguinte:
+        return True
+
+    if dia < hoje - timedelta(days=1):
+        return False
+
+    return time.time() - gravada_em < _ttl_recente()
+
+
+def _buscar_dias(
+    conta: str,
+    tipo_relatorio: str,
+    dias: list[date],
+    consultar: ConsultaCard,
+    pasta: Path,
+    max_concorrencia: int,
+) -> list[date]:
+    """
+    Consulta e grava cada dia. Dias que deram certo ficam gravados mesmo
+    se outro falhar.
+
+    Retorna os dias que falharam mas têm cópia anterior em disco.
+    Se algum dia falhar sem cópia, relança a falha.
+    """
+
+    def buscar(dia: date) -> None:
+        df = consultar(conta, tipo_relatorio, dia, dia)
+        _gravar_fatia(df, pasta / f"{dia}.parquet")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concorrencia)) as pool:
+        futuros = [pool.submit(buscar, dia) for dia in dias]
+
+    erros = {dia: f.exception() for dia, f in zip(dias, futuros) if f.exception() is not None}
+
+    sem_copia = [dia for dia in erros if not (pasta / f"{dia}.parquet").exists()]
+    if sem_copia:
+        raise erros[sem_copia[0]]
+
+    if erros:
+        logger.warning(
+            "Falha ao atualizar dias do Metabase; usando cópia local",
+            extra={
+                "conta": conta,
+                "tipo_relatorio": tipo_relatorio,
+                "dias": [str(dia) for dia in erros],
+                "erro": str(next(iter(erros.values()))),
+            },
+        )
+
+    return sorted(erros)
+
+
+def _gravar_fatia(df: pd.DataFrame, caminho: Path) -> None:
+    """
+    Escrita atômica (arquivo temporário + rename).
+    Colunas com tipos misturados no JSON viram texto.
+    """
+    temporario = caminho.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        df.to_parquet(temporario, index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for coluna in df.select_dtypes(include="object").columns:
+            df[coluna] = df[coluna].astype("string")
+        df.to_parquet(temporario, index=False)
+
+    os.replace(temporario, caminho)
@@ -0,0 +1,173 @@
+from datetime import date
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from app.analysis.metabase_service import (
+    carregar_relatorio_metabase,
+    dividir_filtros,
+    filtrar_localmente,
+)
+from app.utils.cache_swr import CacheSWR, marcar_atualizacao
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+# Após este tempo (s) o dataset é servido como está e recarregado em segundo plano
+TTL_DATASET = 900
+
+# Quantidade máxima de (conta, card, período) mantidos no processo
+MAX_DATASETS = 16
+
+_cache = CacheSWR(ttl=TTL_DATASET, max_itens=MAX_DATASETS, nome="metabase_datasets")
+
+
+# ======================================================
+# API
+# ======================================================
+def carregar_dataset_metabase(
+    contas: Iterable[str],
+    tipo_relatorio: str,
+    data_inicio: date,
+    data_fim: date,
+    tipos_os: Optional[Iterable[str]] = None,
+    cidades: Optional[Iterable[str]] = None,
+    usuarios: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Dataset normalizado de um card do Metabase para as contas.
+    Filtros opcionais que o card aceita seguem para o Metabase (pushdown) e
+    fazem parte da chave do cache; os demais são aplicados aqui, sobre o
+    dataset compartilhado, para que páginas com filtros diferentes usem a
+    mesma carga.
+
+    Cada (conta, card, período) é carregado e normalizado uma única vez por
+    processo e compartilhado entre as páginas. Cada chamada recebe a sua
+    cópia: alterar valores no lugar (df.loc[...] = ..., inplace=True) não
+    afeta o dataset das outras páginas.
+
+    Vencido o TTL, o dataset antigo volta na hora e é recarregado em
+    segundo plano (stale-while-revalidate). df.attrs["atualizado_em"] traz
+    o horário da carga (o mais antigo entre as contas).
+    """
+    solicitados = {
+        nome: sorted(set(valores))
+        for nome, valores in (
+            ("tipos_os", tipos_os),
+            ("cidades", cidades),
+            ("usuarios", usuarios),
+        )
+        if valores
+    }
+
+    cargas = []
+    for conta in contas:
+        no_servidor, locais = dividir_filtros(conta, tipo_relatorio, solicitados)
+        filtros = tuple((nome, tuple(valores)) for nome, valores in sorted(no_servidor.items()))
+
+        df, carregado_em = _dataset_conta(
+            conta.lower(), tipo_relatorio.lower(), data_inicio, data_fim, filtros
+        )
+        cargas.append((filtrar_localmente(df, locais), carregado_em))
+
+    if not cargas:
+        return pd.DataFrame()
+
+    carregado_em = min(momento for _, momento in cargas)
+    dfs = [df for df, _ in cargas if not df.empty]
+
+    if not dfs:
+        return marcar_atualizacao(pd.DataFrame(), carregado_em)
+
+    if len(dfs) == 1:
+        return marcar_atualizacao(dfs[0], carregado_em)
+
+    df = pd.concat(dfs, ignore_index=True)
+    # concat só mantém attrs iguais em todas as partes
+    df.attrs["dias_desatualizados"] = sorted(
+        {dia for parte in dfs for dia in parte.attrs.get("dias_desatualizados", [])}
+    )
+    # concat já copiou os dados
+    return marcar_atualizacao(df, carregado_em, copiar=False)
+
+
+def carregar_fechamento_contas(
+    contas: Iterable[str],
+    data_inicio: date,
+    data_fim: date,
+    **filtros,
+) -> pd.DataFrame:
+    return carregar_dataset_metabase(contas, "fechamento", data_inicio, data_fim, **filtros)
+
+
+def limpar_datasets() -> None:
+    _cache.limpar()
+
+
+# ======================================================
+# CACHE EM MEMÓRIA
+# ======================================================
+def _dataset_conta(
+    conta: str,
+    tipo_relatorio: str,
+    data_inicio: date,
+    data_fim: date,
+    filtros: tuple = (),
+) -> tuple[pd.DataFrame, float]:
+    chave = (conta, tipo_relatorio, data_inicio, data_fim, filtros)
+
+    return _cache.obter(
+        chave,
+        lambda: _carregar_normalizado(conta, tipo_relatorio, data_inicio, data_fim, filtros),
+    )
+
+
+def _carregar_normalizado(
+    conta: str,
+    tipo_relatorio: str,
+    data_inicio: date,
+    data_fim: date,
+    filtros: tuple = (),
+) -> pd.DataFrame:
+    df = carregar_relatorio_metabase(
+        conta,
+        tipo_relatorio,
+        data_inicio,
+        data_fim,
+        **{nome: list(valores) for nome, valores in filtros},
+    )
+
+    if df.empty:
+        return df
+
+    return normalizar_dataset(df, conta)
+
+
+# ======================================================
+# NORMALIZAÇÃO
+# ======================================================
+def normalizar_dataset(df: pd.DataFrame, conta: str) -> pd.DataFrame:
+    """
+    - data_*: datetime (datas do Metabase vêm em dd/mm/aaaa)
+    - colunas de texto: sem espaços nas pontas
+    - cidade: Title Case
+    - conta: minúscula, como as páginas usam
+    """
+    for coluna in df.columns:
+        serie = df[coluna]
+
+        if coluna.startswith("data_"):
+            df[coluna] = pd.to_datetime(serie, dayfirst=True, errors="coerce")
+        elif _e_texto(serie):
+            df[coluna] = serie.str.strip()
+
+    if "cidade" in df.columns and _e_texto(df["cidade"]):
+        df["cidade"] = df["cidade"].str.title()
+
+    df["conta"] = conta.lower()
+
+    return df
+
+
+def _e_texto(serie: pd.Series) -> bool:
+    return serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) == "string"
@@ -1,15 +1,140 @@
+import csv
+import hashlib
+import io
 import json
+import logging
+import threading
+import time
 import urllib.parse
+from functools import partial
+from typing import Optional
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from requests.adapters import HTTPAdapter
 
+from app.analysis.metabase_cache import cache_local_habilitado, carregar_card_por_dia
 from app.config import get_metabase_config
+from app.utils.json_rapido import decodificar_resposta
+from app.utils.resiliencia import (
+    STATUS_RETENTAVEIS,
+    CircuitBreaker,
+    CircuitoAberto,
+    calcular_backoff,
+    ler_retry_after,
+)
+from app.utils.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONEXÃO
+# ======================================================
+# (conexão, leitura) em segundos
+TIMEOUT = (5, 60)
+
+MAX_TENTATIVAS = 3
+
+# Falhas seguidas que abrem o circuito e quanto tempo ele fica aberto (s)
+LIMITE_FALHAS_CIRCUITO = 5
+TEMPO_CIRCUITO_ABERTO = 30
+
+_sessoes: dict[str, requests.Session] = {}
+_circuitos: dict[str, CircuitBreaker] = {}
+_conexao_lock = threading.Lock()
+
+
+class MetabaseIndisponivel(Exception):
+    """
+    Falha ao consultar um card (rede, HTTP ou circuito aberto).
+    """
+
+    def __init__(
+        self,
+        conta: str,
+        tipo_relatorio: str,
+        causa: Exception,
+        duracao_s: float,
+        tentativas: int,
+        status: Optional[int] = None,
+    ) -> None:
+        self.conta = conta
+        self.tipo_relatorio = tipo_relatorio
+        self.causa = causa
+        self.duracao_s = duracao_s
+        self.tentativas = tentativas
+        self.status = status
+        self.circuito_aberto = isinstance(causa, CircuitoAberto)
+
+        super().__init__(
+            f"Metabase indisponível ({conta.upper()} / {tipo_relatorio}): {causa} "
+            f"[{tentativas} tentativa(s), {duracao_s:.1f}s]"
+        )
+
+
+def _sessao(base_url: str) -> requests.Session:
+    """
+    Sessão keep-alive compartilhada por base URL.
+    """
+    with _conexao_lock:
+        sessao = _sessoes.get(base_url)
+        if sessao is None:
+            sessao = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10)
+            sessao.mount("https://", adapter)
+            sessao.mount("http://", adapter)
+            _sessoes[base_url] = sessao
+        return sessao
+
+
+def _circuito(base_url: str) -> CircuitBreaker:
+    with _conexao_lock:
+        circuito = _circuitos.get(base_url)
+        if circuito is None:
+            circuito = CircuitBreaker(
+                base_url,
+                limite_falhas=LIMITE_FALHAS_CIRCUITO,
+                tempo_aberto=TEMPO_CIRCUITO_ABERTO,
+            )
+            _circuitos[base_url] = circuito
+        return circuito
+
+
+# ======================================================
+# FILTROS
+# ======================================================
+# Formatos de exportação do card público
+FORMATOS_EXPORTACAO = ("json", "csv")
+
+# Filtro lógico -> coluna do resultado (usada quando o card não aceita o filtro)
+COLUNAS_FILTRO = {
+    "tipos_os": "tipo_ordem_servico",
+    "cidades": "cidade",
+    "usuarios": "usuario_fechamento",
+}
+
+
+# Colunas do CSV lidas sempre como texto (códigos, não quantidades)
+PREFIXOS_IDENTIFICADORES = ("numero_", "id_", "codigo_", "cod_")
+COLUNAS_IDENTIFICADORES = {"cep", "cpf", "cnpj", "cpf_cnpj", "telefone", "celular"}
 
 
 # ======================================================
 # UTIL
 # ======================================================
-def _montar_url(base_url: str, card_id: str, data_inicio, data_fim) -> str:
+def _montar_url(
+    base_url: str,
+    card_id: str,
+    data_inicio,
+    data_fim,
+    filtros: Optional[dict] = None,
+    formato: str = "json",
+) -> str:
+    """
+    filtros: {template tag: [valores]}. Vão como field filter
+    (dimension, "string/="), que aceita lista de valores.
+    """
     parameters = [
         {
             "type": "date/single",
@@ -23,9 +148,48 @@ def _montar_url(base_url: str, card_id: str, data_inicio, data_fim) -> str:
         },
     ]
 
+    for tag, valores in (filtros or {}).items():
+        parameters.append(
+            {
+                "type": "string/=",
+                "value": list(valores),
+                "target": ["dimension", ["template-tag", tag]],
+            }
+        )
+
     params_str = urllib.parse.quote(json.dumps(parameters))
 
-    return f"{base_url}/api/public/card/{card_id}/query/json?parameters={params_str}"
+    return f"{base_url}/api/public/card/{card_id}/query/{formato}?parameters={params_str}"
+
+
+def csv_para_dataframe(conteudo: bytes) -> pd.DataFrame:
+    """
+    Lê a exportação CSV do card com o leitor colunar do pyarrow
+    (sem dicts intermediários). Células vazias viram nulo, como no JSON.
+
+    Identificadores (ver _e_identificador) são lidos como texto, como no
+    JSON: a inferência tiraria zeros à esquerda ("06908412" -> 6908412) e
+    viraria float nas colunas com nulos ("20262" -> 20262.0).
+    """
+    if not conteudo.strip():
+        return pd.DataFrame()
+
+    cabecalho = conteudo.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+    colunas = next(csv.reader([cabecalho]), [])
+
+    tabela = pa_csv.read_csv(
+        io.BytesIO(conteudo),
+        convert_options=pa_csv.ConvertOptions(
+            strings_can_be_null=True,
+            column_types={coluna: pa.string() for coluna in colunas if _e_identificador(coluna)},
+        ),
+    )
+    return tabela.to_pandas()
+
+
+def _e_identificador(coluna: str) -> bool:
+    nome = coluna.strip().lower()
+    return nome.startswith(PREFIXOS_IDENTIFICADORES) or nome in COLUNAS_IDENTIFICADORES
 
 
 # ======================================================
@@ -36,56 +200,274 @@ def carregar_relatorio_metabase(
     tipo_relatorio: str,
     data_inicio,
     data_fim,
+    usar_cache: bool = True,
+    tipos_os: Optional[list[str]] = None,
+    cidades: Optional[list[str]] = None,
+    usuarios: Optional[list[str]] = None,
+    formato: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     conta: 'mania' ou 'amazonet'
     tipo_relatorio: 'fechamento', 'qualidade', 'fila', etc
-    """
+    tipos_os / cidades / usuarios: filtros opcionais. Os que o card aceita
+    ({CONTA}_CARD_{TIPO}_FILTROS) são aplicados no Metabase; os demais,
+    localmente sobre o resultado (que é o mesmo da consulta sem eles).
+    formato: 'json' ou 'csv' (padrão: {CONTA}_CARD_{TIPO}_FORMATO, ou json).
 
+    Com usar_cache, o período é montado a partir do cache diário em disco
+    (ver metabase_cache) e só os dias ausentes são consultados.
+
+    Levanta MetabaseIndisponivel se o Metabase falhar e não houver cópia
+    local (nem desatualizada) do período.
+    """
     tipo_relatorio = tipo_relatorio.lower()
+
+    solicitados = {
+        nome: sorted(set(valores))
+        for nome, valores in (
+            ("tipos_os", tipos_os),
+            ("cidades", cidades),
+            ("usuarios", usuarios),
+        )
+        if valores
+    }
+    no_servidor, locais = dividir_filtros(conta, tipo_relatorio, solicitados)
+    formato = resolver_formato(conta, tipo_relatorio, formato)
+
+    df = _carregar_card(conta, tipo_relatorio, data_inicio, data_fim, usar_cache, no_servidor, formato)
+    df = filtrar_localmente(df, locais)
+
+    return pd.DataFrame() if df.empty else df
+
+
+def resolver_formato(conta: str, tipo_relatorio: str, formato: Optional[str] = None) -> str:
+    """
+    Formato de exportação efetivo: o pedido, o do card
+    ({CONTA}_CARD_{TIPO}_FORMATO) ou json.
+    """
+    config = get_metabase_config(conta)
+    formato = (formato or config.formatos.get(tipo_relatorio.lower()) or "json").lower()
+
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+    return formato
+
+
+def dividir_filtros(conta: str, tipo_relatorio: str, filtros: dict) -> tuple[dict, dict]:
+    """
+    {filtro: valores} -> (aceitos pelo card, a aplicar localmente).
+    """
+    if not filtros:
+        return {}, {}
+
+    tags_card = get_metabase_config(conta).filtros.get(tipo_relatorio.lower(), {})
+    no_servidor = {nome: v for nome, v in filtros.items() if nome in tags_card}
+    locais = {nome: v for nome, v in filtros.items() if nome not in tags_card}
+    return no_servidor, locais
+
+
+def filtrar_localmente(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
+    """
+    Aplica {filtro: valores} sobre o resultado. Os dois lados são comparados
+    sem espaços nas pontas, como as páginas normalizam.
+    """
+    for nome, valores in filtros.items():
+        coluna = COLUNAS_FILTRO[nome]
+        if df.empty or coluna not in df.columns:
+            continue
+        aceitos = {str(valor).strip() for valor in valores}
+        df = df[df[coluna].astype("string").str.strip().isin(aceitos)]
+
+    return df.reset_index(drop=True) if filtros else df
+
+
+@single_flight
+def _carregar_card(
+    conta: str,
+    tipo_relatorio: str,
+    data_inicio,
+    data_fim,
+    usar_cache: bool,
+    filtros: dict,
+    formato: str,
+) -> pd.DataFrame:
+    """
+    Resultado do card com os filtros aceitos por ele ({filtro: valores}).
+    Chamadas iguais em andamento compartilham a mesma consulta.
+    """
     config = get_metabase_config(conta)
 
-    card_id = config.cards.get(tipo_relatorio)
-    if not card_id:
+    if not config.cards.get(tipo_relatorio):
         raise ValueError(
             f"Relatório '{tipo_relatorio}' não configurado para a conta {conta.upper()}"
         )
 
-    url = _montar_url(config.base_url, card_id, data_inicio, data_fim)
+    tags_card = config.filtros.get(tipo_relatorio, {})
+    no_servidor = {tags_card[nome]: valores for nome, valores in filtros.items()}
+
+    consultar = partial(_consultar_card, filtros=no_servidor, formato=formato)
 
-    try:
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        data = response.json()
+    if usar_cache and cache_local_habilitado():
+        df = carregar_card_por_dia(
+            conta,
+            tipo_relatorio,
+            data_inicio,
+            data_fim,
+            consultar,
+            variante=_variante_filtros(no_servidor, formato),
+        )
+    else:
+        df = consultar(conta, tipo_relatorio, data_inicio, data_fim)
+
+    if df.empty:
+        return pd.DataFrame()
 
-        if not data:
-            return pd.DataFrame()
+    df["conta"] = conta.upper()
+    df["tipo_relatorio"] = tipo_relatorio.upper()
 
-        df = pd.DataFrame(data)
-        df["conta"] = conta.upper()
-        df["tipo_relatorio"] = tipo_relatorio.upper()
+    return df
 
-        return df
 
-    except Exception as e:
-        print("======================================")
-        print(f"[ERRO METABASE - {conta.upper()} - {tipo_relatorio.upper()}]")
-        print("URL:", url)
-        print("ERRO:", e)
-        print("======================================")
+def _consultar_card(
+    conta: str,
+    tipo_relatorio: str,
+    data_inicio,
+    data_fim,
+    filtros: Optional[dict] = None,
+    formato: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Consulta direta ao card público.
+    Falhas de rede/HTTP saem como MetabaseIndisponivel.
+    """
+    config = get_metabase_config(conta)
+    card_id = config.cards[tipo_relatorio]
+    formato = resolver_formato(conta, tipo_relatorio, formato)
+
+    url = _montar_url(config.base_url, card_id, data_inicio, data_fim, filtros, formato)
+    response = _get_resiliente(conta, tipo_relatorio, config.base_url, url)
+
+    if formato == "csv":
+        return csv_para_dataframe(response.content)
+
+    data = decodificar_resposta(response)
+
+    if not data:
         return pd.DataFrame()
 
+    return pd.DataFrame(data)
+
+
+def _get_resiliente(conta: str, tipo_relatorio: str, base_url: str, url: str) -> requests.Response:
+    """
+    GET com sessão keep-alive, retry com backoff em 429/5xx/rede e
+    circuit breaker por base URL.
+    """
+    circuito = _circuito(base_url)
+    inicio = time.monotonic()
+    status = None
+
+    for tentativa in range(MAX_TENTATIVAS):
+        try:
+            circuito.verificar()
+        except CircuitoAberto as e:
+            raise MetabaseIndisponivel(
+                conta, tipo_relatorio, e, time.monotonic() - inicio, tentativa
+            ) from e
+
+        response = None
+        try:
+            response = _sessao(base_url).get(url, timeout=TIMEOUT)
+            status = response.status_code
+            response.raise_for_status()
+            circuito.registrar_sucesso()
+            return response
+
+        except requests.RequestException as e:
+            erro = e
+            retentavel = response is None or status in STATUS_RETENTAVEIS
+
+            # 4xx (exceto 429) é erro de configuração, não indisponibilidade
+            if retentavel:
+                circuito.registrar_falha()
+            else:
+                circuito.registrar_sucesso()
+            if not retentavel or tentativa + 1 >= MAX_TENTATIVAS:
+                break
+
+            retry_after = (
+                ler_retry_after(response.headers.get("Retry-After"))
+                if response is not None
+                else None
+            )
+            espera = calcular_backoff(tentativa, base=1.0, teto=10.0, retry_after=retry_after)
+
+            logger.warning(
+                "Consulta ao Metabase falhou, nova tentativa",
+                extra={
+                    "conta": conta,
+                    "tipo_relatorio": tipo_relatorio,
+                    "status": status,
+                    "erro": str(e),
+                    "tentativa": tentativa + 1,
+                    "espera": round(espera, 2),
+                },
+            )
+            time.sleep(espera)
+
+        except Exception:
+            # Erro inesperado também conta: senão a chamada de teste do
+            # circuito meio-aberto nunca termina e ele fica aberto para sempre
+            circuito.registrar_falha()
+            raise
+
+    falha = MetabaseIndisponivel(
+        conta,
+        tipo_relatorio,
+        erro,
+        time.monotonic() - inicio,
+        tentativa + 1,
+        status,
+    )
+    logger.error(
+        "Metabase indisponível",
+        extra={
+            "conta": conta,
+            "tipo_relatorio": tipo_relatorio,
+            "status": status,
+            "duracao_s": round(falha.duracao_s, 2),
+            "tentativas": falha.tentativas,
+        },
+    )
+    raise falha from erro
+
+
+def _variante_filtros(filtros: dict, formato: str = "json") -> str:
+    """
+    Nome estável da combinação de filtros e formato, para separar o cache
+    em disco: CSV e JSON tipam colunas de forma diferente (identificadores
+    como texto no CSV), e os dias de um período não podem misturar os dois.
+    json mantém os nomes anteriores ("" / "f_<hash>").
+    """
+    prefixo = "" if formato == "json" else formato
+    if not filtros:
+        return prefixo
+
+    chave = json.dumps(filtros, sort_keys=True, ensure_ascii=False)
+    variante = "f_" + hashlib.sha1(chave.encode("utf-8")).hexdigest()[:12]
+    return f"{prefixo}_{variante}" if prefixo else variante
+
 
 # ======================================================
 # FUNÇÕES ESPECÍFICAS (OPCIONAL – AÇÚCAR SINTÁTICO)
 # ======================================================
-def carregar_fechamento_metabase(conta: str, data_inicio, data_fim) -> pd.DataFrame:
-    return carregar_relatorio_metabase(conta, "fechamento", data_inicio, data_fim)
+def carregar_fechamento_metabase(conta: str, data_inicio, data_fim, **filtros) -> pd.DataFrame:
+    return carregar_relatorio_metabase(conta, "fechamento", data_inicio, data_fim, **filtros)
 
 
-def carregar_qualidade_metabase(conta: str, data_inicio, data_fim) -> pd.DataFrame:
-    return carregar_relatorio_metabase(conta, "qualidade", data_inicio, data_fim)
+def carregar_qualidade_metabase(conta: str, data_inicio, data_fim, **filtros) -> pd.DataFrame:
+    return carregar_relatorio_metabase(conta, "qualidade", data_inicio, data_fim, **filtros)
 
 
-def carregar_fila_metabase(conta: str, data_inicio, data_fim) -> pd.DataFrame:
-    return carregar_relatorio_metabase(conta, "fila", data_inicio, data_fim)
+def carregar_fila_metabase(conta: str, data_inicio, data_fim, **filtros) -> pd.DataFrame:
+    return carregar_relatorio_metabase(conta, "fila", data_inicio, data_fim, **filtros)
@@ -1,8 +1,49 @@
+import asyncio
+import json
+import logging
+import math
 import pandas as pd
-from datetime import date
-from typing import Optional
+import pyarrow as pa
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterator, Optional, Union
 
+from app.analysis.ordens_servico_store import (
+    TIPOS_DATA_STORE,
+    get_ordens_store,
+    store_local_habilitado,
+)
+from app.hubsoft.async_client import AsyncHubSoftClient, run_sync
+from app.hubsoft.client import HubSoftClient
 from app.hubsoft.factory import get_hubsoft_client
+from app.utils.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_ORDENS = "integracao/ordem_servico/todos"
+
+# Campos dos lotes Arrow de iter_ordens_servico, quando não informados
+CAMPOS_ARROW_PADRAO = [
+    "id_ordem_servico",
+    "numero",
+    "tipo",
+    "tipo_ordem_servico.descricao",
+    "status",
+    "data_cadastro",
+    "data_inicio_executado",
+    "data_termino_executado",
+    "usuario_fechamento.name",
+    "cliente",
+    "dados_endereco_instalacao.cidade",
+    "dados_endereco_instalacao.estado",
+]
+
+# Tamanho inicial das janelas de data (em dias) da carga fatiada
+JANELAS_PERIODO = {
+    "dia": 1,
+    "semana": 7,
+}
 
 
 def carregar_ordens_servico_df(
@@ -14,66 +55,135 @@ def carregar_ordens_servico_df(
     max_paginas: int = 50,  # limite de segurança
     tecnico: Optional[str] = None,
     tipo_ordem_servico: Optional[str] = None,
+    max_concorrencia: Optional[int] = None,
+    usar_store: bool = True,
+    campos: Optional[list[str]] = None,
 ) -> pd.DataFrame:
     """
     Carrega ordens de serviço da API HubSoft com paginação e filtros opcionais.
     Retorna DataFrame normalizado e pronto para uso na UI.
+
+    Com `campos` (caminhos com ponto, ex.: "usuario_fechamento.name"),
+    extrai só essas colunas, já tipadas, sem o json_normalize completo.
+
+    Wrapper síncrono de `carregar_ordens_servico_async`.
     """
+    return run_sync(
+        carregar_ordens_servico_async(
+            conta=conta,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo_data=tipo_data,
+            itens_por_pagina=itens_por_pagina,
+            max_paginas=max_paginas,
+            tecnico=tecnico,
+            tipo_ordem_servico=tipo_ordem_servico,
+            max_concorrencia=max_concorrencia,
+            usar_store=usar_store,
+            campos=campos,
+        )
+    )
 
-    client = get_hubsoft_client(conta)
 
-    pagina = 1
-    todas_ordens: list[dict] = []
+def carregar_ordens_servico_contas_df(
+    contas: list[str],
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    janela: Optional[str] = None,
+    **kwargs,
+) -> dict[str, pd.DataFrame]:
+    """
+    Carrega várias contas no mesmo event loop.
+    A latência total fica próxima da conta mais lenta, não da soma.
+    Retorna {conta: DataFrame}, na ordem recebida.
 
-    # ======================================================
-    # PAGINAÇÃO (CORRIGIDA)
-    # ======================================================
-    while pagina <= max_paginas:
-        payload = {
-            "pagina": pagina,
-            "itens_por_pagina": itens_por_pagina,
-            "data_inicio": data_inicio.isoformat(),
-            "data_fim": data_fim.isoformat(),
-            "tipo_data": tipo_data,
-        }
-
-        # -------------------------
-        # FILTROS OPCIONAIS
-        # -------------------------
-        if tecnico:
-            payload["usuario_fechamento.nome"] = tecnico
-
-        if tipo_ordem_servico:
-            payload["tipo_ordem_servico.descricao"] = tipo_ordem_servico
-
-        response = client.get(
-            "integracao/ordem_servico/todos",
-            params=payload,
+    Cada conta passa pelo single-flight dos loaders async: páginas que
+    pedem a mesma conta/período ao mesmo tempo compartilham a carga.
+    """
+    return run_sync(
+        carregar_ordens_servico_contas_async(
+            contas=contas,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo_data=tipo_data,
+            janela=janela,
+            **kwargs,
         )
+    )
 
-        # Se a API não respondeu corretamente, encerra
-        if not isinstance(response, dict):
-            break
 
-        ordens = (
-            response.get("ordens_servico")
-            or response.get("ordens")
-            or response.get("data")
-            or []
-        )
+@single_flight
+async def carregar_ordens_servico_async(
+    conta: str,
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    itens_por_pagina: int = 100,
+    max_paginas: int = 50,  # limite de segurança
+    tecnico: Optional[str] = None,
+    tipo_ordem_servico: Optional[str] = None,
+    max_concorrencia: Optional[int] = None,
+    usar_store: bool = True,
+    campos: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Versão assíncrona de `carregar_ordens_servico_df`.
+
+    Sem filtros de técnico/tipo e com tipo_data indexado, a consulta é
+    servida pelo store local da conta: só as faixas novas (após a marca
+    d'água, mais a janela de rechecagem) vão à API.
+
+    Na API, a primeira página é buscada sozinha; as demais em paralelo
+    (no máximo `max_concorrencia` requisições em voo nesta carga, padrão
+    HUBSOFT_<CONTA>_MAX_CONCORRENCIA). Com 1, a paginação é sequencial.
+    Cargas da mesma conta no mesmo event loop somam no máximo
+    HUBSOFT_<CONTA>_MAX_CONCORRENCIA (ver AsyncHubSoftClient).
+    """
+
+    client = AsyncHubSoftClient(
+        get_hubsoft_client(conta),
+        max_concorrencia=max_concorrencia,
+    )
+
+    filtros = {
+        "tipo_data": tipo_data,
+        "itens_por_pagina": itens_por_pagina,
+        "tecnico": tecnico,
+        "tipo_ordem_servico": tipo_ordem_servico,
+    }
 
-        # Se não veio lista ou veio vazia, acabou
-        if not isinstance(ordens, list) or not ordens:
-            break
+    usa_store = (
+        usar_store
+        and store_local_habilitado()
+        and tipo_data in TIPOS_DATA_STORE
+        and not tecnico
+        and not tipo_ordem_servico
+    )
 
-        todas_ordens.extend(ordens)
+    if usa_store:
+        todas_ordens = await _carregar_via_store(
+            client, conta, data_inicio, data_fim, filtros, max_paginas
+        )
+    else:
+        payload = _montar_payload(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            **filtros,
+        )
 
-        # 🔐 Se veio menos registros que o limite, não há próxima página
-        if len(ordens) < itens_por_pagina:
-            break
+        todas_ordens, truncado = await _buscar_todas_paginas(
+            client,
+            payload,
+            itens_por_pagina=itens_por_pagina,
+            max_paginas=max_paginas,
+        )
 
-        # ✅ Incremento correto da página
-        pagina += 1
+        if truncado:
+            logger.warning(
+                "Teto de páginas atingido; use carregar_ordens_servico_periodo_df",
+                extra={"conta": conta, "max_paginas": max_paginas},
+            )
 
     # ======================================================
     # SEM DADOS
@@ -81,9 +191,608 @@ def carregar_ordens_servico_df(
     if not todas_ordens:
         return pd.DataFrame()
 
-    # ======================================================
-    # NORMALIZAÇÃO FINAL
-    # ======================================================
+    return _montar_dataframe(todas_ordens, conta, campos)
+
+
+async def carregar_ordens_servico_contas_async(
+    contas: list[str],
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    janela: Optional[str] = None,
+    **kwargs,
+) -> dict[str, pd.DataFrame]:
+    """
+    Com `janela` ("dia" ou "semana"), cada conta usa a carga fatiada.
+    """
+    if janela:
+        kwargs["janela"] = janela
+        carregar = carregar_ordens_servico_periodo_async
+    else:
+        carregar = carregar_ordens_servico_async
+
+    resultados = await asyncio.gather(
+        *(
+            carregar(
+                conta=conta,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                tipo_data=tipo_data,
+                **kwargs,
+            )
+            for conta in contas
+        )
+    )
+
+    return dict(zip(contas, resultados))
+
+
+# ======================================================
+# PAGINAÇÃO
+# ======================================================
+def _montar_payload(
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str,
+    itens_por_pagina: int,
+    tecnico: Optional[str] = None,
+    tipo_ordem_servico: Optional[str] = None,
+) -> dict:
+    payload = {
+        "itens_por_pagina": itens_por_pagina,
+        "data_inicio": data_inicio.isoformat(),
+        "data_fim": data_fim.isoformat(),
+        "tipo_data": tipo_data,
+    }
+
+    # -------------------------
+    # FILTROS OPCIONAIS
+    # -------------------------
+    if tecnico:
+        payload["usuario_fechamento.nome"] = tecnico
+
+    if tipo_ordem_servico:
+        payload["tipo_ordem_servico.descricao"] = tipo_ordem_servico
+
+    return payload
+
+
+async def _buscar_pagina(
+    client: AsyncHubSoftClient,
+    payload: dict,
+    pagina: int,
+) -> tuple[list[dict], dict]:
+    """
+    Busca uma página e devolve (ordens, resposta bruta).
+    Resposta inválida ou sem lista vira lista vazia.
+    """
+    response = await client.get(
+        ENDPOINT_ORDENS,
+        params={**payload, "pagina": pagina},
+    )
+    return _interpretar_pagina(response)
+
+
+def _buscar_pagina_sync(
+    client: HubSoftClient,
+    payload: dict,
+    pagina: int,
+) -> tuple[list[dict], dict]:
+    response = client.get(
+        ENDPOINT_ORDENS,
+        params={**payload, "pagina": pagina},
+    )
+    return _interpretar_pagina(response)
+
+
+def _interpretar_pagina(response) -> tuple[list[dict], dict]:
+    # Se a API não respondeu corretamente, encerra
+    if not isinstance(response, dict):
+        return [], {}
+
+    return _extrair_ordens(response), response
+
+
+def _extrair_ordens(response: dict) -> list[dict]:
+    ordens = (
+        response.get("ordens_servico")
+        or response.get("ordens")
+        or response.get("data")
+        or []
+    )
+
+    if not isinstance(ordens, list):
+        return []
+
+    return ordens
+
+
+def _total_paginas(response: dict, itens_por_pagina: int) -> Optional[int]:
+    """
+    Lê o total de páginas dos metadados de paginação, quando a API informa.
+    """
+    paginacao = response.get("paginacao")
+    if not isinstance(paginacao, dict):
+        paginacao = {}
+
+    try:
+        ultima = paginacao.get("ultima_pagina")
+        if ultima:
+            return int(ultima)
+
+        total = paginacao.get("total_registros") or response.get("total")
+        if total:
+            return math.ceil(int(total) / itens_por_pagina)
+    except (TypeError, ValueError):
+        pass
+
+    return None
+
+
+async def _buscar_todas_paginas(
+    client: AsyncHubSoftClient,
+    payload: dict,
+    itens_por_pagina: int,
+    max_paginas: int,
+) -> tuple[list[dict], bool]:
+    """
+    Busca a página 1 e, se houver mais, as restantes em paralelo pelo
+    mesmo client autenticado. A ordem das páginas é mantida.
+
+    Retorna (ordens, truncado); truncado indica que o teto `max_paginas`
+    foi atingido e pode haver ordens não carregadas.
+    """
+    ordens, response = await _buscar_pagina(client, payload, 1)
+
+    # Se não veio lista ou veio vazia, acabou
+    if not ordens:
+        return [], False
+
+    todas_ordens: list[dict] = list(ordens)
+
+    # 🔐 Se veio menos registros que o limite, não há próxima página
+    if len(ordens) < itens_por_pagina:
+        return todas_ordens, False
+
+    total = _total_paginas(response, itens_por_pagina)
+
+    if max_paginas <= 1:
+        return todas_ordens, total is None or total > 1
+
+    if total is not None:
+        # Total conhecido: um lote só (o semáforo do client limita o voo)
+        ultima = min(total, max_paginas)
+        tamanho_lote = max(ultima - 1, 0)
+    else:
+        # Total desconhecido: sonda à frente, um lote por vez
+        ultima = max_paginas
+        tamanho_lote = client.max_concorrencia
+
+    pagina = 2
+
+    while pagina <= ultima:
+        paginas = range(pagina, min(pagina + tamanho_lote, ultima + 1))
+
+        # gather preserva a ordem das páginas
+        resultados = await asyncio.gather(
+            *(_buscar_pagina(client, payload, p) for p in paginas)
+        )
+
+        for ordens_pagina, _ in resultados:
+            if not ordens_pagina:
+                return todas_ordens, False
+
+            todas_ordens.extend(ordens_pagina)
+
+            if len(ordens_pagina) < itens_por_pagina:
+                return todas_ordens, False
+
+        pagina = paginas.stop
+
+    return todas_ordens, total is None or total > max_paginas
+
+
+# ======================================================
+# STREAMING POR PÁGINA
+# ======================================================
+def iter_ordens_servico(
+    conta: str,
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    itens_por_pagina: int = 100,
+    max_paginas: int = 50,  # limite de segurança
+    tecnico: Optional[str] = None,
+    tipo_ordem_servico: Optional[str] = None,
+    max_concorrencia: Optional[int] = None,
+    formato: str = "dict",
+    campos: Optional[list[str]] = None,
+) -> Iterator[Union[list[dict], pa.RecordBatch]]:
+    """
+    Gera as ordens página a página, na ordem, assim que cada uma chega.
+
+    Mantém no máximo `max_concorrencia` páginas à frente em voo, então a
+    memória fica constante independentemente do tamanho do período.
+
+    formato="dict" gera a lista de ordens da página; formato="arrow" gera
+    um pyarrow.RecordBatch por página, todos com o mesmo schema: os
+    `campos` (caminhos com ponto, padrão CAMPOS_ARROW_PADRAO) tipados
+    por schema_ordens_arrow. Os lotes podem ser juntados numa Table.
+    """
+    if formato not in {"dict", "arrow"}:
+        raise ValueError(f"Formato inválido: {formato}. Use 'dict' ou 'arrow'.")
+
+    schema = schema_ordens_arrow(campos or CAMPOS_ARROW_PADRAO)
+
+    client = get_hubsoft_client(conta)
+    janela = max(1, max_concorrencia or client.config.max_concorrencia)
+
+    payload = _montar_payload(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        tipo_data=tipo_data,
+        itens_por_pagina=itens_por_pagina,
+        tecnico=tecnico,
+        tipo_ordem_servico=tipo_ordem_servico,
+    )
+
+    def _entregar(ordens: list[dict]):
+        if formato == "arrow":
+            return ordens_para_lote_arrow(ordens, schema)
+        return ordens
+
+    # Página 1 sozinha: descobre se há mais e quantas
+    ordens, response = _buscar_pagina_sync(client, payload, 1)
+
+    if not ordens:
+        return
+
+    yield _entregar(ordens)
+
+    if len(ordens) < itens_por_pagina:
+        return
+
+    total = _total_paginas(response, itens_por_pagina)
+    ultima = min(total, max_paginas) if total is not None else max_paginas
+
+    pool = ThreadPoolExecutor(max_workers=janela)
+    pendentes: deque = deque()
+    proxima = 2
+
+    try:
+        while True:
+            while len(pendentes) < janela and proxima <= ultima:
+                pendentes.append(
+                    pool.submit(_buscar_pagina_sync, client, payload, proxima)
+                )
+                proxima += 1
+
+            if not pendentes:
+                return
+
+            ordens, _ = pendentes.popleft().result()
+
+            if not ordens:
+                return
+
+            yield _entregar(ordens)
+
+            if len(ordens) < itens_por_pagina:
+                return
+    finally:
+        # Consumidor parou antes do fim: descarta o que ainda não começou
+        for futuro in pendentes:
+            futuro.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def schema_ordens_arrow(campos: list[str]) -> pa.Schema:
+    """
+    Schema fixo dos lotes Arrow: id_* -> int64, percentual_* -> float64,
+    o resto texto (o payload mistura tipos entre páginas).
+    """
+    def tipo(campo: str) -> pa.DataType:
+        nome = campo.split(".")[-1]
+        if nome.startswith("id_") or nome == "id":
+            return pa.int64()
+        if nome.startswith("percentual_"):
+            return pa.float64()
+        return pa.string()
+
+    return pa.schema([(campo, tipo(campo)) for campo in dict.fromkeys(campos)])
+
+
+def ordens_para_lote_arrow(ordens: list[dict], schema: pa.Schema) -> pa.RecordBatch:
+    """
+    Projeta as ordens de uma página no schema. Valores que não cabem no
+    tipo da coluna viram nulo; objetos/listas em coluna de texto viram JSON.
+    """
+    colunas = []
+
+    for campo in schema:
+        partes = campo.name.split(".")
+        valores = [_valor_arrow(_extrair_campo(ordem, partes), campo.type) for ordem in ordens]
+        colunas.append(pa.array(valores, type=campo.type))
+
+    return pa.RecordBatch.from_arrays(colunas, schema=schema)
+
+
+def _valor_arrow(valor, tipo: pa.DataType):
+    # A API manda [] no lugar de objetos vazios
+    if valor is None or valor == [] or valor == {}:
+        return None
+
+    if pa.types.is_string(tipo):
+        if isinstance(valor, str):
+            return valor
+        if isinstance(valor, (dict, list)):
+            return json.dumps(valor, ensure_ascii=False)
+        return str(valor)
+
+    try:
+        return int(valor) if pa.types.is_integer(tipo) else float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+# ======================================================
+# CARGA FATIADA POR JANELAS DE DATA
+# ======================================================
+def dividir_periodo(
+    data_inicio: date,
+    data_fim: date,
+    dias: int,
+) -> list[tuple[date, date]]:
+    """
+    Divide [data_inicio, data_fim] (inclusivo) em janelas de até `dias` dias.
+    """
+    janelas: list[tuple[date, date]] = []
+    inicio = data_inicio
+
+    while inicio <= data_fim:
+        fim = min(inicio + timedelta(days=dias - 1), data_fim)
+        janelas.append((inicio, fim))
+        inicio = fim + timedelta(days=1)
+
+    return janelas
+
+
+def carregar_ordens_servico_periodo_df(
+    conta: str,
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    janela: str = "semana",
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Carrega períodos longos sem truncar no teto de páginas.
+    Wrapper síncrono de `carregar_ordens_servico_periodo_async`.
+    """
+    return run_sync(
+        carregar_ordens_servico_periodo_async(
+            conta=conta,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo_data=tipo_data,
+            janela=janela,
+            **kwargs,
+        )
+    )
+
+
+@single_flight
+async def carregar_ordens_servico_periodo_async(
+    conta: str,
+    data_inicio: date,
+    data_fim: date,
+    tipo_data: str = "data_termino_executado",
+    janela: str = "semana",
+    itens_por_pagina: int = 100,
+    max_paginas: int = 50,  # limite de segurança por janela
+    tecnico: Optional[str] = None,
+    tipo_ordem_servico: Optional[str] = None,
+    max_concorrencia: Optional[int] = None,
+    campos: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Fatia o período em janelas de dia ou semana, pagina cada janela
+    separadamente e busca todas em paralelo (mesmo semáforo da conta).
+    Janelas que atingem o teto de páginas são divididas de novo ao meio.
+    O resultado é deduplicado por id_ordem_servico.
+    """
+    if janela not in JANELAS_PERIODO:
+        raise ValueError(
+            f"Janela inválida: {janela}. Use {', '.join(JANELAS_PERIODO)}."
+        )
+
+    client = AsyncHubSoftClient(
+        get_hubsoft_client(conta),
+        max_concorrencia=max_concorrencia,
+    )
+
+    filtros = {
+        "tipo_data": tipo_data,
+        "itens_por_pagina": itens_por_pagina,
+        "tecnico": tecnico,
+        "tipo_ordem_servico": tipo_ordem_servico,
+    }
+
+    todas_ordens, _ = await _buscar_periodo(
+        client,
+        data_inicio,
+        data_fim,
+        filtros,
+        max_paginas,
+        dias_janela=JANELAS_PERIODO[janela],
+    )
+
+    if not todas_ordens:
+        return pd.DataFrame()
+
+    return _montar_dataframe(todas_ordens, conta, campos)
+
+
+async def _buscar_periodo(
+    client: AsyncHubSoftClient,
+    data_inicio: date,
+    data_fim: date,
+    filtros: dict,
+    max_paginas: int,
+    dias_janela: int,
+) -> tuple[list[dict], bool]:
+    """
+    Retorna (ordens, completo); completo é False se alguma janela de um
+    dia ficou acima do teto de páginas (resultado parcial).
+    """
+    resultados = await asyncio.gather(
+        *(
+            _buscar_janela(client, inicio, fim, filtros, max_paginas)
+            for inicio, fim in dividir_periodo(data_inicio, data_fim, dias_janela)
+        )
+    )
+
+    ordens = _deduplicar_ordens(
+        ordem for ordens, _ in resultados for ordem in ordens
+    )
+    return ordens, all(completo for _, completo in resultados)
+
+
+async def _buscar_janela(
+    client: AsyncHubSoftClient,
+    data_inicio: date,
+    data_fim: date,
+    filtros: dict,
+    max_paginas: int,
+) -> tuple[list[dict], bool]:
+    payload = _montar_payload(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        **filtros,
+    )
+
+    ordens, truncado = await _buscar_todas_paginas(
+        client,
+        payload,
+        itens_por_pagina=filtros["itens_por_pagina"],
+        max_paginas=max_paginas,
+    )
+
+    if not truncado:
+        return ordens, True
+
+    if data_inicio >= data_fim:
+        # Um único dia acima do teto: não há como fatiar mais por data
+        logger.warning(
+            "Janela de um dia atingiu o teto de páginas; resultado parcial",
+            extra={
+                "conta": client.config.name,
+                "data": data_inicio.isoformat(),
+                "max_paginas": max_paginas,
+            },
+        )
+        return ordens, False
+
+    meio = data_inicio + (data_fim - data_inicio) // 2
+
+    (antes, completo_antes), (depois, completo_depois) = await asyncio.gather(
+        _buscar_janela(client, data_inicio, meio, filtros, max_paginas),
+        _buscar_janela(client, meio + timedelta(days=1), data_fim, filtros, max_paginas),
+    )
+
+    return antes + depois, completo_antes and completo_depois
+
+
+def _deduplicar_ordens(ordens) -> list[dict]:
+    """
+    Remove repetidas por id_ordem_servico, mantendo a primeira ocorrência.
+    Ordens sem id são mantidas.
+    """
+    vistos: set = set()
+    unicas: list[dict] = []
+
+    for ordem in ordens:
+        id_ordem = ordem.get("id_ordem_servico")
+
+        if id_ordem is not None:
+            if id_ordem in vistos:
+                continue
+            vistos.add(id_ordem)
+
+        unicas.append(ordem)
+
+    return unicas
+
+
+# ======================================================
+# STORE LOCAL
+# ======================================================
+async def _carregar_via_store(
+    client: AsyncHubSoftClient,
+    conta: str,
+    data_inicio: date,
+    data_fim: date,
+    filtros: dict,
+    max_paginas: int,
+) -> list[dict]:
+    """
+    Sincroniza só as faixas pendentes (carga fatiada por semana) e
+    responde a consulta a partir do store local.
+
+    Faixas com resultado parcial (dia acima do teto de páginas) são
+    gravadas mas não entram na cobertura: continuam pendentes.
+    """
+    store = get_ordens_store(conta)
+    tipo_data = filtros["tipo_data"]
+
+    faixas = await asyncio.to_thread(
+        store.faixas_pendentes, tipo_data, data_inicio, data_fim
+    )
+
+    if faixas:
+        resultados = await asyncio.gather(
+            *(
+                _buscar_periodo(
+                    client, inicio, fim, filtros, max_paginas,
+                    dias_janela=JANELAS_PERIODO["semana"],
+                )
+                for inicio, fim in faixas
+            )
+        )
+
+        for ordens, _ in resultados:
+            await asyncio.to_thread(store.salvar, ordens)
+
+        # Cada faixa pendente encosta na cobertura: registrar uma a uma não
+        # cobre as que ficaram incompletas
+        for (inicio, fim), (_, completo) in zip(faixas, resultados):
+            if completo:
+                await asyncio.to_thread(store.registrar_sincronizacao, tipo_data, inicio, fim)
+            else:
+                logger.warning(
+                    "Faixa com resultado parcial não registrada no store",
+                    extra={"conta": conta, "inicio": inicio.isoformat(), "fim": fim.isoformat()},
+                )
+
+    return await asyncio.to_thread(
+        store.consultar, tipo_data, data_inicio, data_fim
+    )
+
+
+# ======================================================
+# NORMALIZAÇÃO FINAL
+# ======================================================
+def _montar_dataframe(
+    todas_ordens: list[dict],
+    conta: str,
+    campos: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    if campos:
+        return _projetar_ordens(todas_ordens, conta, campos)
+    return _normalizar_ordens(todas_ordens, conta)
+
+
+def _normalizar_ordens(todas_ordens: list[dict], conta: str) -> pd.DataFrame:
     df = pd.json_normalize(todas_ordens)
 
     # -------------------------
@@ -114,3 +823,60 @@ def carregar_ordens_servico_df(
     df["conta"] = conta.upper()
 
     return df
+
+
+# -------------------------
+# PROJEÇÃO DE CAMPOS
+# -------------------------
+def _projetar_ordens(
+    todas_ordens: list[dict],
+    conta: str,
+    campos: list[str],
+) -> pd.DataFrame:
+    """
+    Monta o DataFrame só com os campos pedidos (e a conta), coluna a
+    coluna, com os nomes dos caminhos (ex.: "usuario_fechamento.name").
+    Campo ausente (ou caminho interrompido) vira nulo.
+    """
+    colunas = {}
+
+    for campo in dict.fromkeys(campos):
+        partes = campo.split(".")
+        valores = [_extrair_campo(ordem, partes) for ordem in todas_ordens]
+        colunas[campo] = _tipar_coluna(partes[-1], valores)
+
+    df = pd.DataFrame(colunas)
+    df["conta"] = conta.upper()
+
+    return df
+
+
+def _extrair_campo(ordem: dict, partes: list[str]):
+    valor = ordem
+
+    for parte in partes:
+        if not isinstance(valor, dict):
+            return None
+        valor = valor.get(parte)
+
+    return valor
+
+
+def _tipar_coluna(nome: str, valores: list):
+    """
+    data_* -> datetime, id_* -> inteiro anulável, texto -> string.
+    """
+    if nome.startswith("data_"):
+        return pd.to_datetime(pd.Series(valores, dtype=object), errors="coerce")
+
+    if nome.startswith("id_"):
+        numeros = pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce")
+        try:
+            return numeros.astype("Int64")
+        except TypeError:
+            return numeros
+
+    if all(v is None or isinstance(v, str) for v in valores):
+        return pd.array(valores, dtype="string")
+
+    return pd.Series(valores, dtype=object)
@@ -0,0 +1,280 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from app.config import get_data_dir
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+# Colunas de data indexadas; outros tipo_data vão direto à API.
+# Só ordens já executadas: pela data_termino_executado a ordem não muda
+# mais. Pela data_cadastro ela ainda muda depois de criada (status,
+# usuario_fechamento, execução), então essas consultas vão sempre à API.
+TIPOS_DATA_STORE = ("data_termino_executado",)
+
+# Dias antes da marca d'água que são sempre rechecados na API
+DIAS_RECHECAGEM = 3
+
+# Intervalo mínimo entre rechecagens da janela recente (segundos)
+INTERVALO_RECHECAGEM = 300
+
+_stores: dict[Path, "OrdensServicoStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def store_local_habilitado() -> bool:
+    """
+    Desligável com HUBSOFT_STORE_LOCAL=0.
+    """
+    valor = os.getenv("HUBSOFT_STORE_LOCAL", "1").strip().lower()
+    return valor not in {"0", "false", "nao", "não"}
+
+
+def get_ordens_store(conta: str) -> "OrdensServicoStore":
+    """
+    Store local da conta (um arquivo SQLite por conta em <data_dir>/hubsoft).
+    """
+    caminho = get_data_dir() / "hubsoft" / f"ordens_servico_{conta.lower()}.sqlite"
+
+    with _stores_lock:
+        store = _stores.get(caminho)
+        if store is None:
+            store = OrdensServicoStore(caminho)
+            _stores[caminho] = store
+
+    return store
+
+
+@dataclass(frozen=True)
+class Cobertura:
+    inicio: date
+    fim: date  # marca d'água
+    ultima_sincronizacao: float
+
+
+# ======================================================
+# STORE
+# ======================================================
+class OrdensServicoStore:
+    """
+    Base local de ordens de serviço (payload bruto da API) por conta.
+
+    Para cada tipo_data guarda o intervalo contínuo já sincronizado.
+    O fim desse intervalo é a marca d'água: dias anteriores a ela
+    (menos DIAS_RECHECAGEM) são servidos só do disco.
+    """
+
+    def __init__(self, caminho: Path) -> None:
+        self.caminho = caminho
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._criar_schema()
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão curta (uma por operação): commit ao sair e fecha.
+        """
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _criar_schema(self) -> None:
+        colunas_data = ", ".join(f"{c} TEXT" for c in TIPOS_DATA_STORE)
+
+        with self._conectar() as conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS ordens (
+                    id_ordem_servico INTEGER PRIMARY KEY,
+                    {colunas_data},
+                    payload TEXT NOT NULL,
+                    atualizado_em REAL NOT NULL
+                )
+                """
+            )
+            for coluna in TIPOS_DATA_STORE:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_ordens_{coluna} ON ordens ({coluna})"
+                )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sincronizacao (
+                    tipo_data TEXT PRIMARY KEY,
+                    cobertura_inicio TEXT NOT NULL,
+                    cobertura_fim TEXT NOT NULL,
+                    ultima_sincronizacao REAL NOT NULL
+                )
+                """
+            )
+
+    # --------------------------------------------------
+    # ESCRITA
+    # --------------------------------------------------
+    def salvar(self, ordens: Iterable[dict]) -> int:
+        """
+        Grava (upsert) as ordens pelo id_ordem_servico.
+        Ordens sem id são ignoradas. Retorna quantas foram gravadas.
+        """
+        agora = time.time()
+        linhas = [
+            (
+                ordem["id_ordem_servico"],
+                *(ordem.get(coluna) for coluna in TIPOS_DATA_STORE),
+                json.dumps(ordem, ensure_ascii=False),
+                agora,
+            )
+            for ordem in ordens
+            if ordem.get("id_ordem_servico") is not None
+        ]
+
+        if not linhas:
+            return 0
+
+        # Colunas nomeadas: bases antigas podem ter colunas de data a mais
+        colunas = ", ".join(("id_ordem_servico", *TIPOS_DATA_STORE, "payload", "atualizado_em"))
+        marcadores = ", ".join("?" * (len(TIPOS_DATA_STORE) + 3))
+
+        with self._conectar() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO ordens ({colunas}) VALUES ({marcadores})",
+                linhas,
+            )
+
+        return len(linhas)
+
+    def registrar_sincronizacao(
+        self,
+        tipo_data: str,
+        data_inicio: date,
+        data_fim: date,
+        hoje: Optional[date] = None,
+    ) -> None:
+        """
+        Amplia a cobertura com [data_inicio, data_fim].
+        O fim nunca passa de hoje: dias futuros ainda vão mudar.
+        """
+        hoje = hoje or date.today()
+        data_fim = min(data_fim, hoje)
+        agora = time.time()
+
+        with self._conectar() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            atual = self._ler_cobertura(conn, tipo_data)
+
+            if atual:
+                # Só conta como rechecagem se a faixa alcançou a marca d'água
+                if data_fim < atual.fim:
+                    agora = atual.ultima_sincronizacao
+                data_inicio = min(data_inicio, atual.inicio)
+                data_fim = max(data_fim, atual.fim)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO sincronizacao VALUES (?, ?, ?, ?)",
+                (tipo_data, data_inicio.isoformat(), data_fim.isoformat(), agora),
+            )
+
+    # --------------------------------------------------
+    # LEITURA
+    # --------------------------------------------------
+    def consultar(
+        self,
+        tipo_data: str,
+        data_inicio: date,
+        data_fim: date,
+    ) -> list[dict]:
+        _validar_tipo_data(tipo_data)
+
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT payload FROM ordens
+                WHERE {tipo_data} >= ? AND {tipo_data} < ?
+                ORDER BY {tipo_data}, id_ordem_servico
+                """,
+                (data_inicio.isoformat(), (data_fim + timedelta(days=1)).isoformat()),
+            )
+            return [json.loads(payload) for (payload,) in cursor]
+
+    def cobertura(self, tipo_data: str) -> Optional[Cobertura]:
+        with self._conectar() as conn:
+            return self._ler_cobertura(conn, tipo_data)
+
+    @staticmethod
+    def _ler_cobertura(conn: sqlite3.Connection, tipo_data: str) -> Optional[Cobertura]:
+        row = conn.execute(
+            """
+            SELECT cobertura_inicio, cobertura_fim, ultima_sincronizacao
+            FROM sincronizacao WHERE tipo_data = ?
+            """,
+            (tipo_data,),
+        ).fetchone()
+
+        if not row:
+            return None
+
+        return Cobertura(
+            inicio=date.fromisoformat(row[0]),
+            fim=date.fromisoformat(row[1]),
+            ultima_sincronizacao=row[2],
+        )
+
+    # --------------------------------------------------
+    # PLANEJAMENTO DA SINCRONIZAÇÃO
+    # --------------------------------------------------
+    def faixas_pendentes(
+        self,
+        tipo_data: str,
+        data_inicio: date,
+        data_fim: date,
+        dias_rechecagem: int = DIAS_RECHECAGEM,
+        intervalo_rechecagem: float = INTERVALO_RECHECAGEM,
+        hoje: Optional[date] = None,
+    ) -> list[tuple[date, date]]:
+        """
+        Faixas de datas que precisam vir da API para atender a consulta.
+        Mantém a cobertura contínua (lacunas entre ela e a consulta entram).
+        """
+        _validar_tipo_data(tipo_data)
+        cobertura = self.cobertura(tipo_data)
+        hoje = hoje or date.today()
+
+        if cobertura is None:
+            return [(data_inicio, data_fim)]
+
+        faixas: list[tuple[date, date]] = []
+
+        # Antes da cobertura: preenche até o início dela
+        if data_inicio < cobertura.inicio:
+            faixas.append((data_inicio, cobertura.inicio - timedelta(days=1)))
+
+        # Janela de rechecagem: últimos dias antes da marca d'água
+        inicio_rechecagem = max(
+            cobertura.inicio,
+            cobertura.fim - timedelta(days=dias_rechecagem),
+        )
+
+        if min(data_fim, hoje) > cobertura.fim:
+            faixas.append((inicio_rechecagem, data_fim))
+        elif data_fim >= inicio_rechecagem:
+            recente = time.time() - cobertura.ultima_sincronizacao < intervalo_rechecagem
+            if not recente:
+                faixas.append((inicio_rechecagem, cobertura.fim))
+
+        return faixas
+
+
+def _validar_tipo_data(tipo_data: str) -> None:
+    if tipo_data not in TIPOS_DATA_STORE:
+        raise ValueError(f"tipo_data não suportado pelo store local: {tipo_data}")
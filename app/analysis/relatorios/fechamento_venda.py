@@ -2,7 +2,7 @@ from datetime import date
 from typing import List
 import pandas as pd
 
-from app.analysis.ordens_servico import carregar_ordens_servico_df
+from app.analysis.ordens_servico import carregar_ordens_servico_contas_df
 
 def relatorio_fechamento_venda_df(
     contas: List[str],
@@ -23,14 +23,15 @@ def relatorio_fechamento_venda_df(
         if isinstance(e, str) and e.strip()
     ]
 
-    for conta in contas:
-        df = carregar_ordens_servico_df(
-            conta=conta,
-            data_inicio=data_inicio,
-            data_fim=data_fim,
-            tipo_data="data_termino_executado",
-        )
+    # Todas as contas em paralelo, no mesmo event loop
+    dfs_por_conta = carregar_ordens_servico_contas_df(
+        contas=contas,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        tipo_data="data_termino_executado",
+    )
 
+    for conta, df in dfs_por_conta.items():
         if df is None or df.empty:
             continue
 
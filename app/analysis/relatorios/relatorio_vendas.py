@@ -6,7 +6,7 @@ from typing import List
 
 import pandas as pd
 
-from app.analysis.ordens_servico import carregar_ordens_servico_df
+from app.analysis.ordens_servico import carregar_ordens_servico_contas_df
 
 
 # ============================================================
@@ -29,23 +29,30 @@ TIPO_DATA_VENDA = "data_cadastro"
 # ============================================================
 
 @lru_cache(maxsize=32)
-def _carregar_vendas_conta(
-    conta: str,
+def _carregar_vendas_contas(
+    contas: tuple[str, ...],
     data_inicio: date,
     data_fim: date,
-) -> pd.DataFrame:
+) -> tuple[pd.DataFrame, ...]:
     """
-    Carrega ordens de serviço de uma conta e filtra apenas vendas.
-    Cacheado por conta + período.
+    Carrega ordens de serviço das contas (em paralelo) e filtra apenas vendas.
+    Cacheado por contas + período.
     """
 
-    df = carregar_ordens_servico_df(
-        conta=conta,
+    dfs_por_conta = carregar_ordens_servico_contas_df(
+        contas=list(contas),
         data_inicio=data_inicio,
         data_fim=data_fim,
         tipo_data=TIPO_DATA_VENDA,
     )
 
+    return tuple(
+        _filtrar_vendas(df, conta)
+        for conta, df in dfs_por_conta.items()
+    )
+
+
+def _filtrar_vendas(df: pd.DataFrame, conta: str) -> pd.DataFrame:
     if df.empty:
         return df
 
@@ -71,17 +78,15 @@ def relatorio_vendas_df(
     Relatório consolidado de vendas (todas as contas).
     """
 
-    dfs: list[pd.DataFrame] = []
-
-    for conta in contas:
-        df = _carregar_vendas_conta(
-            conta=conta,
+    dfs: list[pd.DataFrame] = [
+        df
+        for df in _carregar_vendas_contas(
+            contas=tuple(contas),
             data_inicio=data_inicio,
             data_fim=data_fim,
         )
-
-        if not df.empty:
-            dfs.append(df)
+        if not df.empty
+    ]
 
     if not dfs:
         return pd.DataFrame()
@@ -0,0 +1,234 @@
+"""
+Registro de campos das planilhas: nome lógico -> coluna da aba.
+
+Cada campo tem a letra onde está hoje e, se souber, o cabeçalho esperado.
+Sem cabeçalho declarado, o texto do cabeçalho naquela coluna é aprendido
+como âncora e salvo em <data_dir>/sheets/campos.json. Se alguém inserir
+ou mover colunas, o campo é achado pela âncora na nova posição.
+
+Âncoras só valem para cabeçalhos não vazios e únicos na linha.
+"""
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.config import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# REGISTRO
+# ======================================================
+# sheet_key -> campo -> (letra atual, cabeçalho esperado ou None)
+CAMPOS_PLANILHAS = {
+    "51": {
+        "codigo_cliente": ("H", None),
+        "numero_ordem_servico": ("I", None),
+        "status": ("AH", None),
+    },
+    "60": {
+        "nome_vendedor": ("B", None),
+        "codigo_cliente": ("D", None),
+        "numero_ordem_servico": ("E", None),
+        "tipo_vendedor": ("H", None),
+        "status_planilha": ("V", None),
+        "status": ("AF", None),
+    },
+    "51_STM": {
+        "codigo_cliente": ("C", None),
+        "numero_ordem_servico": ("D", None),
+        "nome_vendedor": ("F", None),
+        "tipo_vendedor": ("K", None),
+        "status_planilha": ("X", None),
+        "status": ("AH", None),
+    },
+    "39": {
+        "data": ("B", None),
+        "codigo_cliente": ("D", None),
+        "numero_ordem_servico": ("E", None),
+        "tecnico": ("F", None),
+    },
+    "60_venda": {
+        "status_analise": ("A", None),
+        "vendedor": ("B", None),
+        "back": ("D", None),
+        "cod_cliente": ("E", None),
+        "cod_os": ("F", None),
+        "empresa": ("G", None),
+        "data_fechamento": ("H", None),
+        "tipo_venda": ("K", None),
+    },
+}
+
+_estado: dict = {"caminho": None, "campos": {}}
+_lock = threading.Lock()
+
+
+# ======================================================
+# API
+# ======================================================
+def letras_campos(sheet_key: str, campos: Iterable[str]) -> list[str]:
+    """
+    Letras atuais dos campos (última resolução salva ou a declarada).
+    """
+    registro = _registro(sheet_key)
+
+    with _lock:
+        salvos = _carregar().get(sheet_key, {})
+
+    return [
+        salvos.get(campo, {}).get("letra") or registro[campo][0]
+        for campo in campos
+    ]
+
+
+def conferir_cabecalhos(sheet_key: str, campos: Iterable[str], lidos: Iterable[str]) -> bool:
+    """
+    Confere os cabeçalhos lidos nas letras atuais (leitura projetada).
+    False se algum não bate com o esperado/âncora, ou se o campo ainda
+    nunca foi resolvido pelo cabeçalho completo.
+    """
+    registro = _registro(sheet_key)
+
+    with _lock:
+        salvos = _carregar().get(sheet_key, {})
+
+    for campo, lido in zip(campos, lidos):
+        if campo not in salvos and not registro[campo][1]:
+            return False
+
+        esperado = registro[campo][1] or salvos[campo]["ancora"]
+        if esperado and _texto(lido) != esperado:
+            return False
+
+    return True
+
+
+def resolver_campos(sheet_key: str, cabecalho: list) -> dict[str, int]:
+    """
+    Posição de cada campo da aba a partir da linha de cabeçalho completa.
+    Atualiza (e salva) letras e âncoras aprendidas.
+    """
+    registro = _registro(sheet_key)
+    nomes = [_texto(celula) for celula in cabecalho]
+    contagem = Counter(nomes)
+
+    def unico(nome: Optional[str]) -> bool:
+        return bool(nome) and contagem[nome] == 1
+
+    with _lock:
+        estado = _carregar()
+        salvos = estado.get(sheet_key, {})
+        novos = {}
+        posicoes = {}
+
+        for campo, (letra, esperado) in registro.items():
+            anterior = salvos.get(campo, {})
+            alvo = esperado or anterior.get("ancora")
+
+            if unico(alvo):
+                posicao = nomes.index(alvo)
+            else:
+                posicao = indice_coluna(anterior.get("letra") or letra)
+                if esperado:
+                    logger.warning(
+                        "Cabeçalho esperado não encontrado; usando a letra conhecida",
+                        extra={"planilha": sheet_key, "campo": campo, "cabecalho": esperado},
+                    )
+
+            nova_letra = letra_coluna(posicao)
+            if anterior.get("letra") and anterior["letra"] != nova_letra:
+                logger.warning(
+                    "Coluna mudou de posição na planilha",
+                    extra={
+                        "planilha": sheet_key,
+                        "campo": campo,
+                        "de": anterior["letra"],
+                        "para": nova_letra,
+                    },
+                )
+
+            nome = nomes[posicao] if posicao < len(nomes) else ""
+            novos[campo] = {"letra": nova_letra, "ancora": nome if unico(nome) else ""}
+            posicoes[campo] = posicao
+
+        if novos != salvos:
+            estado[sheet_key] = novos
+            _salvar(estado)
+
+    return posicoes
+
+
+# ======================================================
+# LETRAS
+# ======================================================
+def indice_coluna(letra: str) -> int:
+    """
+    "A" -> 0, "AH" -> 33
+    """
+    indice = 0
+    for caractere in letra.upper():
+        indice = indice * 26 + (ord(caractere) - ord("A") + 1)
+    return indice - 1
+
+
+def letra_coluna(indice: int) -> str:
+    """
+    0 -> "A", 33 -> "AH"
+    """
+    letra = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letra = chr(ord("A") + resto) + letra
+    return letra
+
+
+# ======================================================
+# UTIL
+# ======================================================
+def _registro(sheet_key: str) -> dict:
+    if sheet_key not in CAMPOS_PLANILHAS:
+        raise ValueError(f"Planilha sem campos registrados: {sheet_key}")
+    return CAMPOS_PLANILHAS[sheet_key]
+
+
+def _texto(celula) -> str:
+    # Mesma limpeza de normalize_headers
+    return str(celula if celula is not None else "").replace("\n", " ").strip()
+
+
+def _caminho() -> Path:
+    return get_data_dir() / "sheets" / "campos.json"
+
+
+def _carregar() -> dict:
+    """
+    Estado salvo (recarrega se o data_dir mudar). Chamar com _lock.
+    """
+    caminho = _caminho()
+
+    if _estado["caminho"] != caminho:
+        try:
+            campos = json.loads(caminho.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            campos = {}
+        _estado.update(caminho=caminho, campos=campos)
+
+    return _estado["campos"]
+
+
+def _salvar(estado: dict) -> None:
+    """
+    Escrita atômica (arquivo temporário + rename). Chamar com _lock.
+    """
+    caminho = _caminho()
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    temporario.write_text(json.dumps(estado, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temporario, caminho)
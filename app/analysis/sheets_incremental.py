@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+# Linhas finais relidas a cada sincronização (pega edições recentes)
+SOBREPOSICAO_LINHAS = 50
+
+# A cada este intervalo (s) a aba é relida inteira, para pegar edições
+# em linhas antigas (inserções e remoções aparecem já na sobreposição)
+INTERVALO_VERIFICACAO_COMPLETA = 3600
+
+BuscarLinhas = Callable[[int], list]
+
+
+class CacheIncremental:
+    """
+    Cópia em memória de abas que só crescem (logs append-only).
+
+    Guarda as linhas já sincronizadas de cada aba. Na próxima leitura
+    busca só a partir de (linhas conhecidas - sobreposição): as linhas
+    novas e as últimas `sobreposicao`. As linhas da sobreposição têm de
+    voltar iguais às do cache; se não (linha inserida ou apagada no meio
+    desloca as seguintes, ou edição recente), a aba é relida inteira.
+
+    Periodicamente a aba é relida inteira; se linhas antigas mudaram
+    (checksum diferente), isso fica registrado no log.
+
+    Com `versao` (ex.: modifiedTime do arquivo no Drive), a aba em cache
+    é devolvida sem leitura nenhuma enquanto a versão não mudar.
+
+    Deslocamentos são relativos à primeira linha lida (0 = cabeçalho).
+    """
+
+    def __init__(
+        self,
+        sobreposicao: int = SOBREPOSICAO_LINHAS,
+        intervalo_verificacao: float = INTERVALO_VERIFICACAO_COMPLETA,
+    ) -> None:
+        self.sobreposicao = max(0, sobreposicao)
+        self.intervalo_verificacao = intervalo_verificacao
+        self._abas: dict[Hashable, dict] = {}
+        self._lock = threading.Lock()
+
+    def atual(self, chave: Hashable, versao: Optional[str]) -> Optional[list]:
+        """
+        Linhas em cache, se a versão informada é a mesma da última leitura.
+        Sem alteração no arquivo, a aba também conta como verificada.
+        """
+        if versao is None:
+            return None
+
+        with self._lock:
+            estado = self._abas.get(chave)
+
+            if estado is None or estado.get("versao") != versao:
+                return None
+
+            estado["verificado_em"] = time.monotonic()
+            return list(estado["linhas"])
+
+    def deslocamento(self, chave: Hashable) -> int:
+        """
+        De onde ler a aba agora (0 = leitura completa).
+        """
+        with self._lock:
+            estado = self._abas.get(chave)
+
+            if estado is None or not estado["linhas"]:
+                return 0
+
+            if time.monotonic() - estado["verificado_em"] >= self.intervalo_verificacao:
+                return 0
+
+            # Nunca relê o cabeçalho numa leitura parcial
+            return max(1, len(estado["linhas"]) - self.sobreposicao)
+
+    def aplicar(
+        self,
+        chave: Hashable,
+        deslocamento: int,
+        linhas: list,
+        versao: Optional[str] = None,
+    ) -> Optional[list]:
+        """
+        Junta as linhas lidas a partir de `deslocamento` com as conhecidas
+        e retorna a aba completa (lista nova; as linhas são compartilhadas).
+
+        Numa leitura parcial, as primeiras linhas lidas são as da
+        sobreposição: se não batem com o cache (ou vieram menos), a junção
+        seria errada e retorna None; releia com deslocamento 0.
+        """
+        with self._lock:
+            estado = self._abas.get(chave)
+
+            if deslocamento == 0 or estado is None:
+                if estado is not None:
+                    self._comparar_antigas(chave, estado, linhas)
+
+                self._abas[chave] = {
+                    "linhas": list(linhas),
+                    "verificado_em": time.monotonic(),
+                    "versao": versao,
+                }
+                return list(linhas)
+
+            conhecidas = estado["linhas"][deslocamento:]
+            if linhas[: len(conhecidas)] != conhecidas:
+                logger.info(
+                    "Sobreposição da aba mudou; leitura completa",
+                    extra={"aba": str(chave), "deslocamento": deslocamento},
+                )
+                return None
+
+            estado["linhas"] = estado["linhas"][:deslocamento] + list(linhas)
+            estado["versao"] = versao
+            return list(estado["linhas"])
+
+    def sincronizar(
+        self,
+        chave: Hashable,
+        buscar: BuscarLinhas,
+        versao: Optional[str] = None,
+    ) -> list:
+        """
+        buscar(deslocamento) -> linhas da aba a partir do deslocamento.
+        versao: identificador da versão do arquivo lido antes da busca.
+        """
+        linhas = self.atual(chave, versao)
+        if linhas is not None:
+            return linhas
+
+        deslocamento = self.deslocamento(chave)
+        linhas = buscar(deslocamento)
+
+        logger.debug(
+            "Sincronização de aba",
+            extra={"aba": str(chave), "deslocamento": deslocamento, "linhas_lidas": len(linhas)},
+        )
+
+        resultado = self.aplicar(chave, deslocamento, linhas, versao=versao)
+        if resultado is None:
+            resultado = self.aplicar(chave, 0, buscar(0), versao=versao)
+        return resultado
+
+    def limpar(self, chave: Hashable = None) -> None:
+        with self._lock:
+            if chave is None:
+                self._abas.clear()
+            else:
+                self._abas.pop(chave, None)
+
+    def _comparar_antigas(self, chave: Hashable, estado: dict, linhas: list) -> None:
+        """
+        Na leitura completa, confere se as linhas fora da sobreposição
+        (que as leituras parciais não releem) mudaram.
+        """
+        limite = max(0, len(estado["linhas"]) - self.sobreposicao)
+
+        if _checksum(estado["linhas"][:limite]) != _checksum(linhas[:limite]):
+            logger.info(
+                "Linhas antigas da aba mudaram desde a última leitura completa",
+                extra={"aba": str(chave), "linhas_verificadas": limite},
+            )
+
+
+def _checksum(linhas: list) -> str:
+    h = hashlib.sha1()
+    for linha in linhas:
+        h.update("\x1f".join(str(celula) for celula in linha).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
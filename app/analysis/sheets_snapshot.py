@@ -0,0 +1,281 @@
+"""
+Snapshots das leituras de planilhas em disco, compartilhados entre processos.
+
+Cada leitura vira <data_dir>/sheets/snapshots/<nome>.parquet, com os
+metadados ao lado (<nome>.json: versão do arquivo no Drive e horário da
+gravação). Qualquer processo (app, sidecar de aquecimento, job em lote)
+lê o mesmo snapshot; a API do Sheets só é chamada quando ele vence.
+
+- Dentro do TTL (SHEETS_SNAPSHOT_TTL) o snapshot é devolvido sem consulta.
+- Vencido, se a versão do arquivo (modifiedTime) não mudou, só renova o
+  horário. Senão, relê e grava de novo.
+- A atualização é feita com trava de arquivo (<nome>.lock): com vários
+  processos, um relê e os outros esperam e usam o resultado.
+- Escritas atômicas (temporário + rename): leitores não travam e nunca
+  veem arquivo pela metade.
+- Se a releitura falhar e houver snapshot, ele é usado e o DataFrame sai
+  com attrs["snapshot_desatualizado"] = True.
+
+Validade: o snapshot é a única camada de cache das leituras que passam
+por ele (sem st.cache_data na frente). Um dado servido tem no máximo
+SHEETS_SNAPSHOT_TTL segundos desde a última leitura ou confirmação de
+versão no Drive; a exceção é a falha na releitura, marcada com
+snapshot_desatualizado.
+
+Desligável com SHEETS_SNAPSHOT=0.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from app.config import get_data_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+# Idade (s) até a qual o snapshot vale sem nenhuma consulta
+TTL_SNAPSHOT = 300
+
+CarregarVarios = Callable[[list], dict]
+VersaoSnapshot = Callable[[str], Optional[str]]
+
+
+def snapshot_habilitado() -> bool:
+    valor = os.getenv("SHEETS_SNAPSHOT", "1").strip().lower()
+    return valor not in {"0", "false", "nao", "não"}
+
+
+def _ttl() -> float:
+    try:
+        return float(os.getenv("SHEETS_SNAPSHOT_TTL", TTL_SNAPSHOT))
+    except ValueError:
+        return TTL_SNAPSHOT
+
+
+# ======================================================
+# API
+# ======================================================
+def obter_snapshot(
+    nome: str,
+    carregar: Callable[[], pd.DataFrame],
+    versao: Callable[[], Optional[str]] = lambda: None,
+) -> pd.DataFrame:
+    """
+    DataFrame do snapshot `nome`, relido com carregar() se vencido.
+    versao(): versão atual do arquivo de origem (None = desconhecida).
+    """
+    return obter_snapshots(
+        [nome],
+        lambda nomes: {nome: carregar()},
+        lambda _: versao(),
+    )[nome]
+
+
+def obter_snapshots(
+    nomes: list,
+    carregar: CarregarVarios,
+    versao: VersaoSnapshot = lambda nome: None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Vários snapshots de uma vez (ex.: abas lidas no mesmo lote).
+
+    carregar(nomes vencidos) -> {nome: DataFrame} só dos vencidos.
+    versao(nome) -> versão atual da origem do snapshot.
+    """
+    if not snapshot_habilitado():
+        return carregar(list(nomes))
+
+    resultado = {nome: _ler_se_recente(nome) for nome in nomes}
+    vencidos = [nome for nome, df in resultado.items() if df is None]
+
+    if not vencidos:
+        return resultado
+
+    with _travar(vencidos):
+        # Outro processo pode ter atualizado enquanto esperávamos a trava
+        for nome in vencidos:
+            resultado[nome] = _ler_se_recente(nome)
+
+        # Versão consultada uma vez por snapshot, antes da leitura: se
+        # mudar durante, a próxima consulta relê
+        faltantes = {}
+        for nome in vencidos:
+            if resultado[nome] is not None:
+                continue
+
+            meta = _ler_meta(nome)
+            atual = versao(nome)
+
+            if meta and atual is not None and meta.get("versao") == atual:
+                _gravar_meta(nome, {**meta, "gravado_em": time.time()})
+                resultado[nome] = _ler_parquet(nome)
+            else:
+                faltantes[nome] = atual
+
+        if faltantes:
+            resultado.update(_atualizar(faltantes, carregar))
+
+    return resultado
+
+
+def limpar_snapshots(prefixo: str = "") -> None:
+    """
+    Remove os snapshots (todos, ou os com nome começando por `prefixo`).
+    """
+    pasta = _pasta()
+    for arquivo in pasta.glob(f"{prefixo}*"):
+        if arquivo.suffix in {".parquet", ".json"}:
+            arquivo.unlink(missing_ok=True)
+
+
+# ======================================================
+# ATUALIZAÇÃO
+# ======================================================
+def _atualizar(versoes: dict, carregar: CarregarVarios) -> dict:
+    """
+    Relê e grava os snapshots ({nome: versão da origem}). Chamar com a trava.
+    """
+    nomes = list(versoes)
+
+    try:
+        novos = carregar(list(nomes))
+    except Exception as e:
+        sem_copia = [nome for nome in nomes if not _caminho(nome, ".parquet").exists()]
+        if sem_copia:
+            raise
+
+        logger.warning(
+            "Falha ao atualizar planilhas; usando snapshot em disco",
+            extra={"snapshots": nomes, "erro": str(e)},
+        )
+        antigos = {nome: _ler_parquet(nome) for nome in nomes}
+        for df in antigos.values():
+            df.attrs["snapshot_desatualizado"] = True
+        return antigos
+
+    for nome in nomes:
+        _gravar_parquet(nome, novos[nome])
+        _gravar_meta(
+            nome,
+            {"versao": versoes[nome], "gravado_em": time.time(), "linhas": len(novos[nome])},
+        )
+
+    return {nome: novos[nome] for nome in nomes}
+
+
+# ======================================================
+# ARQUIVOS
+# ======================================================
+def _pasta() -> Path:
+    pasta = get_data_dir() / "sheets" / "snapshots"
+    pasta.mkdir(parents=True, exist_ok=True)
+    return pasta
+
+
+def _caminho(nome: str, sufixo: str) -> Path:
+    return _pasta() / f"{nome}{sufixo}"
+
+
+def _ler_meta(nome: str) -> Optional[dict]:
+    try:
+        return json.loads(_caminho(nome, ".json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _ler_parquet(nome: str) -> pd.DataFrame:
+    # attrs (ex.: "campos" da leitura tipada) voltam junto; o texto volta
+    # como string[pyarrow], igual à leitura direta
+    with pd.option_context("mode.string_storage", "pyarrow"):
+        return pd.read_parquet(_caminho(nome, ".parquet"))
+
+
+def _ler_se_recente(nome: str) -> Optional[pd.DataFrame]:
+    meta = _ler_meta(nome)
+    if not meta or time.time() - meta.get("gravado_em", 0) >= _ttl():
+        return None
+
+    try:
+        return _ler_parquet(nome)
+    except (FileNotFoundError, OSError, pa.ArrowInvalid):
+        return None
+
+
+def _gravar_parquet(nome: str, df: pd.DataFrame) -> None:
+    _substituir(_caminho(nome, ".parquet"), lambda temporario: df.to_parquet(temporario, index=False))
+
+
+def _gravar_meta(nome: str, meta: dict) -> None:
+    # Depois do parquet: meta nova sempre aponta para dados novos
+    _substituir(
+        _caminho(nome, ".json"),
+        lambda temporario: temporario.write_text(json.dumps(meta), encoding="utf-8"),
+    )
+
+
+def _substituir(caminho: Path, escrever: Callable[[Path], object]) -> None:
+    """
+    Escrita atômica (arquivo temporário + rename).
+    """
+    temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        temporario.unlink(missing_ok=True)
+
+
+# ======================================================
+# TRAVA ENTRE PROCESSOS
+# ======================================================
+@contextmanager
+def _travar(nomes: list) -> Iterator[None]:
+    """
+    Trava exclusiva dos snapshots (arquivos <nome>.lock), sempre na mesma
+    ordem para não haver impasse entre lotes diferentes.
+    """
+    with ExitStack() as pilha:
+        for nome in sorted(set(nomes)):
+            pilha.enter_context(_travar_arquivo(_caminho(nome, ".lock")))
+        yield
+
+
+@contextmanager
+def _travar_arquivo(caminho: Path) -> Iterator[None]:
+    with open(caminho, "a+b") as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            # LK_LOCK desiste após ~10 s; continua esperando
+            while True:
+                try:
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
@@ -13,6 +13,7 @@ def carregar_tecnicos_fechamento(
         data_inicio=data_inicio,
         data_fim=data_fim,
         tipo_data="data_termino_executado",
+        campos=["usuario_fechamento.name"],
     )
 
     if df.empty or "usuario_fechamento.name" not in df.columns:
@@ -0,0 +1,70 @@
+"""
+Benchmark: json da stdlib x decodificador rápido em respostas grandes.
+
+Gera um payload sintético no formato do /query/json do Metabase e mede
+decodificação e montagem do DataFrame.
+
+Uso:
+    python -m app.benchmarks.bench_decodificacao_json [linhas]
+"""
+import json
+import sys
+import time
+
+import pandas as pd
+
+from app.utils.json_rapido import decodificar_json, nome_decodificador
+
+REPETICOES = 3
+
+
+def gerar_payload(linhas: int) -> bytes:
+    registros = [
+        {
+            "numero_ordem_servico": 100000 + i,
+            "codigo_cliente": 5000 + i % 7000,
+            "nome_cliente": f"CLIENTE {i:06d} DA SILVA",
+            "tipo_ordem_servico": "INSTALAÇÃO (R$ 100,00)",
+            "status": "FINALIZADO",
+            "cidade": "Santarém" if i % 3 else "Manaus",
+            "tecnico": f"TECNICO_{i % 40:02d}",
+            "data_cadastro_os": "2026-01-12T08:15:00",
+            "data_termino_executado": "2026-01-14T17:42:10",
+            "valor": 100.0 + i % 50,
+        }
+        for i in range(linhas)
+    ]
+    return json.dumps(registros, ensure_ascii=False).encode("utf-8")
+
+
+def medir(func, *args) -> float:
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        func(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payload = gerar_payload(linhas)
+
+    print(f"payload: {linhas} linhas, {len(payload) / 1e6:.1f} MB")
+
+    t_json = medir(json.loads, payload)
+    t_rapido = medir(decodificar_json, payload)
+    print(f"json (stdlib)      decodificação: {t_json:.3f}s")
+    print(f"{nome_decodificador():<18} decodificação: {t_rapido:.3f}s")
+
+    dados = decodificar_json(payload)
+    t_df = medir(pd.DataFrame, dados)
+    t_colunas = medir(
+        lambda d: pd.DataFrame({k: [r.get(k) for r in d] for k in d[0]}), dados
+    )
+    print(f"DataFrame (linhas)             : {t_df:.3f}s")
+    print(f"DataFrame (colunas via Python) : {t_colunas:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
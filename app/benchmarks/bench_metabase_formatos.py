@@ -0,0 +1,125 @@
+"""
+Benchmark: exportação JSON x CSV do card do Metabase.
+
+Gera o mesmo resultado sintético nos dois formatos e mede, para cada um:
+bytes transferidos, tempo de parse até o DataFrame e pico de memória
+(Python via tracemalloc + pool de memória do Arrow). Cada medição roda
+em um processo novo para o pico não ser contaminado pela anterior.
+
+Uso:
+    python -m app.benchmarks.bench_metabase_formatos [linhas]
+"""
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+COLUNAS = [
+    "numero_ordem_servico",
+    "codigo_cliente",
+    "nome_cliente",
+    "tipo_ordem_servico",
+    "status",
+    "cidade",
+    "usuario_fechamento",
+    "data_cadastro_os",
+    "data_termino_executado",
+    "valor",
+]
+
+
+def gerar_linhas(linhas: int) -> list[list]:
+    return [
+        [
+            100000 + i,
+            5000 + i % 7000,
+            f"CLIENTE {i:06d} DA SILVA",
+            "INSTALAÇÃO (R$ 100,00)",
+            "FINALIZADO",
+            "Santarém" if i % 3 else "Manaus",
+            f"TEC_{i % 40:02d}",
+            "12/01/2026 08:15",
+            "14/01/2026 17:42",
+            100.0 + i % 50,
+        ]
+        for i in range(linhas)
+    ]
+
+
+def gerar_payloads(linhas: int, pasta: Path) -> dict[str, Path]:
+    dados = gerar_linhas(linhas)
+
+    caminho_json = pasta / "card.json"
+    caminho_json.write_bytes(
+        json.dumps([dict(zip(COLUNAS, linha)) for linha in dados], ensure_ascii=False).encode("utf-8")
+    )
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUNAS)
+    escritor.writerows(dados)
+    caminho_csv = pasta / "card.csv"
+    caminho_csv.write_bytes(buffer.getvalue().encode("utf-8"))
+
+    return {"json": caminho_json, "csv": caminho_csv}
+
+
+def medir(formato: str, caminho: str) -> dict:
+    import pandas as pd
+    import pyarrow as pa
+
+    from app.analysis.metabase_service import csv_para_dataframe
+    from app.utils.json_rapido import decodificar_json
+
+    conteudo = Path(caminho).read_bytes()
+
+    def parse():
+        if formato == "csv":
+            return csv_para_dataframe(conteudo)
+        return pd.DataFrame(decodificar_json(conteudo))
+
+    # Tempo sem tracemalloc (ele pesa muito nas alocações do caminho JSON)
+    inicio = time.perf_counter()
+    df = parse()
+    tempo = time.perf_counter() - inicio
+    del df
+
+    tracemalloc.start()
+    df = parse()
+    _, pico_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "formato": formato,
+        "bytes": len(conteudo),
+        "tempo_s": tempo,
+        "pico_mb": (pico_python + pa.default_memory_pool().max_memory()) / 1e6,
+        "memoria_df_mb": df.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def main() -> None:
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as pasta:
+        payloads = gerar_payloads(linhas, Path(pasta))
+
+        print(f"{linhas} linhas")
+        print(f"{'formato':<8}{'bytes (MB)':>12}{'parse (s)':>12}{'pico (MB)':>12}{'DataFrame (MB)':>16}")
+
+        for formato, caminho in payloads.items():
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                r = pool.submit(medir, formato, str(caminho)).result()
+            print(
+                f"{r['formato']:<8}{r['bytes'] / 1e6:>12.1f}{r['tempo_s']:>12.3f}"
+                f"{r['pico_mb']:>12.1f}{r['memoria_df_mb']:>16.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
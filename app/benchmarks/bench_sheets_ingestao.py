@@ -0,0 +1,117 @@
+"""
+Benchmark: montagem do DataFrame a partir da resposta do values.get.
+
+Compara o caminho antigo (completar cada linha em Python + DataFrame de
+objetos) com linhas_para_dataframe (colunar, string[pyarrow]) numa aba
+sintética com linhas irregulares, como a API devolve: células vazias no
+fim da linha são omitidas.
+
+Mede a montagem, a memória do DataFrame e uma normalização típica das
+regras do financeiro (.str.strip().str.upper() em 5 colunas).
+
+Também compara a leitura projetada (batchGet com majorDimension=COLUMNS):
+transpor as colunas para linhas e montar como antes, contra
+colunas_para_dataframe, que monta direto das colunas.
+
+Uso:
+    python -m app.benchmarks.bench_sheets_ingestao [linhas] [colunas]
+"""
+import random
+import sys
+import time
+
+import pandas as pd
+
+from app.analysis.google_sheets import (
+    colunas_para_dataframe,
+    linhas_para_dataframe,
+    normalize_headers,
+)
+
+REPETICOES = 3
+
+
+def gerar_aba(linhas: int, colunas: int) -> list[list[str]]:
+    aleatorio = random.Random(42)
+    cabecalho = [f"COLUNA {j}" for j in range(colunas)]
+
+    corpo = [
+        [
+            f" valor {i}-{j} " if aleatorio.random() > 0.3 else ""
+            for j in range(aleatorio.randint(0, colunas))
+        ]
+        for i in range(linhas)
+    ]
+    return [cabecalho] + corpo
+
+
+def montar_antigo(values: list[list[str]]) -> pd.DataFrame:
+    headers = normalize_headers(values[0])
+    num_cols = len(headers)
+
+    normalized_rows = [
+        row[:num_cols] + [""] * (num_cols - len(row))
+        for row in values[1:]
+    ]
+    return pd.DataFrame(normalized_rows, columns=headers)
+
+
+def gerar_colunas(values: list[list[str]]) -> list[list[str]]:
+    """
+    A mesma aba como a API devolve em majorDimension=COLUMNS.
+    """
+    colunas = []
+    for j in range(len(values[0])):
+        coluna = [linha[j] if j < len(linha) else "" for linha in values]
+        while coluna and coluna[-1] == "":
+            coluna.pop()
+        colunas.append(coluna)
+    return colunas
+
+
+def montar_colunas_antigo(colunas: list[list[str]]) -> pd.DataFrame:
+    total = max(len(coluna) for coluna in colunas)
+    values = [
+        [coluna[i] if i < len(coluna) else "" for coluna in colunas]
+        for i in range(total)
+    ]
+    return montar_antigo(values)
+
+
+def normalizar(df: pd.DataFrame) -> None:
+    for coluna in df.columns[:5]:
+        df[coluna].str.strip().str.upper()
+
+
+def cronometrar(func, *args) -> tuple[float, object]:
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main() -> None:
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    colunas = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    values = gerar_aba(linhas, colunas)
+    print(f"{linhas} linhas x {colunas} colunas (irregulares)")
+    print(f"{'caminho':<14}{'montagem (s)':>14}{'DataFrame (MB)':>16}{'normalização (s)':>18}")
+
+    casos = (
+        ("antigo", montar_antigo, values),
+        ("colunar", linhas_para_dataframe, values),
+        ("proj. antigo", montar_colunas_antigo, gerar_colunas(values)),
+        ("proj. col.", colunas_para_dataframe, gerar_colunas(values)),
+    )
+    for nome, montar, entrada in casos:
+        tempo, df = cronometrar(montar, entrada)
+        tempo_norm, _ = cronometrar(normalizar, df)
+        memoria = df.memory_usage(deep=True).sum() / 1e6
+        print(f"{nome:<14}{tempo:>14.3f}{memoria:>16.1f}{tempo_norm:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
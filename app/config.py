@@ -1,5 +1,5 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -18,6 +18,9 @@ class HubSoftAccountConfig:
     user: str
     password: str
     timeout: int = 30
+    max_concorrencia: int = 4
+    requisicoes_por_segundo: float = 10.0
+    max_tentativas: int = 4
 
 
 def _get_env(name: str) -> str:
@@ -27,6 +30,26 @@ def _get_env(name: str) -> str:
     return value
 
 
+def _get_env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise EnvironmentError(f"Variável de ambiente inválida (inteiro): {name}")
+
+
+def _get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise EnvironmentError(f"Variável de ambiente inválida (número): {name}")
+
+
 def get_hubsoft_account_config(account: str) -> HubSoftAccountConfig:
     account = account.upper()
 
@@ -43,9 +66,21 @@ def get_hubsoft_account_config(account: str) -> HubSoftAccountConfig:
         client_secret=_get_env(f"{prefix}CLIENT_SECRET"),
         user=_get_env(f"{prefix}USER"),
         password=_get_env(f"{prefix}PASSWORD"),
+        max_concorrencia=max(1, _get_env_int(f"{prefix}MAX_CONCORRENCIA", 4)),
+        # 0 desliga o limitador de taxa
+        requisicoes_por_segundo=_get_env_float(f"{prefix}RPS", 10.0),
+        max_tentativas=max(1, _get_env_int(f"{prefix}MAX_TENTATIVAS", 4)),
     )
 
 
+# === DIRETÓRIO DE DADOS LOCAIS ===================================
+def get_data_dir() -> Path:
+    """
+    Diretório para caches e bases locais (APP_DATA_DIR ou <raiz>/data).
+    """
+    data_dir = Path(os.getenv("APP_DATA_DIR") or ROOT_DIR / "data")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
 
 
 # === GOOGLE SHEETS CONFIG =======================================
@@ -100,6 +135,23 @@ def get_google_sheets_config() -> GoogleSheetsConfig:
 class MetabaseReportConfig:
     base_url: str
     cards: dict
+    # card -> {filtro lógico: template tag} aceitos pelo card
+    filtros: dict = field(default_factory=dict)
+    # card -> formato de exportação ("json" ou "csv")
+    formatos: dict = field(default_factory=dict)
+
+
+def _get_env_filtros(name: str) -> dict:
+    """
+    Lê pares "filtro:tag" separados por vírgula.
+    Ex.: "tipos_os:tipo_os,cidades:cidade" (sem ":tag", usa o próprio nome).
+    """
+    filtros = {}
+    for item in (os.getenv(name) or "").split(","):
+        filtro, _, tag = item.strip().partition(":")
+        if filtro:
+            filtros[filtro.strip()] = tag.strip() or filtro.strip()
+    return filtros
 
 
 def get_metabase_config(account: str) -> MetabaseReportConfig:
@@ -116,7 +168,20 @@ def get_metabase_config(account: str) -> MetabaseReportConfig:
         "fila": _get_env(f"{account}_CARD_FILA"),
     }
 
+    # Template tags de filtro que cada card aceita (pushdown)
+    filtros = {
+        tipo: _get_env_filtros(f"{account}_CARD_{tipo.upper()}_FILTROS")
+        for tipo in cards
+    }
+
+    formatos = {
+        tipo: (os.getenv(f"{account}_CARD_{tipo.upper()}_FORMATO") or "json").strip().lower()
+        for tipo in cards
+    }
+
     return MetabaseReportConfig(
         base_url=base_url,
         cards=cards,
+        filtros=filtros,
+        formatos=formatos,
     )
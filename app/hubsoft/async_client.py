@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine, TypeVar
+
+from app.hubsoft.client import HubSoftClient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Executor próprio: o padrão do asyncio é pequeno em containers com 1 CPU
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hubsoft")
+
+# Semáforo por conta dentro de cada event loop (asyncio.Semaphore não
+# atravessa loops); some junto com o loop
+_semaforos_conta: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaforos_lock = threading.Lock()
+
+
+def _semaforo_da_conta(config) -> asyncio.Semaphore:
+    """
+    Semáforo da conta no loop atual, comum a todas as instâncias dele.
+    """
+    loop = asyncio.get_running_loop()
+
+    with _semaforos_lock:
+        por_conta = _semaforos_conta.setdefault(loop, {})
+        semaforo = por_conta.get(config.name)
+        if semaforo is None:
+            semaforo = asyncio.Semaphore(max(1, config.max_concorrencia))
+            por_conta[config.name] = semaforo
+
+    return semaforo
+
+
+class AsyncHubSoftClient:
+    """
+    Versão assíncrona do HubSoftClient.
+
+    Reaproveita o client síncrono da conta (sessão keep-alive e token
+    compartilhados). Requisições em voo limitadas em dois níveis:
+    - `max_concorrencia` por instância (uma carga);
+    - config.max_concorrencia por conta, somando todas as instâncias do
+      mesmo event loop (ex.: várias janelas de um período).
+    Entre loops diferentes (cada run_sync tem o seu), quem segura a conta é
+    o limite adaptativo do client síncrono; o excedente espera numa thread
+    do executor.
+    Crie uma instância por event loop.
+    """
+
+    def __init__(
+        self,
+        client: HubSoftClient,
+        max_concorrencia: int | None = None,
+    ) -> None:
+        self.client = client
+        self.config = client.config
+        self.max_concorrencia = max(
+            1, max_concorrencia or client.config.max_concorrencia
+        )
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+    async def authenticate(self) -> None:
+        # Pela trava do client: logins paralelos viram um só
+        await self._executar(self.client._ensure_authenticated)
+
+    async def get(self, path: str, params: dict | None = None) -> dict:
+        """
+        GET genérico para a API HubSoft
+        """
+        async with self._semaforo, _semaforo_da_conta(self.config):
+            return await self._executar(self.client.get, path, params)
+
+    async def _executar(self, func, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Executa uma corrotina a partir de código síncrono (UI Streamlit, scripts).
+    Se a thread atual já tiver um loop rodando, usa uma thread auxiliar.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
@@ -1,15 +1,45 @@
 import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from app.config import HubSoftAccountConfig
+from app.utils.json_rapido import decodificar_resposta
+from app.utils.resiliencia import (
+    STATUS_RETENTAVEIS,
+    ConcorrenciaAdaptativa,
+    Metricas,
+    TokenBucket,
+    calcular_backoff,
+    ler_retry_after,
+)
 
 logger = logging.getLogger(__name__)
 
+# Renova o token um pouco antes de expirar, para não perder requisições em voo
+MARGEM_RENOVACAO_TOKEN = 60
+
 
 class HubSoftClient:
     def __init__(self, config: HubSoftAccountConfig) -> None:
         self.config = config
         self.session = requests.Session()
         self.token: str | None = None
+        self.token_expira_em: float | None = None
+        self._lock_auth = threading.Lock()
+
+        # Limites da conta, compartilhados por todas as threads/sessões
+        self.limitador = TokenBucket(config.requisicoes_por_segundo)
+        self.concorrencia = ConcorrenciaAdaptativa(maximo=config.max_concorrencia)
+        self.metricas = Metricas()
+
+        # Pool keep-alive dimensionado para a paginação concorrente
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=max(10, config.max_concorrencia),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
         logger.info(
             "Inicializando HubSoftClient",
@@ -57,12 +87,19 @@ class HubSoftClient:
 
         response.raise_for_status()
 
-        token = response.json().get("access_token")
+        data = decodificar_resposta(response)
+        token = data.get("access_token")
         if not token:
             raise RuntimeError(
                 f"Token não retornado pela API HubSoft ({self.config.name})"
             )
 
+        try:
+            self.token_expira_em = time.monotonic() + float(data.get("expires_in"))
+        except (TypeError, ValueError):
+            # Sem validade informada: mantém até receber 401
+            self.token_expira_em = None
+
         self.token = token
         self.session.headers.update(
             {
@@ -76,15 +113,51 @@ class HubSoftClient:
             extra={"conta": self.config.name},
         )
 
-    def _ensure_authenticated(self) -> None:
+    def _token_valido(self) -> bool:
         if not self.token:
-            self.authenticate()
+            return False
+
+        if self.token_expira_em is None:
+            return True
+
+        return time.monotonic() < self.token_expira_em - MARGEM_RENOVACAO_TOKEN
+
+    def _ensure_authenticated(self) -> str:
+        """
+        Garante token válido e devolve o token em uso.
+        Chamadas paralelas esperam um único login.
+
+        Checagem e leitura ficam sob a trava: fora dela, um _renovar_token
+        em outra thread pode zerar o token entre as duas.
+        """
+        with self._lock_auth:
+            if not self._token_valido():
+                self.authenticate()
+            return self.token
+
+    def _renovar_token(self, token_rejeitado: str) -> str:
+        """
+        Renova o token após um 401, a menos que outra thread já o tenha feito.
+        """
+        with self._lock_auth:
+            if self.token == token_rejeitado:
+                logger.info(
+                    "Token rejeitado (401), renovando",
+                    extra={"conta": self.config.name},
+                )
+                self.token = None
+                self.authenticate()
+            return self.token
 
     def get(self, path: str, params: dict | None = None) -> dict:
         """
-        GET genérico para a API HubSoft
+        GET genérico para a API HubSoft.
+
+        Passa pelo limitador de taxa e pela concorrência adaptativa da conta;
+        429/5xx e falhas de conexão são repetidos com backoff (Retry-After
+        é respeitado), até config.max_tentativas.
         """
-        self._ensure_authenticated()
+        token = self._ensure_authenticated()
 
         url = f"{self.config.api_base}/{path.lstrip('/')}"
         logger.info(
@@ -96,11 +169,54 @@ class HubSoftClient:
             },
         )
 
-        response = self.session.get(
-            url,
-            params=params,
-            timeout=self.config.timeout,
-        )
+        tentativa = 0
+        renovou_token = False
+
+        while True:
+            response, erro = self._get_limitado(url, params, token)
+
+            if response is not None and response.status_code == 401 and not renovou_token:
+                token = self._renovar_token(token)
+                renovou_token = True
+                continue
+
+            status = response.status_code if response is not None else None
+            retentavel = erro is not None or status in STATUS_RETENTAVEIS
+
+            if not retentavel or tentativa + 1 >= self.config.max_tentativas:
+                break
+
+            retry_after = (
+                ler_retry_after(response.headers.get("Retry-After"))
+                if response is not None
+                else None
+            )
+            espera = calcular_backoff(tentativa, retry_after=retry_after)
+
+            if status == 429:
+                # Throttling vale para a conta toda, não só para esta thread
+                self.limitador.pausar(espera)
+
+            self.metricas.somar("retries")
+            logger.warning(
+                "GET HubSoft falhou, nova tentativa",
+                extra={
+                    "conta": self.config.name,
+                    "url": url,
+                    "status": status,
+                    "erro": str(erro) if erro else None,
+                    "tentativa": tentativa + 1,
+                    "espera": round(espera, 2),
+                    "limite_concorrencia": self.concorrencia.limite,
+                },
+            )
+
+            time.sleep(espera)
+            tentativa += 1
+
+        if response is None:
+            self.metricas.somar("falhas")
+            raise erro
 
         logger.info(
             "Resposta GET recebida",
@@ -110,5 +226,72 @@ class HubSoftClient:
             },
         )
 
+        if not response.ok:
+            self.metricas.somar("falhas")
         response.raise_for_status()
-        return response.json()
+        return decodificar_resposta(response)
+
+    def _get_limitado(
+        self,
+        url: str,
+        params: dict | None,
+        token: str,
+    ) -> tuple[requests.Response | None, Exception | None]:
+        """
+        Uma tentativa de GET passando pelo limitador de taxa e de concorrência.
+        Erros de conexão/timeout voltam como (None, erro) para o retry decidir.
+        """
+        espera = self.limitador.adquirir()
+        if espera > 0:
+            self.metricas.somar("throttles_locais")
+            self.metricas.somar("espera_limitador_s", espera)
+
+        self.concorrencia.adquirir()
+        inicio = time.monotonic()
+        response = None
+        erro = None
+
+        try:
+            response = self._executar_get(url, params, token)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            erro = e
+        finally:
+            status = response.status_code if response is not None else None
+            self.concorrencia.liberar(
+                time.monotonic() - inicio,
+                sobrecarga=erro is not None or status in (429, 503),
+            )
+
+        self.metricas.somar("requisicoes")
+        if status == 429:
+            self.metricas.somar("throttles_servidor")
+        elif status is not None and status >= 500:
+            self.metricas.somar("erros_servidor")
+        elif erro is not None:
+            self.metricas.somar("erros_conexao")
+
+        return response, erro
+
+    def resumo_metricas(self) -> dict:
+        """
+        Contadores do client + estado atual dos limitadores.
+        """
+        return {
+            "conta": self.config.name,
+            **self.metricas.snapshot(),
+            "limite_concorrencia": self.concorrencia.limite,
+            "latencia_media_s": self.concorrencia.latencia_media,
+        }
+
+    def _executar_get(
+        self,
+        url: str,
+        params: dict | None,
+        token: str,
+    ) -> requests.Response:
+        return self.session.get(
+            url,
+            params=params,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=self.config.timeout,
+        )
@@ -1,7 +1,32 @@
+import threading
+
 from app.config import get_hubsoft_account_config
 from app.hubsoft.client import HubSoftClient
 
+# Um client por conta no processo: reaproveita sessão keep-alive e token
+_clients: dict[str, HubSoftClient] = {}
+_clients_lock = threading.Lock()
+
 
 def get_hubsoft_client(account: str) -> HubSoftClient:
-    config = get_hubsoft_account_config(account)
-    return HubSoftClient(config)
+    chave = account.lower()
+
+    with _clients_lock:
+        client = _clients.get(chave)
+
+        if client is None:
+            config = get_hubsoft_account_config(account)
+            client = HubSoftClient(config)
+            _clients[chave] = client
+
+    return client
+
+
+def reset_hubsoft_clients() -> None:
+    """
+    Descarta os clients em cache (ex.: após trocar credenciais no .env).
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.session.close()
+        _clients.clear()
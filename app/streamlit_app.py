@@ -18,6 +18,7 @@ from app.ui.debug_financeiro_app import render_debug_sheets
 from app.ui.naoUsado.fechamento_tecnicos_app import render
 from app.ui.qualidade_app import render_qualidade
 from app.ui.BackOffice_app import render_60_vendas
+from app.warmup import iniciar_aquecimento_em_processo
 
 
 # ======================================================
@@ -29,6 +30,9 @@ st.set_page_config(
 )
 
 
+# Aquecimento agendado dos caches (só com WARMUP_HORARIOS definido)
+iniciar_aquecimento_em_processo()
+
 # Inicializa estado
 if "pagina" not in st.session_state:
     st.session_state.pagina = "Home"
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pandas as pd
+
+from app.utils.cache_swr import cache_swr
+
+
+def test_vencido_volta_na_hora_e_revalida_em_segundo_plano():
+    cargas = []
+    liberar = threading.Event()
+
+    @cache_swr(ttl=0.05)
+    def carregar(conta):
+        cargas.append(conta)
+        if len(cargas) > 1:
+            liberar.wait(timeout=2)
+        return pd.DataFrame({"versao": [len(cargas)]})
+
+    primeiro = carregar("mania")
+    assert primeiro["versao"].tolist() == [1]
+    assert "atualizado_em" in primeiro.attrs
+
+    time.sleep(0.1)
+
+    inicio = time.monotonic()
+    antigo = carregar("mania")
+    assert time.monotonic() - inicio < 0.5
+    assert antigo["versao"].tolist() == [1]
+    assert antigo.attrs["atualizado_em"] == primeiro.attrs["atualizado_em"]
+
+    liberar.set()
+    for _ in range(100):
+        if carregar.cache.revalidando() == 0:
+            break
+        time.sleep(0.01)
+
+    novo = carregar("mania")
+    assert novo["versao"].tolist() == [2]
+    assert novo.attrs["atualizado_em"] > primeiro.attrs["atualizado_em"]
+
+
+def test_falha_na_revalidacao_mantem_valor_antigo():
+    estado = {"falhar": False, "cargas": 0}
+
+    @cache_swr(ttl=0.01)
+    def carregar(conta):
+        estado["cargas"] += 1
+        if estado["falhar"]:
+            raise RuntimeError("metabase fora")
+        return pd.DataFrame({"conta": [conta]})
+
+    carregar("mania")
+    estado["falhar"] = True
+    time.sleep(0.05)
+
+    assert carregar("mania")["conta"].tolist() == ["mania"]
+    for _ in range(100):
+        if carregar.cache.revalidando() == 0:
+            break
+        time.sleep(0.01)
+
+    assert estado["cargas"] == 2
+    assert carregar("mania")["conta"].tolist() == ["mania"]
@@ -0,0 +1,410 @@
+import json
+
+import httplib2
+import pandas as pd
+import pytest
+from googleapiclient.errors import HttpError
+
+from app.analysis import google_sheets
+
+
+class _ServicoFalso:
+    def __init__(self, value_ranges):
+        self.value_ranges = value_ranges
+        self.chamadas = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, **kwargs):
+        self.chamadas.append(kwargs)
+        return self
+
+    def execute(self):
+        return {"valueRanges": self.value_ranges}
+
+
+class _DriveFalso:
+    def __init__(self, modificado_em="2026-10-01T10:00:00Z"):
+        self.modificado_em = modificado_em
+        self.consultas = 0
+
+    def files(self):
+        return self
+
+    def get(self, **kwargs):
+        return self
+
+    def execute(self):
+        self.consultas += 1
+        return {"modifiedTime": self.modificado_em}
+
+
+@pytest.fixture(autouse=True)
+def _sem_estado(monkeypatch, tmp_path):
+    # Snapshots em disco têm testes próprios (test_sheets_snapshot)
+    monkeypatch.setenv("SHEETS_SNAPSHOT", "0")
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(google_sheets, "get_drive_service", lambda: _DriveFalso())
+    monkeypatch.setattr(google_sheets, "_sonda_drive", {"ativa": True, "pausada_ate": 0.0})
+    google_sheets._incremental.limpar()
+
+
+def test_colunas_para_dataframe_completa_celulas_vazias_do_fim():
+    df = google_sheets.colunas_para_dataframe(
+        [
+            ["Cliente", "1", "2", "3"],
+            ["OS", "10"],
+            [],
+        ]
+    )
+
+    assert list(df.columns) == ["Cliente", "OS", "COL_3"]
+    assert df["Cliente"].tolist() == ["1", "2", "3"]
+    assert df["OS"].tolist() == ["10", "", ""]
+    assert df["COL_3"].tolist() == ["", "", ""]
+
+
+def test_read_sheet_columns_pede_so_as_colunas(monkeypatch):
+    servico = _ServicoFalso(
+        [
+            {"values": [["Cliente", "1", "2"]]},
+            {"values": [["Status", "APROVADO"]]},
+        ]
+    )
+    monkeypatch.setattr(google_sheets, "_servico_da_thread", lambda api="sheets": servico if api == "sheets" else _DriveFalso())
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-51", "Aba 51"))
+
+    df = google_sheets.read_sheet_columns("51", ("h", "AH"))
+
+    assert servico.chamadas == [
+        {
+            "spreadsheetId": "id-51",
+            "ranges": ["'Aba 51'!H1:H", "'Aba 51'!AH1:AH"],
+            "majorDimension": "COLUMNS",
+        }
+    ]
+    assert df.to_dict("list") == {"Cliente": ["1", "2"], "Status": ["APROVADO", ""]}
+
+
+def test_read_sheet_columns_rejeita_coluna_invalida():
+    with pytest.raises(ValueError):
+        google_sheets.read_sheet_columns("51", ("H1",))
+
+
+def test_read_sheet_bundle_um_batchget_por_spreadsheet(monkeypatch):
+    planilhas = {
+        "51": ("id-51", "Aba 51"),
+        "51_STM": ("id-51", "Aba STM"),
+        "60": ("id-60", "Aba 60"),
+    }
+    respostas = {
+        "id-51": [
+            {"values": [["Cliente", "1"]]},
+            {"values": [["OS", "10"]]},
+            {},
+        ],
+        "id-60": [{"values": [["Status", "APROVADO"]]}],
+    }
+    chamadas = []
+
+    class Servico(_ServicoFalso):
+        def batchGet(self, **kwargs):
+            chamadas.append(kwargs)
+            self.value_ranges = respostas[kwargs["spreadsheetId"]]
+            return self
+
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", planilhas.__getitem__)
+    monkeypatch.setattr(google_sheets, "_servico_da_thread", lambda api="sheets": Servico([]) if api == "sheets" else _DriveFalso())
+
+    resultado = google_sheets.read_sheet_bundle(
+        (("51", ("H", "I")), ("51_STM", ("C",)), ("60", ("AF",)))
+    )
+
+    assert sorted(c["spreadsheetId"] for c in chamadas) == ["id-51", "id-60"]
+    assert resultado["51"].to_dict("list") == {"Cliente": ["1"], "OS": ["10"]}
+    assert resultado["51_STM"].empty
+    assert resultado["60"].to_dict("list") == {"Status": ["APROVADO"]}
+
+
+def test_read_sheet_bundle_falha_inteira(monkeypatch):
+    class Servico(_ServicoFalso):
+        def execute(self):
+            if self.chamadas[-1]["spreadsheetId"] == "id-60":
+                raise RuntimeError("quota")
+            return super().execute()
+
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: (f"id-{chave}", chave))
+    monkeypatch.setattr(
+        google_sheets,
+        "_servico_da_thread",
+        lambda api="sheets": Servico([{"values": [["A", "1"]]}]) if api == "sheets" else _DriveFalso(),
+    )
+
+    with pytest.raises(RuntimeError):
+        google_sheets.read_sheet_bundle((("51", ("A",)), ("60", ("A",))))
+
+
+def test_read_sheet_columns_segunda_leitura_so_busca_o_fim(monkeypatch):
+    servico = _ServicoFalso([{"values": [["Cliente"] + [str(i) for i in range(1, 101)]]}])
+    drive = _DriveFalso()
+    monkeypatch.setattr(google_sheets, "_servico_da_thread", lambda api="sheets": servico if api == "sheets" else drive)
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-60", "Aba 60"))
+
+    google_sheets.read_sheet_columns("60", ("D",))
+    drive.modificado_em = "2026-10-01T11:00:00Z"
+
+    # Da linha 52 (sobreposição de 50) em diante, com uma linha nova
+    servico.value_ranges = [{"values": [[str(i) for i in range(51, 102)]]}]
+    df = google_sheets.read_sheet_columns("60", ("D",))
+
+    assert servico.chamadas[-1]["ranges"] == ["'Aba 60'!D52:D"]
+    assert df["Cliente"].tolist() == [str(i) for i in range(1, 102)]
+
+
+def test_coluna_com_linha_apagada_no_meio_e_relida_inteira():
+    coluna = ["Cliente"] + [str(i) for i in range(1, 101)]
+    servico = _ServicoFalso([{"values": [coluna]}])
+    abas = [("60", "Aba 60", ["D"])]
+    google_sheets._buscar_colunas(servico, "id-60", abas, 1, "v1")
+
+    # Linha "10" apagada: da linha 52 em diante tudo sobe uma posição
+    coluna = coluna[:10] + coluna[11:] + ["101"]
+    respostas = [[coluna[51:]], [coluna]]
+
+    class Servico(_ServicoFalso):
+        def execute(self):
+            return {"valueRanges": [{"values": respostas.pop(0)}]}
+
+    servico = Servico([])
+    resultado = google_sheets._buscar_colunas(servico, "id-60", abas, 1, "v2")
+
+    assert [c["ranges"] for c in servico.chamadas] == [["'Aba 60'!D52:D"], ["'Aba 60'!D1:D"]]
+    assert resultado["60"]["Cliente"].tolist() == coluna[1:]
+
+
+def test_read_sheet_columns_sem_alteracao_no_drive_nao_le_valores(monkeypatch):
+    servico = _ServicoFalso([{"values": [["Cliente", "1", "2"]]}])
+    drive = _DriveFalso()
+    monkeypatch.setattr(google_sheets, "_servico_da_thread", lambda api="sheets": servico if api == "sheets" else drive)
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-60", "Aba 60"))
+
+    primeira = google_sheets.read_sheet_columns("60", ("D",))
+    segunda = google_sheets.read_sheet_columns("60", ("D",))
+
+    assert len(servico.chamadas) == 1
+    assert drive.consultas == 2
+    assert segunda.equals(primeira)
+
+
+def test_linhas_para_dataframe_linhas_irregulares():
+    df = google_sheets.linhas_para_dataframe(
+        [
+            ["A", "", "C"],
+            ["1", "2", "3", "além do cabeçalho"],
+            [],
+            ["4"],
+        ]
+    )
+
+    assert list(df.columns) == ["A", "COL_2", "C"]
+    assert df.to_dict("list") == {
+        "A": ["1", "", "4"],
+        "COL_2": ["2", "", ""],
+        "C": ["3", "", ""],
+    }
+    assert all(dtype == google_sheets.TIPO_TEXTO for dtype in df.dtypes)
+
+
+def test_linhas_para_dataframe_so_cabecalho():
+    df = google_sheets.linhas_para_dataframe([["A", "B"]])
+
+    assert list(df.columns) == ["A", "B"]
+    assert df.empty
+
+
+def test_linhas_para_dataframe_tipado_converte_pelo_esquema():
+    df = google_sheets.linhas_para_dataframe_tipado(
+        [
+            ["Cliente", "DATA", "Valor", "Status", "Obs"],
+            [12345, 46040.75, 10.5, " aprovado ", True],
+            [" 678 ", "", "", "reprovado"],
+            ["9", "sem data", "abc"],
+        ],
+        {"DATA": "data", "C": "numero", "D": "maiusculas", "data_hora_ausente": "data"},
+    )
+
+    assert df["Cliente"].tolist() == ["12345", "678", "9"]
+    assert df["DATA"].tolist()[0] == pd.Timestamp("2026-01-18")
+    assert df["DATA"].isna().tolist() == [False, True, True]
+    assert df["Valor"].tolist()[0] == 10.5
+    assert df["Valor"].isna().tolist() == [False, True, True]
+    assert df["Status"].tolist() == ["APROVADO", "REPROVADO", ""]
+    assert df["Obs"].tolist() == ["TRUE", "", ""]
+
+
+def test_read_sheet_typed_pede_valores_crus(monkeypatch):
+    pedidos = []
+
+    class Servico(_ServicoFalso):
+        def get(self, **kwargs):
+            pedidos.append(kwargs)
+            return self
+
+        def execute(self):
+            return {"values": [["Cliente", "Data"], [1, 46040]]}
+
+    monkeypatch.setattr(google_sheets, "get_sheets_service", lambda: Servico([]))
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-39", "Aba 39"))
+    monkeypatch.setitem(google_sheets.ESQUEMAS_PLANILHAS, "teste", {"B": "data_hora"})
+
+    df = google_sheets.read_sheet_typed("teste")
+
+    assert pedidos[0]["valueRenderOption"] == "UNFORMATTED_VALUE"
+    assert pedidos[0]["dateTimeRenderOption"] == "SERIAL_NUMBER"
+    assert df["Data"].tolist() == [pd.Timestamp("2026-01-18")]
+
+    with pytest.raises(ValueError):
+        google_sheets.read_sheet_typed("sem_esquema")
+
+
+def test_coluna_de_data_mistura_serie_e_texto():
+    df = google_sheets.linhas_para_dataframe_tipado(
+        [["Data"], [46040], ["12/02/2026"], ["31/01/2026 10:30"], [""], ["sem data"]],
+        {"Data": "data"},
+    )
+
+    assert df["Data"].tolist()[:3] == [
+        pd.Timestamp("2026-01-18"),
+        pd.Timestamp("2026-02-12"),
+        pd.Timestamp("2026-01-31"),
+    ]
+    assert df["Data"].isna().tolist()[3:] == [True, True]
+
+
+def test_read_sheet_fields_resolve_pelo_cabecalho_e_rele(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setitem(
+        google_sheets.CAMPOS_PLANILHAS,
+        "teste",
+        {"cliente": ("B", None), "status": ("C", None)},
+    )
+    aba = [["Id", "Cliente", "Status"], ["1", "C1", "OK"]]
+    projecoes = []
+
+    def bundle(pedidos, start_row, versao):
+        projecoes.append(pedidos)
+        (_, letras), = pedidos
+        posicoes = [google_sheets.indice_coluna(letra) for letra in letras]
+        return {"teste": google_sheets.colunas_para_dataframe(
+            [[linha[p] for linha in aba] for p in posicoes]
+        )}
+
+    monkeypatch.setattr(google_sheets, "_ler_bundle", bundle)
+    monkeypatch.setattr(google_sheets, "_ler_cabecalho", lambda chave, start_row: aba[0])
+
+    # Primeira leitura: aprende as âncoras nas letras conhecidas
+    google_sheets.read_sheet_fields((("teste", ("cliente", "status")),))
+
+    # Coluna inserida antes de "Cliente"
+    aba = [["Id", "Nova", "Cliente", "Status"], ["1", "x", "C1", "OK"]]
+    projecoes.clear()
+
+    resultado = google_sheets.read_sheet_fields((("teste", ("cliente", "status")),))
+
+    assert projecoes == [(("teste", ("B", "C")),), (("teste", ("C", "D")),)]
+    assert resultado["teste"].to_dict("list") == {"cliente": ["C1"], "status": ["OK"]}
+
+
+def test_selecionar_campos_da_leitura_tipada(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setitem(google_sheets.CAMPOS_PLANILHAS, "teste", {"data": ("A", None)})
+    monkeypatch.setitem(google_sheets.ESQUEMAS_PLANILHAS, "teste", {"data": "data"})
+    monkeypatch.setattr(
+        google_sheets,
+        "_ler_aba",
+        lambda chave, start_row, versao, tipado: [["Nova", "Data"], ["x", 46040]],
+    )
+
+    # Âncora aprendida em "A" antes da coluna nova
+    google_sheets.resolver_campos("teste", ["Data"])
+    df = google_sheets.read_sheet_typed("teste")
+
+    selecionado = google_sheets.selecionar_campos(df, ["data"])
+    assert selecionado["data"].tolist() == [pd.Timestamp("2026-01-18")]
+
+
+def test_leitura_tipada_so_tem_a_validade_do_snapshot(monkeypatch):
+    # Sem cache em memória na frente: vencido o snapshot e mudada a versão,
+    # a próxima chamada no mesmo processo já relê
+    monkeypatch.setenv("SHEETS_SNAPSHOT", "1")
+    monkeypatch.setenv("SHEETS_SNAPSHOT_TTL", "0")
+    monkeypatch.setitem(google_sheets.ESQUEMAS_PLANILHAS, "teste", {"Valor": "numero"})
+    drive = _DriveFalso("v1")
+    aba = [["Valor"], [1]]
+    monkeypatch.setattr(google_sheets, "get_drive_service", lambda: drive)
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-teste", "Aba"))
+    monkeypatch.setattr(google_sheets, "_ler_aba", lambda chave, start_row, versao, tipado: aba)
+
+    assert google_sheets.read_sheet_typed("teste")["Valor"].tolist() == [1.0]
+
+    drive.modificado_em = "v2"
+    aba = [["Valor"], [2]]
+
+    assert google_sheets.read_sheet_typed("teste")["Valor"].tolist() == [2.0]
+
+
+def test_snapshot_vencido_consulta_o_drive_uma_vez(monkeypatch):
+    monkeypatch.setenv("SHEETS_SNAPSHOT", "1")
+    monkeypatch.setenv("SHEETS_SNAPSHOT_TTL", "0")
+    servico = _ServicoFalso([{"values": [["Cliente", "1"]]}])
+    drive = _DriveFalso("v1")
+    monkeypatch.setattr(google_sheets, "_servico_da_thread", lambda api="sheets": servico if api == "sheets" else drive)
+    monkeypatch.setattr(google_sheets, "get_drive_service", lambda: drive)
+    monkeypatch.setattr(google_sheets, "_resolver_planilha", lambda chave: ("id-60", "Aba 60"))
+
+    google_sheets.read_sheet_columns("60", ("D",))
+    assert drive.consultas == 1
+
+    # Vencido e com versão nova: snapshot, gravação e cache incremental
+    # usam a mesma consulta de modifiedTime
+    drive.modificado_em = "v2"
+    servico.value_ranges = [{"values": [["Cliente", "1", "2"]]}]
+    df = google_sheets.read_sheet_columns("60", ("D",))
+
+    assert drive.consultas == 2
+    assert df["Cliente"].tolist() == ["1", "2"]
+
+
+class _DriveRecusa(_DriveFalso):
+    def __init__(self, motivo):
+        super().__init__()
+        self.motivo = motivo
+
+    def execute(self):
+        self.consultas += 1
+        corpo = {"error": {"code": 403, "errors": [{"reason": self.motivo}]}}
+        raise HttpError(httplib2.Response({"status": 403}), json.dumps(corpo).encode("utf-8"))
+
+
+def test_cota_do_drive_so_pausa_a_sonda(monkeypatch):
+    drive = _DriveRecusa("userRateLimitExceeded")
+
+    assert google_sheets._versao_planilha(drive, "id-60") is None
+    assert google_sheets._versao_planilha(drive, "id-60") is None
+    assert drive.consultas == 1
+
+    # Passada a pausa, volta a consultar
+    google_sheets._sonda_drive["pausada_ate"] = 0.0
+    assert google_sheets._versao_planilha(_DriveFalso("v1"), "id-60") == "v1"
+
+
+def test_drive_sem_permissao_desliga_a_sonda():
+    drive = _DriveRecusa("insufficientPermissions")
+
+    assert google_sheets._versao_planilha(drive, "id-60") is None
+    assert google_sheets._sonda_drive["ativa"] is False
+    assert google_sheets._versao_planilha(_DriveFalso("v1"), "id-60") is None
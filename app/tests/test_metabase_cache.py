@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.analysis.metabase_cache import carregar_card_por_dia
+
+
+@pytest.fixture(autouse=True)
+def _data_dir_temporario(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+
+
+class ConsultaFalsa:
+    def __init__(self):
+        self.dias: list[date] = []
+
+    def __call__(self, conta, tipo_relatorio, data_inicio, data_fim):
+        assert data_inicio == data_fim
+        self.dias.append(data_inicio)
+        if data_inicio.day % 2:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {"numero_ordem_servico": [data_inicio.day * 10, data_inicio.day * 10 + 1]}
+        )
+
+
+def _carregar(consulta, inicio, fim, hoje=date(2026, 3, 31)):
+    return carregar_card_por_dia(
+        "mania", "fechamento", inicio, fim, consulta, hoje=hoje
+    )
+
+
+def test_janela_deslocada_busca_so_o_dia_novo():
+    consulta = ConsultaFalsa()
+
+    df = _carregar(consulta, date(2026, 3, 1), date(2026, 3, 10))
+    assert sorted(consulta.dias) == [date(2026, 3, d) for d in range(1, 11)]
+    assert len(df) == 10  # 5 dias pares x 2 linhas
+
+    consulta.dias.clear()
+    df = _carregar(consulta, date(2026, 3, 2), date(2026, 3, 11))
+
+    assert consulta.dias == [date(2026, 3, 11)]
+    assert df["numero_ordem_servico"].tolist()[:2] == [20, 21]
+
+
+def test_dias_recentes_expiram(monkeypatch):
+    consulta = ConsultaFalsa()
+    hoje = date.today()
+
+    _carregar(consulta, hoje - timedelta(days=3), hoje, hoje=hoje)
+    consulta.dias.clear()
+
+    # Qualquer idade já passa do TTL dos dias recentes
+    monkeypatch.setenv("METABASE_CACHE_TTL_RECENTE", "0")
+
+    _carregar(consulta, hoje - timedelta(days=3), hoje, hoje=hoje)
+
+    assert sorted(consulta.dias) == [hoje - timedelta(days=1), hoje]
+
+
+def test_falha_em_um_dia_preserva_os_demais():
+    consulta = ConsultaFalsa()
+
+    def instavel(conta, tipo, inicio, fim):
+        if inicio == date(2026, 3, 5):
+            raise RuntimeError("metabase fora")
+        return consulta(conta, tipo, inicio, fim)
+
+    with pytest.raises(RuntimeError):
+        _carregar(instavel, date(2026, 3, 1), date(2026, 3, 6))
+
+    consulta.dias.clear()
+    _carregar(consulta, date(2026, 3, 1), date(2026, 3, 6))
+    assert consulta.dias == [date(2026, 3, 5)]
+
+
+def test_fatia_gravada_no_proprio_dia_e_rebuscada_depois():
+    consulta = ConsultaFalsa()
+    hoje = date.today()
+
+    # Gravada hoje, com o dia ainda aberto
+    _carregar(consulta, hoje, hoje, hoje=hoje)
+    consulta.dias.clear()
+
+    # Dois dias depois, a fatia não é definitiva: busca de novo
+    _carregar(consulta, hoje, hoje, hoje=hoje + timedelta(days=2))
+    assert consulta.dias == [hoje]
+
+    # A nova gravação também é anterior ao fim de hoje + 1: segue revalidando
+    consulta.dias.clear()
+    _carregar(consulta, hoje, hoje, hoje=hoje + timedelta(days=3))
+    assert consulta.dias == [hoje]
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app.analysis import metabase_datasets
+
+
+@pytest.fixture(autouse=True)
+def _limpar():
+    metabase_datasets.limpar_datasets()
+    yield
+    metabase_datasets.limpar_datasets()
+
+
+def _payload(conta):
+    return pd.DataFrame(
+        {
+            "numero_ordem_servico": [1, 2],
+            "usuario_fechamento": ["  TEC_A ", "TEC_B"],
+            "cidade": [" santarém", "MANAUS "],
+            "data_termino_executado": ["03/02/2026 10:00", "12/02/2026 08:30"],
+            "conta": [conta.upper()] * 2,
+        }
+    )
+
+
+def test_dataset_carregado_uma_vez_e_compartilhado(monkeypatch):
+    chamadas = []
+
+    def falso(conta, tipo, inicio, fim):
+        chamadas.append((conta, tipo))
+        return _payload(conta)
+
+    monkeypatch.setattr(metabase_datasets, "carregar_relatorio_metabase", falso)
+
+    periodo = (date(2026, 2, 1), date(2026, 2, 28))
+    df_qualidade = metabase_datasets.carregar_fechamento_contas(["mania"], *periodo)
+    df_tecnicos = metabase_datasets.carregar_fechamento_contas(["MANIA"], *periodo)
+    df_ambas = metabase_datasets.carregar_fechamento_contas(["mania", "amazonet"], *periodo)
+
+    assert chamadas == [("mania", "fechamento"), ("amazonet", "fechamento")]
+    assert len(df_ambas) == 4
+
+    assert df_tecnicos["usuario_fechamento"].tolist() == ["TEC_A", "TEC_B"]
+    assert df_tecnicos["cidade"].tolist() == ["Santarém", "Manaus"]
+    assert df_tecnicos["conta"].unique().tolist() == ["mania"]
+    assert df_tecnicos["data_termino_executado"].dt.day.tolist() == [3, 12]
+
+    # Alterações de uma página não vazam para as outras
+    df_qualidade["estado"] = "PA"
+    df_qualidade["cidade"] = ""
+    assert "estado" not in df_tecnicos.columns
+    assert df_tecnicos["cidade"].tolist() == ["Santarém", "Manaus"]
+
+    # Nem alterações no lugar
+    df_tecnicos.loc[0, "usuario_fechamento"] = "OUTRO"
+    df_tecnicos["numero_ordem_servico"].values[1] = 99
+    df_novo = metabase_datasets.carregar_fechamento_contas(["mania"], *periodo)
+    assert df_novo["usuario_fechamento"].tolist() == ["TEC_A", "TEC_B"]
+    assert df_novo["numero_ordem_servico"].tolist() == [1, 2]
+
+
+def test_filtros_locais_usam_o_mesmo_dataset(monkeypatch):
+    for nome, valor in {
+        "MANIA_BASE_URL": "https://metabase.local",
+        "MANIA_CARD_FECHAMENTO": "abc",
+        "MANIA_CARD_QUALIDADE": "def",
+        "MANIA_CARD_FILA": "ghi",
+    }.items():
+        monkeypatch.setenv(nome, valor)
+    monkeypatch.delenv("MANIA_CARD_FECHAMENTO_FILTROS", raising=False)
+
+    chamadas = []
+
+    def falso(conta, tipo, inicio, fim, **filtros):
+        chamadas.append(filtros)
+        df = _payload(conta)
+        df["tipo_ordem_servico"] = [" INSTALAÇÃO ", "RETIRADA"]
+        return df
+
+    monkeypatch.setattr(metabase_datasets, "carregar_relatorio_metabase", falso)
+
+    periodo = (date(2026, 2, 1), date(2026, 2, 28))
+    qualidade = metabase_datasets.carregar_fechamento_contas(["mania"], *periodo)
+    tecnicos = metabase_datasets.carregar_fechamento_contas(["mania"], *periodo, tipos_os=["INSTALAÇÃO"])
+    retirada = metabase_datasets.carregar_fechamento_contas(["mania"], *periodo, tipos_os=["RETIRADA "])
+
+    assert chamadas == [{}]
+    assert len(qualidade) == 2
+    assert tecnicos["numero_ordem_servico"].tolist() == [1]
+    assert retirada["numero_ordem_servico"].tolist() == [2]
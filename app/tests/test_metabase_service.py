@@ -0,0 +1,205 @@
+import json
+import urllib.parse
+from datetime import date
+
+import pandas as pd
+import pytest
+import requests
+
+from app.analysis import metabase_service
+
+
+@pytest.fixture(autouse=True)
+def _ambiente(monkeypatch, tmp_path):
+    monkeypatch.setattr(metabase_service, "_circuitos", {})
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("MANIA_BASE_URL", "https://metabase.local")
+    monkeypatch.setenv("MANIA_CARD_FECHAMENTO", "abc")
+    monkeypatch.setenv("MANIA_CARD_QUALIDADE", "def")
+    monkeypatch.setenv("MANIA_CARD_FILA", "ghi")
+    monkeypatch.setenv("MANIA_CARD_FECHAMENTO_FILTROS", "tipos_os:tipo_os")
+
+
+class MetabaseFalso:
+    linhas = [
+        {"tipo_ordem_servico": "INSTALAÇÃO", "cidade": "Manaus"},
+        {"tipo_ordem_servico": "INSTALAÇÃO", "cidade": "Santarém"},
+    ]
+
+    def __init__(self):
+        self.parametros: list[list[dict]] = []
+        self.caminhos: list[str] = []
+
+    def get(self, url, timeout=None):
+        partes = urllib.parse.urlparse(url)
+        self.caminhos.append(partes.path)
+        self.parametros.append(json.loads(urllib.parse.parse_qs(partes.query)["parameters"][0]))
+
+        response = requests.Response()
+        response.status_code = 200
+        if partes.path.endswith("/csv"):
+            response._content = (
+                "numero_ordem_servico,tipo_ordem_servico,cidade\n"
+                "10,INSTALAÇÃO,Manaus\n"
+                "11,INSTALAÇÃO,\n"
+            ).encode("utf-8")
+        else:
+            response._content = json.dumps(self.linhas).encode("utf-8")
+        return response
+
+
+def _carregar(**filtros):
+    return metabase_service.carregar_relatorio_metabase(
+        "mania", "fechamento", date(2026, 3, 1), date(2026, 3, 1), **filtros
+    )
+
+
+def test_filtro_suportado_vai_para_o_card_e_os_demais_sao_locais(monkeypatch):
+    falso = MetabaseFalso()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: falso)
+
+    df = _carregar(tipos_os=["INSTALAÇÃO"], cidades=["Manaus"])
+
+    tags = {p["target"][1][1]: p["value"] for p in falso.parametros[0]}
+    assert tags["tipo_os"] == ["INSTALAÇÃO"]
+    assert "cidade" not in tags
+    assert df["cidade"].tolist() == ["Manaus"]
+
+
+def test_filtro_local_ignora_espacos_nas_pontas():
+    df = pd.DataFrame({"tipo_ordem_servico": [" INSTALAÇÃO", "RETIRADA  ", None]})
+
+    filtrado = metabase_service.filtrar_localmente(df, {"tipos_os": ["INSTALAÇÃO ", "RETIRADA"]})
+
+    assert filtrado["tipo_ordem_servico"].tolist() == [" INSTALAÇÃO", "RETIRADA  "]
+
+
+def test_filtros_diferentes_nao_compartilham_cache(monkeypatch):
+    falso = MetabaseFalso()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: falso)
+
+    _carregar()
+    _carregar(tipos_os=["INSTALAÇÃO"])
+    _carregar(tipos_os=["INSTALAÇÃO"])
+    _carregar()
+
+    assert len(falso.parametros) == 2
+
+
+def test_card_em_csv_le_colunas_tipadas(monkeypatch):
+    monkeypatch.setenv("MANIA_CARD_FECHAMENTO_FORMATO", "csv")
+    falso = MetabaseFalso()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: falso)
+
+    df = _carregar(usar_cache=False)
+
+    assert falso.caminhos == ["/api/public/card/abc/query/csv"]
+    assert df["numero_ordem_servico"].tolist() == ["10", "11"]
+    assert df["cidade"].tolist()[0] == "Manaus"
+    assert df["cidade"].isna().tolist() == [False, True]
+
+
+def test_csv_preserva_identificadores_e_equivale_ao_json():
+    linhas = [
+        {"numero_ordem_servico": "003226042194216506", "cep": "06908412", "id_cliente": "20262", "cidade": "Manaus"},
+        {"numero_ordem_servico": "003226042194216507", "cep": "69000000", "id_cliente": None, "cidade": None},
+    ]
+    conteudo = (
+        "numero_ordem_servico,cep,id_cliente,cidade\n"
+        "003226042194216506,06908412,20262,Manaus\n"
+        "003226042194216507,69000000,,\n"
+    ).encode("utf-8")
+
+    df_csv = metabase_service.csv_para_dataframe(conteudo)
+
+    assert df_csv["numero_ordem_servico"].tolist()[0] == "003226042194216506"
+    assert df_csv["cep"].tolist()[0] == "06908412"
+    assert df_csv["id_cliente"].tolist() == ["20262", None]
+    pd.testing.assert_frame_equal(df_csv, pd.DataFrame(linhas))
+
+
+def test_trocar_formato_nao_mistura_dias_em_cache(monkeypatch):
+    falso = MetabaseFalso()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: falso)
+    _carregar()
+
+    # CSV tipa identificadores como texto: não reaproveita os dias do JSON
+    monkeypatch.setenv("MANIA_CARD_FECHAMENTO_FORMATO", "csv")
+    df = _carregar()
+
+    assert falso.caminhos[-1].endswith("/csv")
+    assert df["numero_ordem_servico"].tolist() == ["10", "11"]
+    assert len(falso.caminhos) == 2
+
+    _carregar()
+    assert len(falso.caminhos) == 2
+
+
+class MetabaseFora:
+    def __init__(self):
+        self.chamadas = 0
+
+    def get(self, url, timeout=None):
+        self.chamadas += 1
+        raise requests.ConnectionError("conexão recusada")
+
+
+def test_falha_estruturada_e_circuito_aberto(monkeypatch):
+    fora = MetabaseFora()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: fora)
+    monkeypatch.setattr(metabase_service.time, "sleep", lambda s: None)
+    monkeypatch.setattr(metabase_service, "LIMITE_FALHAS_CIRCUITO", 3)
+
+    with pytest.raises(metabase_service.MetabaseIndisponivel) as erro:
+        _carregar(usar_cache=False)
+
+    assert erro.value.tentativas == metabase_service.MAX_TENTATIVAS
+    assert erro.value.conta == "mania"
+    assert not erro.value.circuito_aberto
+
+    chamadas = fora.chamadas
+    with pytest.raises(metabase_service.MetabaseIndisponivel) as erro:
+        _carregar(usar_cache=False)
+
+    assert erro.value.circuito_aberto
+    assert fora.chamadas == chamadas
+
+
+class MetabaseQuebrado:
+    def get(self, url, timeout=None):
+        raise ValueError("resposta inesperada")
+
+
+def test_erro_inesperado_na_chamada_de_teste_reabre_o_circuito(monkeypatch):
+    monkeypatch.setattr(metabase_service.time, "sleep", lambda s: None)
+    monkeypatch.setattr(metabase_service, "LIMITE_FALHAS_CIRCUITO", 1)
+    monkeypatch.setattr(metabase_service, "TEMPO_CIRCUITO_ABERTO", 0)
+
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: MetabaseFora())
+    with pytest.raises(metabase_service.MetabaseIndisponivel):
+        _carregar(usar_cache=False)
+
+    # Chamada de teste (meio-aberto) falha com erro que não é de rede
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: MetabaseQuebrado())
+    with pytest.raises(ValueError):
+        _carregar(usar_cache=False)
+
+    # O circuito não fica preso em "em teste": a próxima chamada passa
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: MetabaseFalso())
+    assert len(_carregar(usar_cache=False)) == 2
+
+
+def test_dia_expirado_usa_copia_local_se_metabase_cair(monkeypatch):
+    hoje = date.today()
+    falso = MetabaseFalso()
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: falso)
+    metabase_service.carregar_relatorio_metabase("mania", "fechamento", hoje, hoje)
+
+    monkeypatch.setenv("METABASE_CACHE_TTL_RECENTE", "0")
+    monkeypatch.setattr(metabase_service, "_sessao", lambda base_url: MetabaseFora())
+    monkeypatch.setattr(metabase_service.time, "sleep", lambda s: None)
+
+    df = metabase_service.carregar_relatorio_metabase("mania", "fechamento", hoje, hoje)
+
+    assert len(df) == 2
+    assert df.attrs["dias_desatualizados"] == [hoje]
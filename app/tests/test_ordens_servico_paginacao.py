@@ -0,0 +1,360 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pyarrow as pa
+import pytest
+
+from app.analysis import ordens_servico
+from app.config import HubSoftAccountConfig
+
+
+class ClienteFalso:
+    def __init__(self, total_ordens: int, com_paginacao: bool = True):
+        self.total_ordens = total_ordens
+        self.com_paginacao = com_paginacao
+        self.config = HubSoftAccountConfig(
+            name="mania",
+            token_url="",
+            api_base="",
+            client_id="",
+            client_secret="",
+            user="",
+            password="",
+        )
+        self.paginas_pedidas: list[int] = []
+
+    def get(self, path: str, params: dict | None = None) -> dict:
+        pagina = params["pagina"]
+        itens = params["itens_por_pagina"]
+        self.paginas_pedidas.append(pagina)
+
+        inicio = (pagina - 1) * itens
+        fim = min(inicio + itens, self.total_ordens)
+        response = {
+            "ordens_servico": [
+                {"id_ordem_servico": i} for i in range(inicio, fim)
+            ]
+        }
+
+        if self.com_paginacao:
+            response["paginacao"] = {"ultima_pagina": -(-self.total_ordens // itens)}
+
+        return response
+
+
+@pytest.fixture(autouse=True)
+def _data_dir_temporario(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+
+
+def _carregar(monkeypatch, client, **kwargs):
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+    return ordens_servico.carregar_ordens_servico_df(
+        conta="mania",
+        data_inicio=date(2026, 1, 1),
+        data_fim=date(2026, 1, 31),
+        usar_store=False,
+        **kwargs,
+    )
+
+
+def test_paginas_paralelas_mantem_ordem(monkeypatch):
+    client = ClienteFalso(total_ordens=1050)
+
+    df = _carregar(monkeypatch, client, max_concorrencia=4)
+
+    assert len(df) == 1050
+    assert df["id_ordem_servico"].tolist() == list(range(1050))
+    assert sorted(client.paginas_pedidas) == list(range(1, 12))
+
+
+def test_sem_metadados_sonda_ate_pagina_curta(monkeypatch):
+    client = ClienteFalso(total_ordens=1050, com_paginacao=False)
+
+    df = _carregar(monkeypatch, client, max_concorrencia=3)
+
+    assert df["id_ordem_servico"].tolist() == list(range(1050))
+
+
+def test_respeita_max_paginas(monkeypatch):
+    client = ClienteFalso(total_ordens=1050)
+
+    df = _carregar(monkeypatch, client, max_paginas=3)
+
+    assert len(df) == 300
+    assert max(client.paginas_pedidas) == 3
+
+
+def test_contas_carregadas_em_paralelo(monkeypatch):
+    clientes = {
+        "mania": ClienteFalso(total_ordens=250),
+        "amazonet": ClienteFalso(total_ordens=120),
+    }
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: clientes[conta])
+
+    dfs = ordens_servico.carregar_ordens_servico_contas_df(
+        contas=["mania", "amazonet"],
+        data_inicio=date(2026, 1, 1),
+        data_fim=date(2026, 1, 31),
+        usar_store=False,
+    )
+
+    assert list(dfs) == ["mania", "amazonet"]
+    assert len(dfs["mania"]) == 250
+    assert len(dfs["amazonet"]) == 120
+    assert set(dfs["amazonet"]["conta"]) == {"AMAZONET"}
+
+
+def test_contas_concorrentes_compartilham_a_carga(monkeypatch):
+    class ClienteLento(ClienteFalso):
+        def get(self, path, params=None):
+            time.sleep(0.05)
+            return super().get(path, params)
+
+    clientes = {"mania": ClienteLento(total_ordens=150), "amazonet": ClienteLento(total_ordens=50)}
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: clientes[conta])
+
+    def carregar(contas):
+        return ordens_servico.carregar_ordens_servico_contas_df(
+            contas=contas,
+            data_inicio=date(2026, 1, 1),
+            data_fim=date(2026, 1, 31),
+            usar_store=False,
+        )
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futuros = [pool.submit(carregar, ["mania", "amazonet"]) for _ in range(2)]
+        futuros.append(pool.submit(ordens_servico.carregar_ordens_servico_df, "mania", date(2026, 1, 1), date(2026, 1, 31), usar_store=False))
+        resultados = [f.result() for f in futuros]
+
+    assert sorted(clientes["mania"].paginas_pedidas) == [1, 2]
+    assert clientes["amazonet"].paginas_pedidas == [1]
+    assert len(resultados[0]["mania"]) == len(resultados[2]) == 150
+
+
+def test_cargas_no_mesmo_loop_respeitam_o_limite_da_conta(monkeypatch):
+    class ClienteContado(ClienteFalso):
+        em_voo = maximo = 0
+        lock = threading.Lock()
+
+        def get(self, path, params=None):
+            with self.lock:
+                self.em_voo += 1
+                self.maximo = max(self.maximo, self.em_voo)
+            time.sleep(0.02)
+            with self.lock:
+                self.em_voo -= 1
+            return super().get(path, params)
+
+    client = ClienteContado(total_ordens=1000)
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+
+    async def duas_cargas():
+        return await asyncio.gather(
+            *(
+                ordens_servico.carregar_ordens_servico_async(
+                    "mania", date(2026, 1, dia), date(2026, 1, dia), usar_store=False
+                )
+                for dia in (1, 2)
+            )
+        )
+
+    resultados = asyncio.run(duas_cargas())
+
+    assert [len(df) for df in resultados] == [1000, 1000]
+    assert client.maximo <= client.config.max_concorrencia
+
+
+class ClientePorDia(ClienteFalso):
+    """
+    Gera `por_dia` ordens para cada dia do filtro data_inicio/data_fim.
+    """
+
+    def __init__(self, por_dia: int):
+        super().__init__(total_ordens=0, com_paginacao=False)
+        self.por_dia = por_dia
+
+    def get(self, path: str, params: dict | None = None) -> dict:
+        inicio = date.fromisoformat(params["data_inicio"])
+        fim = date.fromisoformat(params["data_fim"])
+        ids = [
+            dia * 1000 + i
+            for dia in range(inicio.toordinal(), fim.toordinal() + 1)
+            for i in range(self.por_dia)
+        ]
+
+        itens = params["itens_por_pagina"]
+        pagina = params["pagina"]
+        fatia = ids[(pagina - 1) * itens : pagina * itens]
+        return {"ordens_servico": [{"id_ordem_servico": i} for i in fatia]}
+
+
+def test_store_nao_registra_faixa_truncada(monkeypatch):
+    from app.analysis.ordens_servico_store import get_ordens_store
+
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: ClientePorDia(por_dia=300))
+    dia = date(2026, 1, 5)
+
+    ordens_servico.carregar_ordens_servico_df("mania", dia, dia, max_paginas=2)
+    # 300 ordens no dia, teto de 200: a faixa continua pendente
+    assert get_ordens_store("mania").cobertura("data_termino_executado") is None
+
+    ordens_servico.carregar_ordens_servico_df("mania", dia, dia, max_paginas=4)
+    assert get_ordens_store("mania").cobertura("data_termino_executado").fim == dia
+
+
+def test_consulta_por_data_de_cadastro_sempre_vai_a_api(monkeypatch):
+    # A ordem ainda muda depois de cadastrada: não pode sair congelada do store
+    client = ClienteFalso(total_ordens=50)
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+    dia = date(2026, 1, 5)
+
+    for _ in range(2):
+        ordens_servico.carregar_ordens_servico_df("mania", dia, dia, tipo_data="data_cadastro")
+
+    assert client.paginas_pedidas == [1, 1]
+
+
+def test_dividir_periodo_em_semanas():
+    janelas = ordens_servico.dividir_periodo(date(2026, 1, 1), date(2026, 1, 17), 7)
+
+    assert janelas == [
+        (date(2026, 1, 1), date(2026, 1, 7)),
+        (date(2026, 1, 8), date(2026, 1, 14)),
+        (date(2026, 1, 15), date(2026, 1, 17)),
+    ]
+
+
+def test_periodo_fatiado_nao_trunca_no_teto(monkeypatch):
+    client = ClientePorDia(por_dia=30)
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+
+    # 90 dias * 30 ordens = 2700, muito acima de 2 páginas de 100 por janela
+    df = ordens_servico.carregar_ordens_servico_periodo_df(
+        conta="mania",
+        data_inicio=date(2026, 1, 1),
+        data_fim=date(2026, 3, 31),
+        janela="semana",
+        max_paginas=2,
+    )
+
+    assert len(df) == 90 * 30
+    assert df["id_ordem_servico"].is_unique
+
+
+def test_iter_ordens_servico_gera_paginas_em_ordem(monkeypatch):
+    client = ClienteFalso(total_ordens=1050, com_paginacao=False)
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+
+    paginas = list(
+        ordens_servico.iter_ordens_servico(
+            conta="mania",
+            data_inicio=date(2026, 1, 1),
+            data_fim=date(2026, 1, 31),
+            max_concorrencia=3,
+        )
+    )
+
+    assert [len(p) for p in paginas] == [100] * 10 + [50]
+    ids = [o["id_ordem_servico"] for p in paginas for o in p]
+    assert ids == list(range(1050))
+
+
+def test_iter_ordens_servico_em_arrow(monkeypatch):
+    client = ClienteFalso(total_ordens=250)
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: client)
+
+    lotes = list(
+        ordens_servico.iter_ordens_servico(
+            conta="mania",
+            data_inicio=date(2026, 1, 1),
+            data_fim=date(2026, 1, 31),
+            formato="arrow",
+            campos=["id_ordem_servico"],
+        )
+    )
+
+    assert [lote.num_rows for lote in lotes] == [100, 100, 50]
+    assert lotes[0].schema.names == ["id_ordem_servico"]
+
+
+def test_lotes_arrow_heterogeneos_tem_o_mesmo_schema(monkeypatch):
+    paginas = {
+        1: [
+            {"id_ordem_servico": 1, "numero": "001", "usuario_fechamento": {"name": "TEC_A"}},
+            {"id_ordem_servico": "2", "numero": 2, "usuario_fechamento": []},
+        ],
+        2: [{"id_ordem_servico": 3, "usuario_fechamento": None, "motivo_fechamento": [{"id": 1}]}],
+    }
+
+    class ClientePaginas(ClienteFalso):
+        def get(self, path, params=None):
+            return {"ordens_servico": paginas.get(params["pagina"], [])}
+
+    monkeypatch.setattr(ordens_servico, "get_hubsoft_client", lambda conta: ClientePaginas(0))
+
+    lotes = list(
+        ordens_servico.iter_ordens_servico(
+            conta="mania",
+            data_inicio=date(2026, 1, 1),
+            data_fim=date(2026, 1, 31),
+            itens_por_pagina=2,
+            formato="arrow",
+            campos=["id_ordem_servico", "numero", "usuario_fechamento.name", "motivo_fechamento"],
+        )
+    )
+
+    tabela = pa.Table.from_batches(lotes)
+
+    assert len(lotes) == 2
+    assert tabela.column("id_ordem_servico").to_pylist() == [1, 2, 3]
+    assert tabela.column("numero").to_pylist() == ["001", "2", None]
+    assert tabela.column("usuario_fechamento.name").to_pylist() == ["TEC_A", None, None]
+    assert tabela.column("motivo_fechamento").to_pylist() == [None, None, '[{"id": 1}]']
+
+
+def test_projecao_de_campos_tipados():
+    ordens = [
+        {
+            "id_ordem_servico": 10,
+            "numero": "003",
+            "data_termino_executado": "2026-02-12 10:26:10",
+            "usuario_fechamento": {"name": "TEC_A"},
+            "dados_endereco_instalacao": {"estado": "AM", "cidade": "Manaus"},
+        },
+        {
+            "id_ordem_servico": 11,
+            "numero": "004",
+            "data_termino_executado": None,
+            "usuario_fechamento": None,
+        },
+    ]
+
+    df = ordens_servico._montar_dataframe(
+        ordens,
+        "mania",
+        campos=[
+            "id_ordem_servico",
+            "numero",
+            "data_termino_executado",
+            "usuario_fechamento.name",
+            "dados_endereco_instalacao.estado",
+        ],
+    )
+
+    assert list(df.columns) == [
+        "id_ordem_servico",
+        "numero",
+        "data_termino_executado",
+        "usuario_fechamento.name",
+        "dados_endereco_instalacao.estado",
+        "conta",
+    ]
+    assert str(df["id_ordem_servico"].dtype) == "Int64"
+    assert str(df["data_termino_executado"].dtype).startswith("datetime64")
+    assert df["usuario_fechamento.name"].tolist()[0] == "TEC_A"
+    assert df["usuario_fechamento.name"].isna().tolist() == [False, True]
+    assert df["dados_endereco_instalacao.estado"].isna().tolist() == [False, True]
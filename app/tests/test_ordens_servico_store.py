@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+from app.analysis.ordens_servico_store import OrdensServicoStore
+
+TIPO = "data_termino_executado"
+
+
+def _ordem(id_ordem: int, dia: date) -> dict:
+    return {
+        "id_ordem_servico": id_ordem,
+        "numero": str(id_ordem),
+        TIPO: f"{dia.isoformat()} 10:00:00",
+    }
+
+
+def test_consulta_filtra_pelo_tipo_data(tmp_path):
+    store = OrdensServicoStore(tmp_path / "ordens.sqlite")
+    store.salvar([
+        _ordem(1, date(2026, 1, 1)),
+        _ordem(2, date(2026, 1, 5)),
+        _ordem(3, date(2026, 1, 10)),
+    ])
+
+    ordens = store.consultar(TIPO, date(2026, 1, 1), date(2026, 1, 5))
+
+    assert [o["id_ordem_servico"] for o in ordens] == [1, 2]
+
+
+def test_upsert_substitui_payload(tmp_path):
+    store = OrdensServicoStore(tmp_path / "ordens.sqlite")
+    store.salvar([_ordem(1, date(2026, 1, 1))])
+    store.salvar([{**_ordem(1, date(2026, 1, 1)), "numero": "novo"}])
+
+    ordens = store.consultar(TIPO, date(2026, 1, 1), date(2026, 1, 1))
+
+    assert len(ordens) == 1
+    assert ordens[0]["numero"] == "novo"
+
+
+def test_faixas_pendentes_usa_marca_dagua(tmp_path):
+    store = OrdensServicoStore(tmp_path / "ordens.sqlite")
+    hoje = date(2026, 3, 31)
+
+    # Sem cobertura: tudo vem da API
+    assert store.faixas_pendentes(TIPO, date(2026, 1, 1), date(2026, 1, 31), hoje=hoje) == [
+        (date(2026, 1, 1), date(2026, 1, 31))
+    ]
+
+    store.registrar_sincronizacao(TIPO, date(2026, 1, 1), date(2026, 1, 31), hoje=hoje)
+
+    # Totalmente antes da janela de rechecagem: nada a buscar
+    assert store.faixas_pendentes(TIPO, date(2026, 1, 5), date(2026, 1, 20), hoje=hoje) == []
+
+    # Avança a marca d'água: recheca os últimos dias e busca o restante
+    assert store.faixas_pendentes(
+        TIPO, date(2026, 1, 20), date(2026, 2, 10), dias_rechecagem=3, hoje=hoje
+    ) == [(date(2026, 1, 28), date(2026, 2, 10))]
+
+    # Antes da cobertura: só a lacuna até o início dela
+    assert store.faixas_pendentes(TIPO, date(2025, 12, 20), date(2026, 1, 10), hoje=hoje) == [
+        (date(2025, 12, 20), date(2025, 12, 31))
+    ]
+
+
+def test_cobertura_nao_passa_de_hoje(tmp_path):
+    store = OrdensServicoStore(tmp_path / "ordens.sqlite")
+    hoje = date(2026, 1, 15)
+
+    store.registrar_sincronizacao(TIPO, date(2026, 1, 1), hoje + timedelta(days=10), hoje=hoje)
+
+    assert store.cobertura(TIPO).fim == hoje
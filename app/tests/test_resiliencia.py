@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from app.config import HubSoftAccountConfig
+from app.hubsoft.client import HubSoftClient
+from app.utils.resiliencia import (
+    ConcorrenciaAdaptativa,
+    TokenBucket,
+    calcular_backoff,
+    ler_retry_after,
+)
+
+
+def _resposta(status: int, corpo: bytes = b"{}", retry_after: str | None = None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = corpo
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+def _client(**kwargs) -> HubSoftClient:
+    config = HubSoftAccountConfig(
+        name="mania",
+        token_url="",
+        api_base="https://hubsoft.local/api",
+        client_id="",
+        client_secret="",
+        user="",
+        password="",
+        **kwargs,
+    )
+    client = HubSoftClient(config)
+    client.token = "token"
+    return client
+
+
+def test_backoff_respeita_retry_after_e_teto():
+    assert calcular_backoff(0, retry_after=3) == 3
+    assert calcular_backoff(0, retry_after=120, teto=30) == 30
+    assert all(0 <= calcular_backoff(4, base=0.5) <= 8 for _ in range(50))
+    assert ler_retry_after("2") == 2.0
+    assert ler_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert ler_retry_after("lixo") is None
+
+
+def test_token_bucket_limita_taxa():
+    bucket = TokenBucket(taxa=50, capacidade=5)
+
+    inicio = time.monotonic()
+    for _ in range(15):
+        bucket.adquirir()
+
+    # 5 de rajada + 10 a 50/s
+    assert time.monotonic() - inicio >= 0.18
+
+
+def test_concorrencia_cai_com_sobrecarga_e_volta_aos_poucos():
+    limite = ConcorrenciaAdaptativa(maximo=8)
+
+    limite.adquirir()
+    limite.liberar(0.1, sobrecarga=True)
+    assert limite.limite == 4
+
+    for _ in range(4):
+        limite.adquirir()
+        limite.liberar(0.1)
+    assert limite.limite == 5
+
+
+def test_get_repete_em_429_e_5xx(monkeypatch):
+    client = _client(requisicoes_por_segundo=0)
+    respostas = [
+        _resposta(429, retry_after="0"),
+        _resposta(503, retry_after="0"),
+        _resposta(200, b'{"ok": true}'),
+    ]
+    monkeypatch.setattr(client, "_executar_get", lambda *a: respostas.pop(0))
+
+    assert client.get("ordem_servico") == {"ok": True}
+
+    metricas = client.resumo_metricas()
+    assert metricas["requisicoes"] == 3
+    assert metricas["retries"] == 2
+    assert metricas["throttles_servidor"] == 1
+    assert metricas["erros_servidor"] == 1
+
+
+def test_get_desiste_apos_max_tentativas(monkeypatch):
+    client = _client(requisicoes_por_segundo=0, max_tentativas=2)
+    monkeypatch.setattr(
+        client, "_executar_get", lambda *a: _resposta(500, retry_after="0")
+    )
+
+    with pytest.raises(requests.HTTPError):
+        client.get("ordem_servico")
+
+    assert client.metricas.get("requisicoes") == 2
+
+
+def test_token_lido_durante_renovacao_nao_sai_vazio(monkeypatch):
+    client = _client()
+    renovacoes = []
+
+    def autenticar():
+        time.sleep(0.1)
+        client.token = "novo"
+
+    monkeypatch.setattr(client, "authenticate", autenticar)
+    token_valido = client._token_valido
+
+    def valido_e_renova():
+        # Outra thread recebe 401 logo depois da checagem
+        valido = token_valido()
+        if not renovacoes:
+            renovacoes.append(threading.Thread(target=client._renovar_token, args=("token",)))
+            renovacoes[0].start()
+            time.sleep(0.05)
+        return valido
+
+    monkeypatch.setattr(client, "_token_valido", valido_e_renova)
+
+    assert client._ensure_authenticated() in {"token", "novo"}
+    renovacoes[0].join()
+    assert client.token == "novo"
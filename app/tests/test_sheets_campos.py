@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from app.analysis import sheets_campos
+
+
+@pytest.fixture(autouse=True)
+def _data_dir_temporario(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setitem(
+        sheets_campos.CAMPOS_PLANILHAS,
+        "teste",
+        {
+            "cliente": ("B", None),
+            "status": ("C", None),
+            "data": ("Z", "DATA"),
+        },
+    )
+
+
+def test_letras():
+    assert sheets_campos.indice_coluna("AH") == 33
+    assert sheets_campos.letra_coluna(33) == "AH"
+    assert all(
+        sheets_campos.indice_coluna(sheets_campos.letra_coluna(i)) == i for i in range(800)
+    )
+
+
+def test_primeira_resolucao_aprende_ancoras_e_salva():
+    campos = ["cliente", "status"]
+    assert not sheets_campos.conferir_cabecalhos("teste", campos, ["Cliente", "Status"])
+
+    posicoes = sheets_campos.resolver_campos("teste", ["Id", "Cliente", "Status", "DATA"])
+
+    assert posicoes == {"cliente": 1, "status": 2, "data": 3}
+    assert sheets_campos.letras_campos("teste", ["data", "cliente"]) == ["D", "B"]
+    assert sheets_campos.conferir_cabecalhos("teste", campos, ["Cliente", "Status"])
+
+    salvo = json.loads(
+        open(os.path.join(os.environ["APP_DATA_DIR"], "sheets", "campos.json"), encoding="utf-8").read()
+    )
+    assert salvo["teste"]["cliente"] == {"letra": "B", "ancora": "Cliente"}
+
+
+def test_coluna_inserida_segue_a_ancora():
+    sheets_campos.resolver_campos("teste", ["Id", "Cliente", "Status", "DATA"])
+
+    # Coluna nova antes de "Cliente": a leitura nas letras antigas não confere
+    assert not sheets_campos.conferir_cabecalhos("teste", ["cliente"], ["Nova"])
+
+    posicoes = sheets_campos.resolver_campos("teste", ["Id", "Nova", "Cliente", "Status", "DATA"])
+
+    assert posicoes["cliente"] == 2
+    assert sheets_campos.letras_campos("teste", ["cliente", "status"]) == ["C", "D"]
+
+
+def test_cabecalho_vazio_ou_repetido_nao_vira_ancora():
+    posicoes = sheets_campos.resolver_campos("teste", ["Id", "", "X", "X"])
+
+    # "data" não achou o cabeçalho declarado: fica na letra conhecida
+    assert posicoes == {"cliente": 1, "status": 2, "data": 25}
+    assert sheets_campos.conferir_cabecalhos("teste", ["cliente", "status"], ["qualquer", "coisa"])
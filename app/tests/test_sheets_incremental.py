@@ -0,0 +1,101 @@
+from app.analysis import sheets_incremental
+from app.analysis.sheets_incremental import CacheIncremental
+
+
+def _aba(n):
+    return [["cab"]] + [[str(i)] for i in range(1, n + 1)]
+
+
+def test_primeira_leitura_completa_depois_so_o_fim():
+    cache = CacheIncremental(sobreposicao=2)
+    aba = _aba(10)
+    pedidos = []
+
+    def buscar(deslocamento):
+        pedidos.append(deslocamento)
+        return aba[deslocamento:]
+
+    assert cache.sincronizar("a", buscar) == aba
+
+    # linha nova no fim
+    aba = aba + [["11"]]
+
+    assert cache.sincronizar("a", buscar) == aba
+    assert pedidos == [0, 9]
+
+
+def test_nunca_rele_o_cabecalho_parcialmente():
+    cache = CacheIncremental(sobreposicao=50)
+    cache.aplicar("a", 0, _aba(3))
+
+    assert cache.deslocamento("a") == 1
+
+
+def test_linhas_apagadas_no_fim_somem():
+    cache = CacheIncremental(sobreposicao=3)
+    cache.aplicar("a", 0, _aba(10))
+    aba = _aba(9)
+
+    assert cache.sincronizar("a", lambda deslocamento: aba[deslocamento:]) == aba
+
+
+def _sincronizar_alterada(alterar):
+    cache = CacheIncremental(sobreposicao=2)
+    aba = _aba(9)
+    pedidos = []
+
+    def buscar(deslocamento):
+        pedidos.append(deslocamento)
+        return aba[deslocamento:]
+
+    cache.sincronizar("a", buscar)
+    aba = alterar(list(aba))
+    return cache.sincronizar("a", buscar), aba, pedidos
+
+
+def test_linha_apagada_no_meio_rele_a_aba_inteira():
+    # Apaga a linha "3" e acrescenta "10": as seguintes sobem uma posição
+    linhas, aba, pedidos = _sincronizar_alterada(
+        lambda aba: aba[:3] + aba[4:] + [["10"]]
+    )
+
+    assert linhas == aba
+    assert ["3"] not in linhas and ["8"] in linhas
+    assert pedidos == [0, 8, 0]
+
+
+def test_linha_inserida_no_meio_rele_a_aba_inteira():
+    linhas, aba, pedidos = _sincronizar_alterada(
+        lambda aba: aba[:3] + [["2.5"]] + aba[3:]
+    )
+
+    assert linhas == aba
+    assert pedidos == [0, 8, 0]
+
+
+def test_edicao_na_sobreposicao_rele_a_aba_inteira():
+    def editar(aba):
+        aba[9] = ["9*"]
+        return aba
+
+    linhas, aba, pedidos = _sincronizar_alterada(editar)
+
+    assert linhas == aba
+    assert pedidos == [0, 8, 0]
+
+
+def test_verificacao_completa_periodica(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(sheets_incremental.time, "monotonic", lambda: agora[0])
+    cache = CacheIncremental(sobreposicao=2, intervalo_verificacao=60)
+    cache.aplicar("a", 0, _aba(10))
+
+    assert cache.deslocamento("a") == 9
+
+    agora[0] += 61
+    assert cache.deslocamento("a") == 0
+
+    editada = _aba(10)
+    editada[1] = ["1*"]
+    assert cache.aplicar("a", 0, editada) == editada
+    assert cache.deslocamento("a") == 9
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app.analysis import sheets_snapshot
+from app.analysis.sheets_snapshot import obter_snapshot, obter_snapshots
+
+
+@pytest.fixture(autouse=True)
+def _data_dir_temporario(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("SHEETS_SNAPSHOT", "1")
+
+
+class CargaFalsa:
+    def __init__(self, valores=("A1", "A2")):
+        self.valores = list(valores)
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        df = pd.DataFrame({"Cliente": pd.array(self.valores, dtype="string[pyarrow]")})
+        df.attrs["campos"] = {"cliente": 0}
+        return df
+
+
+def test_snapshot_recente_nao_rele_e_preserva_tipos():
+    carga = CargaFalsa()
+
+    obter_snapshot("60.1.linhas", carga)
+    df = obter_snapshot("60.1.linhas", carga)
+
+    assert carga.chamadas == 1
+    assert df["Cliente"].tolist() == ["A1", "A2"]
+    assert df["Cliente"].dtype == "string[pyarrow]"
+    assert df.attrs["campos"] == {"cliente": 0}
+
+
+def test_snapshot_vencido_so_rele_se_a_versao_mudou(monkeypatch):
+    monkeypatch.setenv("SHEETS_SNAPSHOT_TTL", "0")
+    carga = CargaFalsa()
+
+    obter_snapshot("39.1.tipado", carga, lambda: "v1")
+    obter_snapshot("39.1.tipado", carga, lambda: "v1")
+    assert carga.chamadas == 1
+
+    carga.valores = ["B1"]
+    df = obter_snapshot("39.1.tipado", carga, lambda: "v2")
+    assert carga.chamadas == 2
+    assert df["Cliente"].tolist() == ["B1"]
+
+    # Versão desconhecida: não dá para confiar no snapshot vencido
+    obter_snapshot("39.1.tipado", carga, lambda: None)
+    assert carga.chamadas == 3
+
+
+def test_falha_na_releitura_usa_snapshot_antigo(monkeypatch):
+    obter_snapshot("51.1.linhas", CargaFalsa())
+    monkeypatch.setenv("SHEETS_SNAPSHOT_TTL", "0")
+
+    def falhar():
+        raise RuntimeError("Sheets fora")
+
+    df = obter_snapshot("51.1.linhas", falhar)
+
+    assert df["Cliente"].tolist() == ["A1", "A2"]
+    assert df.attrs["snapshot_desatualizado"] is True
+
+    with pytest.raises(RuntimeError):
+        obter_snapshot("sem_copia", falhar)
+
+
+def test_lote_carrega_so_os_vencidos():
+    obter_snapshot("51.1.campos", CargaFalsa(["velho"]))
+    pedidos = []
+
+    def carregar(nomes):
+        pedidos.append(nomes)
+        return {nome: CargaFalsa(["novo"])() for nome in nomes}
+
+    resultado = obter_snapshots(["51.1.campos", "60.1.campos"], carregar)
+
+    assert pedidos == [["60.1.campos"]]
+    assert resultado["51.1.campos"]["Cliente"].tolist() == ["velho"]
+    assert resultado["60.1.campos"]["Cliente"].tolist() == ["novo"]
+
+
+def _ler_em_outro_processo(contador: str) -> None:
+    def carregar():
+        with open(contador, "a") as arquivo:
+            arquivo.write("x")
+        time.sleep(0.3)
+        return pd.DataFrame({"Cliente": ["A1"]})
+
+    obter_snapshot("60.1.linhas", carregar)
+
+
+@pytest.mark.skipif(sheets_snapshot.fcntl is None, reason="usa fork")
+def test_processos_simultaneos_leem_a_planilha_uma_vez(tmp_path):
+    contador = str(tmp_path / "leituras.txt")
+    contexto = multiprocessing.get_context("fork")
+
+    processos = [contexto.Process(target=_ler_em_outro_processo, args=(contador,)) for _ in range(3)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join(10)
+
+    assert [processo.exitcode for processo in processos] == [0, 0, 0]
+    assert open(contador).read() == "x"
+    assert os.path.exists(tmp_path / "sheets" / "snapshots" / "60.1.linhas.parquet")
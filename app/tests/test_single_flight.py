@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from app.utils.single_flight import single_flight
+
+
+def test_chamadas_concorrentes_executam_uma_vez():
+    chamadas = []
+
+    @single_flight
+    def carregar(conta, data_inicio, data_fim=None):
+        chamadas.append(conta)
+        time.sleep(0.2)
+        return pd.DataFrame({"conta": [conta]})
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futuros = [
+            pool.submit(carregar, "mania", "2026-01-01", data_fim=None)
+            for _ in range(4)
+        ] + [pool.submit(carregar, "mania", "2026-01-01")]
+        dfs = [f.result() for f in futuros]
+
+    assert chamadas == ["mania"]
+    assert all(df["conta"].tolist() == ["mania"] for df in dfs)
+
+    # Cada seguidor recebe sua própria cópia
+    dfs[0]["nova"] = 1
+    assert all("nova" not in df.columns for df in dfs[1:])
+
+
+def test_chaves_diferentes_nao_compartilham():
+    chamadas = []
+    barreira = threading.Barrier(2)
+
+    @single_flight
+    def carregar(conta, contas=()):
+        chamadas.append(conta)
+        barreira.wait(timeout=2)
+        return conta
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        a = pool.submit(carregar, "mania", contas=["x"])
+        b = pool.submit(carregar, "amazonet", contas=["x"])
+        assert {a.result(), b.result()} == {"mania", "amazonet"}
+
+    assert sorted(chamadas) == ["amazonet", "mania"]
+
+
+def test_erro_propagado_aos_seguidores_e_nao_fica_em_cache():
+    chamadas = []
+
+    @single_flight
+    def carregar(conta):
+        chamadas.append(conta)
+        time.sleep(0.1)
+        raise RuntimeError("upstream fora")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futuros = [pool.submit(carregar, "mania") for _ in range(3)]
+        for f in futuros:
+            with pytest.raises(RuntimeError):
+                f.result()
+
+    assert len(chamadas) == 1
+    assert carregar.single_flight.em_voo() == 0
+
+    with pytest.raises(RuntimeError):
+        carregar("mania")
+    assert len(chamadas) == 2
+
+
+def test_seguidor_nao_ve_alteracoes_da_lider():
+    liberar = threading.Event()
+
+    @single_flight
+    def carregar(conta):
+        liberar.wait(timeout=2)
+        return pd.DataFrame({"valor": [1, 2]})
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        lider = pool.submit(carregar, "mania")
+        while carregar.single_flight.em_voo() == 0:
+            time.sleep(0.01)
+        seguidor = pool.submit(carregar, "mania")
+        time.sleep(0.05)
+        liberar.set()
+
+        df_lider = lider.result()
+        # A página da líder altera o resultado no lugar
+        df_lider.loc[:, "valor"] = 0
+        df_seguidor = seguidor.result()
+
+    assert df_seguidor["valor"].tolist() == [1, 2]
+
+
+def test_funcao_async_executa_uma_vez_entre_event_loops():
+    chamadas = []
+
+    @single_flight
+    async def carregar(conta):
+        chamadas.append(conta)
+        await asyncio.sleep(0.2)
+        return pd.DataFrame({"conta": [conta]})
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        dfs = list(pool.map(lambda _: asyncio.run(carregar("mania")), range(3)))
+
+    assert chamadas == ["mania"]
+    assert all(df["conta"].tolist() == ["mania"] for df in dfs)
@@ -0,0 +1,67 @@
+from datetime import date, datetime
+
+import pandas as pd
+
+from app import warmup
+
+
+def test_janelas_padrao_semana_e_mes(monkeypatch):
+    quinta = date(2026, 10, 15)
+
+    assert warmup.janelas_padrao(quinta) == [
+        (date(2026, 10, 8), quinta),
+        (date(2026, 10, 12), quinta),
+    ]
+
+    monkeypatch.setenv("WARMUP_PERIODO_PAGAMENTO", "mes")
+    assert warmup.janelas_padrao(quinta)[1] == (date(2026, 10, 1), quinta)
+
+
+def test_proxima_execucao():
+    horarios = [(6, 30), (12, 10)]
+
+    assert warmup.proxima_execucao(datetime(2026, 10, 15, 5, 0), horarios) == datetime(2026, 10, 15, 6, 30)
+    assert warmup.proxima_execucao(datetime(2026, 10, 15, 6, 30), horarios) == datetime(2026, 10, 15, 12, 10)
+    assert warmup.proxima_execucao(datetime(2026, 10, 15, 13, 0), horarios) == datetime(2026, 10, 16, 6, 30)
+
+
+def test_aquecer_segue_apos_falhas(monkeypatch):
+    executadas = []
+
+    def falha():
+        raise RuntimeError("metabase fora")
+
+    tarefas = [
+        ("a", lambda: executadas.append("a")),
+        ("b", falha),
+        ("c", lambda: executadas.append("c")),
+    ]
+    monkeypatch.setattr(warmup, "_montar_tarefas", lambda hoje: tarefas)
+
+    assert warmup.aquecer() == {"ok": 2, "falhas": 1}
+    assert sorted(executadas) == ["a", "c"]
+
+
+def test_aquece_os_caches_que_as_paginas_leem(monkeypatch):
+    from app.ui import fechamento_venda_metabase_app as vendas
+
+    hoje = date(2026, 10, 15)
+    chamadas = []
+
+    def fila(conta, inicio, fim, tipos_os=None):
+        chamadas.append(conta)
+        return pd.DataFrame({"id": [1]})
+
+    monkeypatch.setattr(vendas, "carregar_fila_metabase", fila)
+    vendas.carregar_base_bruta.cache.limpar()
+
+    tarefas = dict(warmup._montar_tarefas(hoje))
+    assert not [nome for nome in tarefas if ":qualidade:" in nome or ":fila:" in nome]
+
+    inicio, fim = warmup.janelas_padrao(hoje)[0]
+    tarefas[f"vendas:mania:{inicio}:{fim}"]()
+    chamadas.clear()
+
+    # A página pede o mesmo (contas, período): já está em memória
+    vendas.carregar_base_bruta(["mania"], inicio, fim)
+    assert chamadas == []
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
-from app.analysis.google_sheets import read_sheet_as_dataframe
+from app.analysis.google_sheets import read_sheet_typed, selecionar_campos
 
 def render_60_vendas():
     """
@@ -14,7 +13,7 @@ def render_60_vendas():
     # Leitura da aba a partir da linha 11218
     # =========================
     with st.spinner("Lendo planilha 60 (vendas)..."):
-        sheet_60_venda = read_sheet_as_dataframe("60_venda", start_row=11218)
+        sheet_60_venda = read_sheet_typed("60_venda", start_row=11218)
 
     if sheet_60_venda.empty:
         st.error("Planilha 60 (vendas) vazia.")
@@ -23,25 +22,21 @@ def render_60_vendas():
     # ------------------------------
     # Selecionar colunas de interesse
     # ------------------------------
-    df60_venda_debug = sheet_60_venda.iloc[:, [0, 1, 4, 5, 6, 10]].copy()
-    df60_venda_debug.columns = [
-        "status_analise",
-        "vendedor",
-        "cod_cliente",
-        "cod_os",
-        "empresa",      # MANIA TELECOM / AMAZONET
-        "tipo_venda",   # A VENDA É DE UM:
-    ]
-
-    # Limpar valores
-    for c in df60_venda_debug.columns:
-        df60_venda_debug[c] = df60_venda_debug[c].astype(str).str.strip()
-
-    # ------------------------------
-    # Adicionar colunas auxiliares
-    # ------------------------------
-    df60_venda_debug["back"] = sheet_60_venda.iloc[:, 3].astype(str).str.strip()  # coluna D original
-    df60_venda_debug["data_fechamento"] = pd.to_datetime(sheet_60_venda.iloc[:, 7], errors="coerce")  # coluna 7 = Data termino
+    # Colunas resolvidas pelo cabeçalho (ver sheets_campos); texto já sem
+    # espaços e data_fechamento já como data (ver ESQUEMAS_PLANILHAS)
+    df60_venda_debug = selecionar_campos(
+        sheet_60_venda,
+        [
+            "status_analise",
+            "vendedor",
+            "cod_cliente",
+            "cod_os",
+            "empresa",          # MANIA TELECOM / AMAZONET
+            "tipo_venda",       # A VENDA É DE UM:
+            "back",
+            "data_fechamento",  # Data termino
+        ],
+    )
 
     # =========================
     # Sidebar de filtros
@@ -0,0 +1,42 @@
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from app.analysis.metabase_service import MetabaseIndisponivel
+
+
+def exibir_falha_metabase(erro: MetabaseIndisponivel) -> None:
+    if erro.circuito_aberto:
+        st.error(
+            "⚠️ Metabase fora do ar no momento (várias falhas seguidas). "
+            "Tente novamente em alguns segundos."
+        )
+        return
+
+    st.error(
+        f"⚠️ Não foi possível consultar o Metabase ({erro.conta.upper()} / {erro.tipo_relatorio}) "
+        f"após {erro.tentativas} tentativa(s) em {erro.duracao_s:.0f}s."
+    )
+
+
+def avisar_dados_desatualizados(df: pd.DataFrame) -> None:
+    dias = df.attrs.get("dias_desatualizados") or []
+    if dias:
+        st.warning(
+            f"⚠️ Metabase indisponível: {len(dias)} dia(s) exibidos a partir da "
+            f"cópia local mais recente ({', '.join(d.strftime('%d/%m') for d in dias)})."
+        )
+
+
+def exibir_atualizacao(df: pd.DataFrame) -> None:
+    """
+    Marcador "dados de HH:MM" (a carga pode ter sido servida do cache
+    enquanto outra é feita em segundo plano).
+    """
+    atualizado_em = df.attrs.get("atualizado_em")
+    if atualizado_em is None:
+        return
+
+    formato = "%H:%M" if atualizado_em.date() == date.today() else "%d/%m %H:%M"
+    st.caption(f"🕒 dados de {atualizado_em.strftime(formato)}")
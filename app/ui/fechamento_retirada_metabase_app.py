@@ -2,7 +2,13 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from app.analysis.metabase_service import carregar_fechamento_metabase
+from app.analysis.metabase_datasets import carregar_fechamento_contas
+from app.analysis.metabase_service import MetabaseIndisponivel
+from app.ui.components.metabase_status import (
+    avisar_dados_desatualizados,
+    exibir_atualizacao,
+    exibir_falha_metabase,
+)
 from app.analysis.relatorios.fechamento_retirada import relatorio_fechamento_retirada_df
 from app.ui.relatorio_financeiro_retirada_app import render_relatorio_financeiro_retirada
 
@@ -34,43 +40,31 @@ def garantir_colunas(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def normalizar_datas(df: pd.DataFrame) -> pd.DataFrame:
-    if COL_DATA_FIM in df.columns:
-        df[COL_DATA_FIM] = pd.to_datetime(
-            df[COL_DATA_FIM], dayfirst=True, errors="coerce"
-        )
-    return df
-
-
 # ======================================================
-# CACHE METABASE
+# DADOS (dataset compartilhado do Metabase)
 # ======================================================
-@st.cache_data(ttl=900, show_spinner=False)
-def carregar_base(contas, data_inicio, data_fim) -> pd.DataFrame:
-    dfs = []
-
+def tipos_os_permitidos(contas) -> list[str]:
+    tipos = set()
     for conta in contas:
-        # 🔽 BUSCA DIRETO DO METABASE
-        df_metabase = carregar_fechamento_metabase(conta, data_inicio, data_fim)
+        tipos.update(TIPOS_OS_FECHAMENTO_POR_CONTA.get(conta, []))
+    return sorted(tipos)
 
-        if df_metabase is None or df_metabase.empty:
-            continue
 
-        # 🔽 TRATAMENTO (SEM HUBSOFT)
-        df_tratado = relatorio_fechamento_retirada_df(df_metabase)
-
-        if df_tratado.empty:
-            continue
+def carregar_base(contas, data_inicio, data_fim) -> pd.DataFrame:
+    df_metabase = carregar_fechamento_contas(
+        contas,
+        data_inicio,
+        data_fim,
+        tipos_os=tipos_os_permitidos(contas),
+    )
 
-        df_tratado["conta"] = conta
-        dfs.append(df_tratado)
+    # 🔽 TRATAMENTO (SEM HUBSOFT)
+    df_final = relatorio_fechamento_retirada_df(df_metabase)
 
-    if not dfs:
+    if df_final.empty:
         return pd.DataFrame()
 
-    df_final = pd.concat(dfs, ignore_index=True)
     df_final = garantir_colunas(df_final)
-    df_final = normalizar_datas(df_final)
 
     return df_final
 
@@ -110,19 +104,22 @@ def render_retirada_metabase():
     # CARREGAMENTO
     # =========================
     if gerar:
-        with st.spinner("🔄 Buscando dados no Metabase..."):
-            df_base = carregar_base(contas, data_inicio, data_fim)
+        try:
+            with st.spinner("🔄 Buscando dados no Metabase..."):
+                df_base = carregar_base(contas, data_inicio, data_fim)
+        except MetabaseIndisponivel as e:
+            exibir_falha_metabase(e)
+            return
+
+        exibir_atualizacao(df_base)
+        avisar_dados_desatualizados(df_base)
 
         if df_base.empty:
             st.warning("Nenhuma retirada encontrada no período.")
             return
 
-        # 🔒 Filtra tipos de OS válidos por conta
-        tipos_permitidos = set()
-        for conta in contas:
-            tipos_permitidos.update(TIPOS_OS_FECHAMENTO_POR_CONTA.get(conta, []))
-
-        df_base = df_base[df_base[COL_TIPO_OS].isin(tipos_permitidos)]
+        # 🔒 Filtra tipos de OS válidos (já filtrado no Metabase se o card aceitar)
+        df_base = df_base[df_base[COL_TIPO_OS].isin(tipos_os_permitidos(contas))]
 
         st.session_state["df_base"] = df_base
         st.session_state["carregado"] = True
@@ -2,7 +2,13 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from app.analysis.metabase_service import carregar_fechamento_metabase
+from app.analysis.metabase_datasets import carregar_fechamento_contas
+from app.analysis.metabase_service import MetabaseIndisponivel
+from app.ui.components.metabase_status import (
+    avisar_dados_desatualizados,
+    exibir_atualizacao,
+    exibir_falha_metabase,
+)
 from app.ui.relatorio_financeiro_instalacoes_app import render_relatorio_financeiro_instalacoes
 
 
@@ -37,35 +43,31 @@ TIPOS_OS_FECHAMENTO_POR_CONTA = {
 
 
 # ======================================================
-# CACHE DE DADOS
+# DADOS (dataset compartilhado do Metabase)
 # ======================================================
-@st.cache_data(ttl=900, show_spinner=False)
-def carregar_base(contas, data_inicio, data_fim):
-    dfs = []
-
+def tipos_os_permitidos(contas) -> list[str]:
+    tipos = set()
     for conta in contas:
-        df = carregar_fechamento_metabase(conta, data_inicio, data_fim)
-        if not df.empty:
-            df["conta"] = conta
-            dfs.append(df)
+        tipos.update(TIPOS_OS_FECHAMENTO_POR_CONTA.get(conta, []))
+    return sorted(tipos)
+
 
-    if not dfs:
-        return pd.DataFrame()
+def carregar_base(contas, data_inicio, data_fim):
+    df_final = carregar_fechamento_contas(
+        contas,
+        data_inicio,
+        data_fim,
+        tipos_os=tipos_os_permitidos(contas),
+    )
 
-    df_final = pd.concat(dfs, ignore_index=True)
+    if df_final.empty:
+        return df_final
 
     # 🔒 GARANTE COLUNAS MESMO SE NÃO VIEREM NA API
     for col in [COL_TECNICO, COL_USUARIO_ABERTURA, COL_DATA_FIM]:
         if col not in df_final.columns:
             df_final[col] = None
 
-    # 📅 Converte datas
-    df_final[COL_DATA_FIM] = pd.to_datetime(
-        df_final[COL_DATA_FIM],
-        format="%d/%m/%Y",
-        errors="coerce"
-    )
-
     return df_final
 
 
@@ -107,19 +109,22 @@ def render_fechamento_metabase():
     # CARREGAMENTO
     # =========================
     if gerar:
-        with st.spinner("🔄 Carregando dados do Metabase..."):
-            df_base = carregar_base(contas, data_inicio, data_fim)
+        try:
+            with st.spinner("🔄 Carregando dados do Metabase..."):
+                df_base = carregar_base(contas, data_inicio, data_fim)
+        except MetabaseIndisponivel as e:
+            exibir_falha_metabase(e)
+            return
+
+        exibir_atualizacao(df_base)
+        avisar_dados_desatualizados(df_base)
 
         if df_base.empty:
             st.warning("Nenhum dado retornado pelo Metabase.")
             return
 
-        # 🔒 FILTRA TIPOS DE OS PERMITIDOS
-        tipos_permitidos = set()
-        for conta in contas:
-            tipos_permitidos.update(TIPOS_OS_FECHAMENTO_POR_CONTA.get(conta, []))
-
-        df_base = df_base[df_base[COL_TIPO_OS].isin(tipos_permitidos)]
+        # 🔒 FILTRA TIPOS DE OS PERMITIDOS (já filtrado no Metabase se o card aceitar)
+        df_base = df_base[df_base[COL_TIPO_OS].isin(tipos_os_permitidos(contas))]
 
         st.session_state["df_base"] = df_base
         st.session_state["carregado"] = True
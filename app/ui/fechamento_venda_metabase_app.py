@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
-from app.analysis.metabase_service import carregar_fila_metabase
+from app.analysis.metabase_service import MetabaseIndisponivel, carregar_fila_metabase
+from app.utils.cache_swr import cache_swr
+from app.ui.components.metabase_status import (
+    avisar_dados_desatualizados,
+    exibir_atualizacao,
+    exibir_falha_metabase,
+)
 from app.ui.relatorios_finaceiro_vendas_app import render_relatorio_financeiro_vendas
 
 
@@ -44,11 +50,16 @@ TIPOS_OS_FECHAMENTO_POR_CONTA = {
 }
 
 
-@st.cache_data(ttl=900, show_spinner=False)
+@cache_swr(ttl=900)
 def carregar_base_bruta(contas, data_inicio, data_fim):
     dfs = []
     for conta in contas:
-        df = carregar_fila_metabase(conta, data_inicio, data_fim)
+        df = carregar_fila_metabase(
+            conta,
+            data_inicio,
+            data_fim,
+            tipos_os=TIPOS_OS_FECHAMENTO_POR_CONTA.get(conta.lower()),
+        )
         if not df.empty:
             df["_conta_origem_debug"] = conta.lower()
             dfs.append(df)
@@ -56,7 +67,11 @@ def carregar_base_bruta(contas, data_inicio, data_fim):
     if not dfs:
         return pd.DataFrame()
 
-    return pd.concat(dfs, ignore_index=True)
+    df_final = pd.concat(dfs, ignore_index=True)
+    df_final.attrs["dias_desatualizados"] = sorted(
+        {dia for df in dfs for dia in df.attrs.get("dias_desatualizados", [])}
+    )
+    return df_final
 
 
 def render_venda_metabase():
@@ -90,8 +105,15 @@ def render_venda_metabase():
     # CARGA DOS DADOS
     # =========================
     if gerar:
-        with st.spinner("🔄 Carregando dados do Metabase..."):
-            df = carregar_base_bruta(contas, data_inicio, data_fim)
+        try:
+            with st.spinner("🔄 Carregando dados do Metabase..."):
+                df = carregar_base_bruta(contas, data_inicio, data_fim)
+        except MetabaseIndisponivel as e:
+            exibir_falha_metabase(e)
+            return
+
+        exibir_atualizacao(df)
+        avisar_dados_desatualizados(df)
 
         if df.empty:
             st.error("Metabase não retornou dados.")
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from app.analysis.ordens_servico import carregar_ordens_servico_df
+from app.analysis.ordens_servico import carregar_ordens_servico_contas_df
 from app.ui.components.navigation import botao_voltar_home
 
 # ======================================================
@@ -65,17 +65,13 @@ def render_ordens_servico():
             return
 
         with st.spinner("🔄 Carregando ordens de serviço..."):
-            dfs = []
+            dfs_por_conta = carregar_ordens_servico_contas_df(
+                contas=contas,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+            )
 
-            for conta in contas:
-                df_conta = carregar_ordens_servico_df(
-                    conta=conta,
-                    data_inicio=data_inicio,
-                    data_fim=data_fim,
-                )
-
-                if not df_conta.empty:
-                    dfs.append(df_conta)
+            dfs = [df_conta for df_conta in dfs_por_conta.values() if not df_conta.empty]
 
         if not dfs:
             st.warning("Nenhuma ordem encontrada.")
@@ -2,7 +2,13 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from app.analysis.metabase_service import carregar_fechamento_metabase
+from app.analysis.metabase_datasets import carregar_fechamento_contas
+from app.analysis.metabase_service import MetabaseIndisponivel
+from app.ui.components.metabase_status import (
+    avisar_dados_desatualizados,
+    exibir_atualizacao,
+    exibir_falha_metabase,
+)
 from app.ui.auditoria_app import render_auditoria
 from app.ui.components.navigation import botao_voltar_home
 
@@ -143,24 +149,20 @@ def render_qualidade():
             st.warning("Selecione ao menos uma conta.")
             return
 
-        registros: list[dict] = []
-
-        with st.spinner("🔄 Carregando dados do Metabase..."):
-            for conta in contas:
-                df = carregar_fechamento_metabase(conta, data_inicio, data_fim)
-                if df is None or df.empty:
-                    continue
+        try:
+            with st.spinner("🔄 Carregando dados do Metabase..."):
+                df_base = carregar_fechamento_contas(contas, data_inicio, data_fim)
+        except MetabaseIndisponivel as e:
+            exibir_falha_metabase(e)
+            return
 
-                for row in df.to_dict("records"):
-                    row["conta"] = conta
-                    registros.append(row)
+        exibir_atualizacao(df_base)
+        avisar_dados_desatualizados(df_base)
 
-        if not registros:
+        if df_base.empty:
             st.warning("Nenhuma ordem encontrada.")
             return
 
-        df_base = pd.json_normalize(registros)
-
         df_base["id_cliente"] = (
             df_base["id_cliente"]
             .fillna("")
@@ -168,8 +170,8 @@ def render_qualidade():
             .str.strip()
         )
 
-        # Normalizações
-        df_base["cidade"] = df_base["cidade"].apply(normalizar_cidade)
+        # Normalizações (cidade já vem aparada e em Title Case do dataset)
+        df_base["cidade"] = df_base["cidade"].fillna("")
         df_base["estado"] = df_base["cidade"].apply(mapear_estado)
         df_base["link_auditoria"] = df_base.apply(gerar_link_auditoria, axis=1)
 
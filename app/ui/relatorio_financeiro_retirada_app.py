@@ -4,6 +4,7 @@ from datetime import timedelta
 from pathlib import Path
 
 from app.analysis.Financeiro.financeiro_rules_retirada import carregar_planilha_39
+from app.analysis.google_sheets import selecionar_campos
 from app.analysis.pdf.pdf_relatorio import montar_tabela
 from app.analysis.pdf.pdf_recibo import gerar_recibo_pagamento
 from app.utils.formatacao import limpar_nome_tecnico
@@ -86,18 +87,20 @@ def preparar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def carregar_sheet_39(data_pagamento, tecnico_exibicao=None) -> pd.DataFrame:
-    sheet_39 = carregar_planilha_39().copy()
-    sheet_39["data_planilha"] = pd.to_datetime(sheet_39.iloc[:, 1], dayfirst=True, errors="coerce")
+    sheet_39 = selecionar_campos(
+        carregar_planilha_39(),
+        ["data", "codigo_cliente", "numero_ordem_servico", "tecnico"],
+    )
+    sheet_39["data_planilha"] = sheet_39["data"]
     
     if tecnico_exibicao:
-        sheet_39["tecnico"] = sheet_39.iloc[:, 5].astype(str).str.strip().apply(limpar_nome_tecnico)
+        sheet_39["tecnico"] = sheet_39["tecnico"].apply(limpar_nome_tecnico)
         sheet_39 = sheet_39[
             (sheet_39["data_planilha"] == data_pagamento) &
             (sheet_39["tecnico"] == tecnico_exibicao)
         ]
     
-    sheet_39 = sheet_39.iloc[:, [3, 4]].copy()
-    sheet_39.columns = ["codigo_cliente", "numero_ordem_servico"]
+    sheet_39 = sheet_39[["codigo_cliente", "numero_ordem_servico"]].copy()
     sheet_39["chave"] = criar_chave(sheet_39)
     return sheet_39
 
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from app.analysis.relatorios.planilha_60 import read_sheet_as_dataframe
+from app.analysis.google_sheets import read_sheet_as_dataframe
 
 
 def render_planilha():
@@ -12,7 +12,9 @@ def render_planilha():
     # CARREGA DADOS
     # =========================
     with st.spinner("Carregando dados da planilha..."):
-        df = read_sheet_as_dataframe()
+        # Leitura formatada: a página exibe e exporta a planilha como ela
+        # aparece no Sheets (moeda, percentuais, datas e horários)
+        df = read_sheet_as_dataframe("60")
 
     if df.empty:
         st.warning("A planilha não retornou dados.")
@@ -21,10 +23,8 @@ def render_planilha():
     # =========================
     # NORMALIZA COLUNAS (leve)
     # =========================
-    # NÃO renomeia, apenas garante string
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = df[col].astype(str).str.strip()
+    # NÃO renomeia, apenas tira espaços das pontas
+    df = df.apply(lambda coluna: coluna.str.strip())
 
     # =========================
     # CONVERSÃO DE DATA
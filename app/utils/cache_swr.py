@@ -0,0 +1,146 @@
+"""
+Cache em memória no modo stale-while-revalidate.
+
+Dentro do TTL o valor é servido direto. Depois do TTL (e até a idade
+máxima) o valor antigo é devolvido na hora e uma thread em segundo plano
+recarrega a entrada. Só há espera em cache frio ou valor velho demais.
+"""
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, TypeVar
+
+import pandas as pd
+
+from app.utils.single_flight import SingleFlight, chave_argumentos
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class CacheSWR:
+    def __init__(
+        self,
+        ttl: float,
+        idade_maxima: float = 24 * 3600,
+        max_itens: int = 32,
+        nome: str = "",
+    ) -> None:
+        self.ttl = ttl
+        self.idade_maxima = max(idade_maxima, ttl)
+        self.max_itens = max_itens
+        self.nome = nome
+
+        # chave -> (carregado_em [epoch], valor)
+        self._itens: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._revalidando: set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._voo = SingleFlight()
+
+    def obter(self, chave: Hashable, carregar: Callable[[], Any]) -> tuple[Any, float]:
+        """
+        Retorna (valor, carregado_em). Revalida em segundo plano se vencido.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+
+        if item is not None:
+            carregado_em, valor = item
+            idade = time.time() - carregado_em
+
+            if idade < self.ttl:
+                return valor, carregado_em
+
+            if idade < self.idade_maxima:
+                self._revalidar(chave, carregar)
+                return valor, carregado_em
+
+        return self._voo.executar(chave, self._carregar, chave, carregar)
+
+    def guardar(self, chave: Hashable, valor: Any) -> float:
+        carregado_em = time.time()
+        with self._lock:
+            self._itens[chave] = (carregado_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return carregado_em
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def revalidando(self) -> int:
+        with self._lock:
+            return len(self._revalidando)
+
+    def _carregar(self, chave: Hashable, carregar: Callable[[], Any]) -> tuple[Any, float]:
+        valor = carregar()
+        return valor, self.guardar(chave, valor)
+
+    def _revalidar(self, chave: Hashable, carregar: Callable[[], Any]) -> None:
+        with self._lock:
+            if chave in self._revalidando:
+                return
+            self._revalidando.add(chave)
+
+        def tarefa() -> None:
+            try:
+                self._voo.executar(chave, self._carregar, chave, carregar)
+            except Exception as e:
+                # Mantém o valor antigo; a próxima leitura tenta de novo
+                logger.warning(
+                    "Falha ao revalidar cache",
+                    extra={"cache": self.nome, "erro": str(e)},
+                )
+            finally:
+                with self._lock:
+                    self._revalidando.discard(chave)
+
+        threading.Thread(target=tarefa, name=f"swr-{self.nome}", daemon=True).start()
+
+
+def cache_swr(ttl: float, idade_maxima: float = 24 * 3600, max_itens: int = 32) -> Callable[[F], F]:
+    """
+    Decorator stale-while-revalidate, com chave pelos argumentos.
+
+    DataFrames saem como cópia própria com df.attrs["atualizado_em"]
+    (datetime da carga), para a UI mostrar a idade dos dados.
+    """
+
+    def decorar(func: F) -> F:
+        assinatura = inspect.signature(func)
+        cache = CacheSWR(ttl, idade_maxima, max_itens, nome=func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = chave_argumentos(assinatura, args, kwargs)
+            valor, carregado_em = cache.obter(chave, lambda: func(*args, **kwargs))
+            return marcar_atualizacao(valor, carregado_em)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorar
+
+
+def marcar_atualizacao(valor: Any, carregado_em: float, copiar: bool = True) -> Any:
+    """
+    Cópia do valor em cache para quem pediu. Cópia completa: sem
+    copy-on-write, uma cópia rasa divide os dados, e um df.loc[...] = ...
+    ou fillna(inplace=True) de uma página alteraria o cache de todas.
+    copiar=False só para DataFrames recém-criados (ex.: saída de concat).
+    """
+    if not isinstance(valor, pd.DataFrame):
+        return valor
+
+    df = valor.copy() if copiar else valor.copy(deep=False)
+    df.attrs = {**valor.attrs, "atualizado_em": datetime.fromtimestamp(carregado_em)}
+    return df
@@ -0,0 +1,36 @@
+"""
+Decodificação JSON plugável.
+
+Usa orjson quando estiver instalado e cai para o json da stdlib caso
+contrário. As respostas HTTP são decodificadas direto dos bytes, sem
+passar pela detecção de encoding do requests.
+"""
+import json
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+
+def nome_decodificador() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+def decodificar_json(conteudo: bytes | str):
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def decodificar_resposta(response: requests.Response):
+    """
+    Equivalente rápido de response.json().
+    Corpo fora de UTF-8 volta para a detecção de encoding do requests.
+    """
+    try:
+        return decodificar_json(response.content)
+    except ValueError:
+        return response.json()
@@ -0,0 +1,269 @@
+"""
+Primitivas de resiliência para clientes HTTP: backoff com jitter,
+limitador token bucket, concorrência adaptativa (AIMD) e circuit breaker.
+
+Todas são thread-safe e independentes de biblioteca HTTP.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Status HTTP que valem nova tentativa (GET idempotente)
+STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+
+
+# ======================================================
+# BACKOFF
+# ======================================================
+def calcular_backoff(
+    tentativa: int,
+    base: float = 0.5,
+    teto: float = 30.0,
+    retry_after: Optional[float] = None,
+) -> float:
+    """
+    Espera antes da próxima tentativa (tentativa começa em 0).
+
+    Com Retry-After, respeita o valor do servidor (limitado ao teto).
+    Sem ele, usa backoff exponencial com "full jitter".
+    """
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), teto)
+
+    return random.uniform(0, min(teto, base * 2 ** tentativa))
+
+
+def ler_retry_after(valor: Optional[str]) -> Optional[float]:
+    """
+    Interpreta o cabeçalho Retry-After (segundos ou data HTTP).
+    """
+    if not valor:
+        return None
+
+    valor = valor.strip()
+
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        quando = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+
+    if quando.tzinfo is None:
+        quando = quando.replace(tzinfo=timezone.utc)
+
+    return max((quando - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+# ======================================================
+# TOKEN BUCKET
+# ======================================================
+class TokenBucket:
+    """
+    Limita a taxa de requisições (taxa por segundo, rajada até `capacidade`).
+    Taxa <= 0 desliga o limitador.
+    """
+
+    def __init__(self, taxa: float, capacidade: Optional[float] = None) -> None:
+        self.taxa = taxa
+        self.capacidade = capacidade if capacidade is not None else max(1.0, taxa)
+        self._tokens = self.capacidade
+        self._atualizado_em = time.monotonic()
+        self._pausado_ate = 0.0
+        self._lock = threading.Lock()
+
+    def adquirir(self) -> float:
+        """
+        Reserva um token, dormindo o necessário. Retorna o tempo esperado.
+        """
+        if self.taxa <= 0:
+            return 0.0
+
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(
+                self.capacidade,
+                self._tokens + (agora - self._atualizado_em) * self.taxa,
+            )
+            self._atualizado_em = agora
+
+            # Reserva antecipada: o saldo pode ficar negativo
+            self._tokens -= 1
+            espera = max(
+                -self._tokens / self.taxa if self._tokens < 0 else 0.0,
+                self._pausado_ate - agora,
+            )
+
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def pausar(self, segundos: float) -> None:
+        """
+        Segura todas as requisições por `segundos` (ex.: após um 429).
+        """
+        with self._lock:
+            self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+
+
+# ======================================================
+# CONCORRÊNCIA ADAPTATIVA (AIMD)
+# ======================================================
+class ConcorrenciaAdaptativa:
+    """
+    Limite de requisições simultâneas que se ajusta à latência observada.
+
+    - Sobe 1 após `limite` respostas rápidas seguidas (aumento aditivo).
+    - Cai pela metade com throttling do servidor ou quando a latência
+      média passa de `fator_latencia` x a latência base (corte
+      multiplicativo, no máximo um por intervalo de latência).
+    """
+
+    def __init__(
+        self,
+        maximo: int,
+        minimo: int = 1,
+        fator_latencia: float = 2.0,
+    ) -> None:
+        self.maximo = max(1, maximo)
+        self.minimo = max(1, min(minimo, self.maximo))
+        self.fator_latencia = fator_latencia
+        self.limite = self.maximo
+        self.latencia_media: Optional[float] = None
+        self.latencia_base: Optional[float] = None
+
+        self._em_uso = 0
+        self._sucessos = 0
+        self._ultimo_corte = 0.0
+        self._cond = threading.Condition()
+
+    def adquirir(self) -> None:
+        with self._cond:
+            while self._em_uso >= self.limite:
+                self._cond.wait()
+            self._em_uso += 1
+
+    def liberar(self, latencia: float, sobrecarga: bool = False) -> None:
+        with self._cond:
+            self._em_uso -= 1
+            self._registrar(latencia, sobrecarga)
+            self._cond.notify_all()
+
+    def _registrar(self, latencia: float, sobrecarga: bool) -> None:
+        if self.latencia_media is None:
+            self.latencia_media = latencia
+            self.latencia_base = latencia
+        else:
+            self.latencia_media = 0.8 * self.latencia_media + 0.2 * latencia
+            # A base acompanha o mínimo, mas sobe devagar se a API mudar de patamar
+            self.latencia_base = min(latencia, self.latencia_base * 1.01)
+
+        lenta = self.latencia_media > self.latencia_base * self.fator_latencia
+
+        if sobrecarga or lenta:
+            self._sucessos = 0
+            agora = time.monotonic()
+            if agora - self._ultimo_corte >= self.latencia_media:
+                self.limite = max(self.minimo, self.limite // 2)
+                self._ultimo_corte = agora
+            return
+
+        self._sucessos += 1
+        if self._sucessos >= self.limite and self.limite < self.maximo:
+            self.limite += 1
+            self._sucessos = 0
+
+
+# ======================================================
+# CIRCUIT BREAKER
+# ======================================================
+class CircuitoAberto(Exception):
+    def __init__(self, nome: str, restante_s: float) -> None:
+        super().__init__(f"Circuito '{nome}' aberto; nova tentativa em {restante_s:.0f}s")
+        self.nome = nome
+        self.restante_s = restante_s
+
+
+class CircuitBreaker:
+    """
+    Falha rápido depois de `limite_falhas` falhas seguidas.
+
+    Aberto por `tempo_aberto` segundos; depois deixa passar uma única
+    chamada de teste (meio-aberto): sucesso fecha, falha reabre.
+    """
+
+    def __init__(self, nome: str, limite_falhas: int = 5, tempo_aberto: float = 30.0) -> None:
+        self.nome = nome
+        self.limite_falhas = max(1, limite_falhas)
+        self.tempo_aberto = tempo_aberto
+        self.falhas = 0
+        self._aberto_ate: Optional[float] = None
+        self._em_teste = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._aberto_ate is None:
+                return "fechado"
+            if time.monotonic() < self._aberto_ate or self._em_teste:
+                return "aberto"
+            return "meio-aberto"
+
+    def verificar(self) -> None:
+        """
+        Levanta CircuitoAberto se a chamada não deve ser feita agora.
+        """
+        with self._lock:
+            if self._aberto_ate is None:
+                return
+
+            restante = self._aberto_ate - time.monotonic()
+            if restante > 0 or self._em_teste:
+                raise CircuitoAberto(self.nome, max(restante, 0.0))
+
+            self._em_teste = True
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self.falhas = 0
+            self._aberto_ate = None
+            self._em_teste = False
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self.falhas += 1
+            if self._em_teste or self.falhas >= self.limite_falhas:
+                self._aberto_ate = time.monotonic() + self.tempo_aberto
+            self._em_teste = False
+
+
+# ======================================================
+# MÉTRICAS
+# ======================================================
+class Metricas:
+    """
+    Contadores thread-safe (requisições, retries, throttles, esperas...).
+    """
+
+    def __init__(self) -> None:
+        self._valores: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def somar(self, nome: str, valor: float = 1) -> None:
+        with self._lock:
+            self._valores[nome] = self._valores.get(nome, 0) + valor
+
+    def get(self, nome: str) -> float:
+        with self._lock:
+            return self._valores.get(nome, 0)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._valores)
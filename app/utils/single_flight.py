@@ -0,0 +1,182 @@
+"""
+Single-flight: chamadas concorrentes com os mesmos argumentos compartilham
+uma única execução.
+
+Enquanto a primeira chamada (líder) está em andamento, as demais com a
+mesma chave esperam e recebem o mesmo resultado (ou a mesma exceção).
+Não é cache: assim que a líder termina, a próxima chamada executa de novo.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+import pandas as pd
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Chamada:
+    def __init__(self) -> None:
+        self.concluida = threading.Event()
+        self.resultado: Any = None
+        self.erro: BaseException | None = None
+        self.seguidores = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._em_voo: dict[Hashable, _Chamada] = {}
+
+    def executar(self, chave: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        chamada, lider = self._entrar(chave)
+
+        if not lider:
+            chamada.concluida.wait()
+            return self._resultado_seguidor(chamada)
+
+        try:
+            resultado = func(*args, **kwargs)
+        except BaseException as e:
+            self._encerrar(chave, chamada, erro=e)
+            raise
+
+        self._encerrar(chave, chamada, resultado)
+        return resultado
+
+    async def executar_async(
+        self,
+        chave: Hashable,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """
+        Como executar, para corrotinas. A líder e os seguidores podem estar
+        em event loops (threads) diferentes.
+        """
+        chamada, lider = self._entrar(chave)
+
+        if not lider:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, chamada.concluida.wait)
+            return self._resultado_seguidor(chamada)
+
+        try:
+            resultado = await func(*args, **kwargs)
+        except BaseException as e:
+            self._encerrar(chave, chamada, erro=e)
+            raise
+
+        self._encerrar(chave, chamada, resultado)
+        return resultado
+
+    def em_voo(self) -> int:
+        with self._lock:
+            return len(self._em_voo)
+
+    def _entrar(self, chave: Hashable) -> tuple[_Chamada, bool]:
+        with self._lock:
+            chamada = self._em_voo.get(chave)
+            if chamada is not None:
+                chamada.seguidores += 1
+                return chamada, False
+
+            chamada = _Chamada()
+            self._em_voo[chave] = chamada
+            return chamada, True
+
+    def _encerrar(
+        self,
+        chave: Hashable,
+        chamada: _Chamada,
+        resultado: Any = None,
+        erro: BaseException | None = None,
+    ) -> None:
+        """
+        Libera os seguidores. A cópia deles é feita aqui, antes de a líder
+        devolver o resultado (e a página começar a alterá-lo no lugar).
+        """
+        with self._lock:
+            self._em_voo.pop(chave, None)
+            seguidores = chamada.seguidores
+
+        chamada.erro = erro
+        if erro is None and seguidores:
+            chamada.resultado = _copiar(resultado)
+
+        chamada.concluida.set()
+
+    @staticmethod
+    def _resultado_seguidor(chamada: _Chamada) -> Any:
+        if chamada.erro is not None:
+            raise chamada.erro
+        # Cada seguidor copia a cópia intacta guardada pela líder
+        return _copiar(chamada.resultado)
+
+
+def single_flight(func: F) -> F:
+    """
+    Decorator: agrupa chamadas concorrentes de `func` pelos argumentos
+    (posicionais e nomeados resolvidos pela assinatura, com defaults).
+    Funciona também com funções async.
+    """
+    assinatura = inspect.signature(func)
+    grupo = SingleFlight()
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapper_async(*args, **kwargs):
+            chave = chave_argumentos(assinatura, args, kwargs)
+            return await grupo.executar_async(chave, func, *args, **kwargs)
+
+        wrapper_async.single_flight = grupo
+        return wrapper_async
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        chave = chave_argumentos(assinatura, args, kwargs)
+        return grupo.executar(chave, func, *args, **kwargs)
+
+    wrapper.single_flight = grupo
+    return wrapper
+
+
+# ======================================================
+# UTIL
+# ======================================================
+def chave_argumentos(assinatura: inspect.Signature, args: tuple, kwargs: dict) -> Hashable:
+    """
+    Chave hasheável dos argumentos, resolvidos pela assinatura (com defaults).
+    """
+    argumentos = assinatura.bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    return _congelar(tuple(argumentos.arguments.items()))
+
+
+def _congelar(valor: Any) -> Hashable:
+    """
+    Converte listas/dicts/sets em equivalentes hasheáveis para a chave.
+    """
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (set, frozenset)):
+        return frozenset(_congelar(v) for v in valor)
+    return valor
+
+
+def _copiar(resultado: Any) -> Any:
+    """
+    Seguidores recebem cópia dos DataFrames: as páginas alteram colunas
+    no lugar e não podem mexer no objeto da líder.
+    """
+    if isinstance(resultado, pd.DataFrame):
+        return resultado.copy()
+    if isinstance(resultado, dict):
+        return {k: _copiar(v) for k, v in resultado.items()}
+    return resultado
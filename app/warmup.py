@@ -0,0 +1,226 @@
+"""
+Aquecimento de caches fora do horário de uso.
+
+Pré-carrega as janelas mais usadas (últimos 7 dias e período de
+pagamento atual) dos cards do Metabase e as planilhas do financeiro,
+para que a primeira consulta do dia já encontre o cache pronto. Cada
+dado é aquecido pela mesma função que a página chama (mesma chave).
+
+Dois modos:
+- Dentro do app: com WARMUP_HORARIOS definido, o streamlit_app inicia
+  uma thread que aquece nos horários configurados. Aquece tudo,
+  inclusive os caches em memória (datasets do Metabase).
+- Sidecar: `python -m app.warmup` (agendado) ou `python -m app.warmup --agora`
+  (uma vez). Em outro processo só os caches em disco (Metabase por dia e
+  snapshots das planilhas) ficam aproveitáveis pelo app.
+
+Os snapshots das planilhas vencem após SHEETS_SNAPSHOT_TTL, mas enquanto o
+arquivo não muda no Drive continuam valendo sem releitura.
+
+Configuração (env):
+    WARMUP_HORARIOS           "06:30,12:10"  horários locais (HH:MM)
+    WARMUP_CONTAS             "mania,amazonet"
+    WARMUP_CARDS              "fechamento" cards lidos via metabase_datasets
+    WARMUP_PLANILHAS          "" abas extras lidas inteiras (as planilhas do
+                              financeiro 51/60/51_STM/39 são sempre aquecidas)
+    WARMUP_PERIODO_PAGAMENTO  "semana" (segunda até hoje) ou "mes"
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIGURAÇÃO
+# ======================================================
+CONTAS_PADRAO = "mania,amazonet"
+# fechamento atende técnicos, retirada e qualidade (mesmo dataset);
+# a página de vendas é aquecida à parte (ver _montar_tarefas)
+CARDS_PADRAO = "fechamento"
+PLANILHAS_PADRAO = ""
+
+# Janela padrão das páginas do Metabase (hoje - 7 até hoje)
+DIAS_JANELA_RECENTE = 7
+
+MAX_CONCORRENCIA = 4
+
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+
+
+def _lista_env(nome: str, padrao: str) -> list[str]:
+    return [item.strip() for item in os.getenv(nome, padrao).split(",") if item.strip()]
+
+
+def horarios_configurados() -> list[tuple[int, int]]:
+    horarios = []
+    for item in _lista_env("WARMUP_HORARIOS", ""):
+        hora, _, minuto = item.partition(":")
+        try:
+            horarios.append((int(hora), int(minuto or 0)))
+        except ValueError:
+            raise EnvironmentError(f"Horário inválido em WARMUP_HORARIOS: {item}")
+    return sorted(horarios)
+
+
+# ======================================================
+# JANELAS
+# ======================================================
+def janelas_padrao(hoje: Optional[date] = None) -> list[tuple[date, date]]:
+    """
+    Últimos 7 dias (padrão das páginas) e período de pagamento atual.
+    """
+    hoje = hoje or date.today()
+    periodo = os.getenv("WARMUP_PERIODO_PAGAMENTO", "semana").strip().lower()
+
+    if periodo == "mes":
+        inicio_pagamento = hoje.replace(day=1)
+    else:
+        inicio_pagamento = hoje - timedelta(days=hoje.weekday())
+
+    janelas = [(hoje - timedelta(days=DIAS_JANELA_RECENTE), hoje)]
+    if (inicio_pagamento, hoje) not in janelas:
+        janelas.append((inicio_pagamento, hoje))
+
+    return janelas
+
+
+# ======================================================
+# AQUECIMENTO
+# ======================================================
+def aquecer(hoje: Optional[date] = None) -> dict[str, int]:
+    """
+    Executa uma rodada de aquecimento. Falhas são registradas e não
+    interrompem as demais tarefas. Retorna {"ok": n, "falhas": n}.
+    """
+    tarefas = _montar_tarefas(hoje)
+    inicio = time.monotonic()
+    resumo = {"ok": 0, "falhas": 0}
+
+    def executar(nome: str, tarefa: Callable[[], object]) -> bool:
+        try:
+            tarefa()
+            return True
+        except Exception as e:
+            logger.warning("Falha no aquecimento", extra={"tarefa": nome, "erro": str(e)})
+            return False
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCORRENCIA, thread_name_prefix="warmup") as pool:
+        resultados = list(pool.map(lambda t: executar(*t), tarefas))
+
+    resumo["ok"] = sum(resultados)
+    resumo["falhas"] = len(resultados) - resumo["ok"]
+
+    logger.info(
+        "Aquecimento concluído",
+        extra={**resumo, "duracao_s": round(time.monotonic() - inicio, 1)},
+    )
+    return resumo
+
+
+def _montar_tarefas(hoje: Optional[date]) -> list[tuple[str, Callable[[], object]]]:
+    from app.analysis.Financeiro.financeiro_rules_instalacao import carregar_planilhas
+    from app.analysis.Financeiro.financeiro_rules_retirada import carregar_planilha_39
+    from app.analysis.Financeiro.financeiro_sources import carregar_planilhas_financeiro
+    from app.analysis.google_sheets import read_sheet_as_dataframe
+    from app.analysis.metabase_datasets import carregar_dataset_metabase
+    from app.ui.fechamento_venda_metabase_app import carregar_base_bruta
+
+    tarefas: list[tuple[str, Callable[[], object]]] = []
+    contas = _lista_env("WARMUP_CONTAS", CONTAS_PADRAO)
+
+    for conta in contas:
+        for card in _lista_env("WARMUP_CARDS", CARDS_PADRAO):
+            for inicio, fim in janelas_padrao(hoje):
+                tarefas.append(
+                    (
+                        f"metabase:{conta}:{card}:{inicio}:{fim}",
+                        lambda c=conta, k=card, i=inicio, f=fim: carregar_dataset_metabase([c], k, i, f),
+                    )
+                )
+
+    # Página de vendas: card fila com os tipos de OS de cada conta, no cache
+    # próprio da página (chave pela lista de contas: cada uma e todas juntas)
+    selecoes = [[conta] for conta in contas] + ([contas] if len(contas) > 1 else [])
+    for selecao in selecoes:
+        for inicio, fim in janelas_padrao(hoje):
+            tarefas.append(
+                (
+                    f"vendas:{','.join(selecao)}:{inicio}:{fim}",
+                    lambda s=selecao, i=inicio, f=fim: carregar_base_bruta(s, i, f),
+                )
+            )
+
+    for planilha in _lista_env("WARMUP_PLANILHAS", PLANILHAS_PADRAO):
+        tarefas.append(
+            (f"planilha:{planilha}", lambda p=planilha: read_sheet_as_dataframe(p))
+        )
+
+    tarefas.append(("financeiro:instalacao", carregar_planilhas))
+    tarefas.append(("financeiro:vendas", carregar_planilhas_financeiro))
+    tarefas.append(("financeiro:retirada", carregar_planilha_39))
+
+    return tarefas
+
+
+# ======================================================
+# AGENDAMENTO
+# ======================================================
+def proxima_execucao(agora: datetime, horarios: list[tuple[int, int]]) -> datetime:
+    for hora, minuto in horarios:
+        candidato = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if candidato > agora:
+            return candidato
+
+    hora, minuto = horarios[0]
+    amanha = agora + timedelta(days=1)
+    return amanha.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+
+
+def executar_agendado(horarios: Optional[list[tuple[int, int]]] = None) -> None:
+    horarios = horarios or horarios_configurados() or [(6, 30)]
+
+    while True:
+        proxima = proxima_execucao(datetime.now(), horarios)
+        logger.info("Próximo aquecimento agendado", extra={"quando": proxima.isoformat()})
+        time.sleep(max((proxima - datetime.now()).total_seconds(), 0))
+        aquecer()
+
+
+def iniciar_aquecimento_em_processo() -> bool:
+    """
+    Inicia (uma vez por processo) a thread de aquecimento agendado.
+    Só liga se WARMUP_HORARIOS estiver definido.
+    """
+    global _thread
+
+    horarios = horarios_configurados()
+    if not horarios:
+        return False
+
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=executar_agendado,
+                args=(horarios,),
+                name="warmup",
+                daemon=True,
+            )
+            _thread.start()
+
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if "--agora" in sys.argv[1:]:
+        aquecer()
+    else:
+        executar_agendado()